@@ -34,7 +34,14 @@ def register() -> None:
     logger.info("=== AdaptiveWear Generator Pro v4.1.1 登録開始 ===")
     setup_logging()
     try:
-        from . import core_operators, core_properties, core_safety, ui_panels
+        from . import (
+            core_live,
+            core_materials,
+            core_operators,
+            core_properties,
+            core_safety,
+            ui_panels,
+        )
 
         # Replace the legacy post-processing method before Blender registers the
         # operator. Failures now propagate to execute(), which returns CANCELLED.
@@ -46,6 +53,11 @@ def register() -> None:
         registration_classes = [
             core_properties.AWGProPropertyGroup,
             core_operators.AWGP_OT_GenerateWear,
+            core_operators.AWGP_OT_GenerateWearModal,
+            core_operators.AWGP_OT_PromotePreview,
+            core_operators.AWGP_OT_BakeOutfitAtlas,
+            core_operators.AWGP_OT_BakeClothCache,
+            core_operators.AWGP_OT_PoseSweep,
             core_operators.AWGP_OT_DiagnoseBones,
             ui_panels.AWG_PT_MainPanel,
             ui_panels.AWG_PT_AdvancedPanel,
@@ -63,6 +75,8 @@ def register() -> None:
         bpy.types.Scene.adaptive_wear_generator_pro = PointerProperty(
             type=core_properties.AWGProPropertyGroup
         )
+        core_live.register()
+        core_materials.register()
         logger.info("=== AdaptiveWear Generator Pro 登録完了 ===")
     except Exception:
         logger.exception("AdaptiveWear Generator Pro registration failed")
@@ -75,16 +89,30 @@ def unregister() -> None:
         del bpy.types.Scene.adaptive_wear_generator_pro
 
     try:
-        from . import core_operators, core_properties, ui_panels
+        from . import (
+            core_live,
+            core_materials,
+            core_operators,
+            core_properties,
+            ui_panels,
+        )
     except ImportError:
         logger.warning("modules are unavailable; unregister ended")
         return
 
+    core_live.unregister()
+    core_materials.unregister()
+
     unregistration_classes = [
         ui_panels.AWG_PT_HelpPanel,
         ui_panels.AWG_PT_AdvancedPanel,
         ui_panels.AWG_PT_MainPanel,
         core_operators.AWGP_OT_DiagnoseBones,
+        core_operators.AWGP_OT_PoseSweep,
+        core_operators.AWGP_OT_BakeClothCache,
+        core_operators.AWGP_OT_BakeOutfitAtlas,
+        core_operators.AWGP_OT_PromotePreview,
+        core_operators.AWGP_OT_GenerateWearModal,
         core_operators.AWGP_OT_GenerateWear,
         core_properties.AWGProPropertyGroup,
     ]
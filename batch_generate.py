@@ -0,0 +1,412 @@
+"""
+衣装候補のバッチ生成CLI
+マニフェストに列挙した素体.blendと衣装タイプの組み合わせを、
+常駐させた複数の `blender --background` ワーカーへ分配して生成する。
+
+使い方:
+    python batch_generate.py manifest.json --workers 4 --output-dir batch-results
+
+マニフェスト形式:
+    {
+      "defaults": {"quality_level": "STABLE", "thickness": 0.01},
+      "jobs": [
+        {"body": "avatars/a.blend", "object": "Body",
+         "wear_types": ["T_SHIRT", "PANTS"], "settings": {"tight_fit": true}}
+      ]
+    }
+
+ワーカー側はこのファイル自身を `--worker` 付きでBlenderから実行する。
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RESULT_MARKER = "AWGP_BATCH_RESULT "
+READY_MARKER = "AWGP_BATCH_READY"
+DEFAULT_JOB_TIMEOUT = 600.0
+WORKER_START_TIMEOUT = 120.0
+ADDON_PACKAGE = Path(__file__).resolve().parent.name
+
+
+# ---------------------------------------------------------------------------
+# マニフェスト
+# ---------------------------------------------------------------------------
+
+
+def load_manifest(manifest_path: Path) -> List[Dict[str, Any]]:
+    """マニフェストを (素体, 衣装タイプ) 単位のジョブ列へ展開"""
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    base_dir = manifest_path.parent
+    defaults = manifest.get("defaults", {})
+
+    jobs = []
+    for entry_index, entry in enumerate(manifest.get("jobs", [])):
+        if "body" not in entry:
+            raise ValueError(f"jobs[{entry_index}] に body がありません")
+
+        body_file = Path(entry["body"])
+        if not body_file.is_absolute():
+            body_file = (base_dir / body_file).resolve()
+
+        wear_types = entry.get("wear_types") or [entry.get("wear_type", "T_SHIRT")]
+        settings = {**defaults, **entry.get("settings", {})}
+
+        for wear_type in wear_types:
+            job_id = f"{len(jobs):04d}_{body_file.stem}_{wear_type}"
+            jobs.append(
+                {
+                    "id": job_id,
+                    "body_file": str(body_file),
+                    "body_object": entry.get("object"),
+                    "wear_type": wear_type,
+                    "settings": settings,
+                }
+            )
+    return jobs
+
+
+# ---------------------------------------------------------------------------
+# ドライバー（通常のPythonで実行）
+# ---------------------------------------------------------------------------
+
+
+class BlenderWorker:
+    """ジョブ間で再利用する常駐Blenderプロセス"""
+
+    def __init__(self, worker_id: int, blender: str, output_dir: Path):
+        self.worker_id = worker_id
+        self.blender = blender
+        self.output_dir = output_dir
+        self.process: Optional[subprocess.Popen] = None
+        self.results: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self.log_path = output_dir / f"worker-{worker_id}.log"
+        self.jobs_completed = 0
+        self.restarts = 0
+
+    def start(self) -> None:
+        command = [
+            self.blender,
+            "--background",
+            "--factory-startup",
+            "--python",
+            str(Path(__file__).resolve()),
+            "--",
+            "--worker",
+        ]
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+        )
+        # 読み取りスレッドには今回のプロセスとキューを渡し、再起動前の古いスレッドが
+        # 新しいキューへ終了通知を入れないようにする
+        self.results = queue.Queue()
+        threading.Thread(
+            target=self._read_output, args=(self.process, self.results), daemon=True
+        ).start()
+
+        ready = self._wait_result(WORKER_START_TIMEOUT)
+        if not ready or not ready.get("ready"):
+            self.stop()
+            raise RuntimeError(f"ワーカー {self.worker_id} の起動に失敗しました")
+
+    def _read_output(
+        self,
+        process: subprocess.Popen,
+        results: "queue.Queue[Optional[Dict[str, Any]]]",
+    ) -> None:
+        with open(self.log_path, "a", encoding="utf-8") as log:
+            for line in process.stdout:
+                if line.startswith(RESULT_MARKER):
+                    results.put(json.loads(line[len(RESULT_MARKER) :]))
+                elif line.startswith(READY_MARKER):
+                    results.put({"ready": True})
+                else:
+                    log.write(line)
+        # プロセス終了を待機側に知らせる
+        results.put(None)
+
+    def _wait_result(self, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return self.results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def run(self, job: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        if self.process is None or self.process.poll() is not None:
+            self.restarts += 1 if self.process is not None else 0
+            self.start()
+
+        sent_at = time.perf_counter()
+        self.process.stdin.write(json.dumps(job, ensure_ascii=False) + "\n")
+        self.process.stdin.flush()
+
+        result = self._wait_result(timeout)
+        round_trip = time.perf_counter() - sent_at
+        if result is None:
+            # タイムアウトまたはクラッシュ。次のジョブは新しいワーカーで処理する
+            self.stop()
+            result = {
+                "id": job["id"],
+                "status": "FAILED",
+                "error": "ワーカーがタイムアウトまたは異常終了しました",
+            }
+        result["worker"] = self.worker_id
+        result["round_trip_seconds"] = round_trip
+        self.jobs_completed += 1
+        return result
+
+    def stop(self) -> None:
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+
+def run_batch(
+    jobs: List[Dict[str, Any]],
+    blender: str,
+    workers: int,
+    output_dir: Path,
+    job_timeout: float,
+) -> Dict[str, Any]:
+    """ジョブをワーカープールへ分配し、完了順に結果を記録"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    pending: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    for job in jobs:
+        job["output_dir"] = str(output_dir)
+        pending.put(job)
+
+    results: List[Dict[str, Any]] = []
+    results_lock = threading.Lock()
+    pool = [
+        BlenderWorker(worker_id, blender, output_dir)
+        for worker_id in range(min(workers, len(jobs)))
+    ]
+
+    def consume(worker: BlenderWorker) -> None:
+        while True:
+            try:
+                job = pending.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                result = worker.run(job, job_timeout)
+            except Exception as e:
+                result = {"id": job["id"], "status": "FAILED", "error": str(e)}
+            with results_lock:
+                results.append(result)
+                print(
+                    f"[{len(results)}/{len(jobs)}] {result['id']}: {result['status']}"
+                    f" ({result.get('round_trip_seconds', 0.0):.1f}秒)"
+                )
+        worker.stop()
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=consume, args=(worker,), daemon=True) for worker in pool
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - started
+
+    summary = summarize_results(results, wall_time, pool)
+    summary_path = output_dir / "batch_summary.json"
+    summary_path.write_text(
+        json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    return summary
+
+
+def summarize_results(
+    results: List[Dict[str, Any]], wall_time: float, pool: List[BlenderWorker]
+) -> Dict[str, Any]:
+    succeeded = [r for r in results if r.get("status") == "FINISHED"]
+    job_times = [
+        r["generation_seconds"] for r in succeeded if "generation_seconds" in r
+    ]
+    return {
+        "total_jobs": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "workers": len(pool),
+        "worker_restarts": sum(worker.restarts for worker in pool),
+        "wall_time_seconds": wall_time,
+        "throughput_jobs_per_minute": len(results) / wall_time * 60.0
+        if wall_time > 0
+        else 0.0,
+        "mean_generation_seconds": sum(job_times) / len(job_times)
+        if job_times
+        else 0.0,
+        "max_generation_seconds": max(job_times) if job_times else 0.0,
+        "jobs": sorted(results, key=lambda r: r["id"]),
+    }
+
+
+# ---------------------------------------------------------------------------
+# ワーカー（Blender内で実行）
+# ---------------------------------------------------------------------------
+
+
+def _register_addon() -> None:
+    addon_root = Path(__file__).resolve().parent
+    if str(addon_root.parent) not in sys.path:
+        sys.path.insert(0, str(addon_root.parent))
+    addon = importlib.import_module(ADDON_PACKAGE)
+    addon.register()
+
+
+def _run_worker_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    import bpy
+
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"id": job["id"], "status": "FAILED"}
+
+    bpy.ops.wm.open_mainfile(filepath=job["body_file"])
+    loaded = time.perf_counter()
+
+    body = (
+        bpy.data.objects.get(job["body_object"])
+        if job.get("body_object")
+        else next((obj for obj in bpy.data.objects if obj.type == "MESH"), None)
+    )
+    if body is None or body.type != "MESH":
+        result["error"] = f"素体メッシュが見つかりません: {job.get('body_object')}"
+        return result
+
+    props = bpy.context.scene.adaptive_wear_generator_pro
+    props.base_body = body
+    props.wear_type = job["wear_type"]
+    for key, value in job["settings"].items():
+        if not hasattr(props, key):
+            raise ValueError(f"未知の設定項目です: {key}")
+        setattr(props, key, value)
+
+    existing = {obj.as_pointer() for obj in bpy.data.objects}
+    status = bpy.ops.awgp.generate_wear()
+    generated = time.perf_counter()
+
+    created = [obj for obj in bpy.data.objects if obj.as_pointer() not in existing]
+    result["status"] = "FINISHED" if "FINISHED" in status else "CANCELLED"
+    result["garments"] = [
+        {
+            "name": obj.name,
+            "vertices": len(obj.data.vertices),
+            "faces": len(obj.data.polygons),
+        }
+        for obj in created
+        if obj.type == "MESH"
+    ]
+
+    if result["status"] == "FINISHED" and created:
+        output_blend = Path(job["output_dir"]) / f"{job['id']}.blend"
+        bpy.data.libraries.write(str(output_blend), set(created), fake_user=True)
+        result["output_blend"] = str(output_blend)
+
+    result["load_seconds"] = loaded - started
+    result["generation_seconds"] = generated - loaded
+    result["total_seconds"] = time.perf_counter() - started
+
+    # 長時間バッチでデータブロックが増え続けていないかを監視する
+    core_datablocks = importlib.import_module(f"{ADDON_PACKAGE}.core_datablocks")
+    result["datablocks"] = core_datablocks.datablock_counts()
+    return result
+
+
+def run_worker() -> None:
+    """標準入力からジョブを1行ずつ受け取り、結果を標準出力へ返す"""
+    _register_addon()
+    print(READY_MARKER, flush=True)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        try:
+            result = _run_worker_job(job)
+        except Exception as e:
+            result = {"id": job.get("id"), "status": "FAILED", "error": str(e)}
+
+        report_path = Path(job["output_dir"]) / f"{job['id']}.json"
+        report_path.write_text(
+            json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        print(RESULT_MARKER + json.dumps(result, ensure_ascii=False), flush=True)
+
+
+# ---------------------------------------------------------------------------
+# エントリーポイント
+# ---------------------------------------------------------------------------
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="AdaptiveWear 衣装候補バッチ生成")
+    parser.add_argument("manifest", type=Path, nargs="?", help="ジョブマニフェスト")
+    parser.add_argument(
+        "--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2)
+    )
+    parser.add_argument(
+        "--blender", default=os.environ.get("BLENDER_EXECUTABLE", "blender")
+    )
+    parser.add_argument("--output-dir", type=Path, default=Path("batch-results"))
+    parser.add_argument("--job-timeout", type=float, default=DEFAULT_JOB_TIMEOUT)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    # Blenderから実行された場合は "--" 以降だけを解釈する
+    argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else sys.argv[1:]
+    args = parse_args(argv)
+
+    if args.worker:
+        run_worker()
+        return
+
+    if args.manifest is None:
+        print("エラー: マニフェストを指定してください")
+        sys.exit(2)
+
+    jobs = load_manifest(args.manifest)
+    print(f"{len(jobs)} ジョブを {args.workers} ワーカーで実行します")
+    summary = run_batch(
+        jobs, args.blender, args.workers, args.output_dir, args.job_timeout
+    )
+
+    print("\n--- バッチサマリー ---")
+    print(f"成功: {summary['succeeded']}")
+    print(f"失敗: {summary['failed']}")
+    print(f"処理時間: {summary['wall_time_seconds']:.1f}秒")
+    print(f"スループット: {summary['throughput_jobs_per_minute']:.1f} ジョブ/分")
+    print(f"平均生成時間: {summary['mean_generation_seconds']:.2f}秒")
+
+    sys.exit(0 if summary["failed"] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,522 @@
+import bpy
+import json
+import math
+import os
+import subprocess
+import tempfile
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+from . import core_materials, core_tracing
+
+logger = logging.getLogger(__name__)
+
+# アトラス全体の一辺（ピクセル）。衣装ごとのタイルはこれを格子状に分割する
+BAKE_ATLAS_SIZE = 2048
+# タイル境界で隣の衣装の色がにじまない程度にUV島の外側へ広げる幅
+BAKE_MARGIN = 4
+# プロシージャルテクスチャはノイズが無いので少ないサンプルで足りる
+BAKE_SAMPLES = 4
+BAKE_WORKER_TIMEOUT = 600.0
+ATLAS_UV_LAYER = "AWGP_Atlas"
+# Principled BSDF の入力 → (チャンネル名, 非カラーデータか)
+BAKE_CHANNELS = {
+    "Base Color": ("BaseColor", False),
+    "Roughness": ("Roughness", True),
+    "Alpha": ("Alpha", True),
+    "Normal": ("Normal", True),
+}
+# 何も焼かれていない領域の値（法線は平らな接空間法線）
+_EMPTY_PIXEL = {"Normal": (0.5, 0.5, 1.0, 1.0)}
+_ADDON_ROOT = Path(__file__).resolve().parent
+_WORKER_EXPR = (
+    "import sys, importlib; sys.path.insert(0, {root!r}); "
+    "importlib.import_module({module!r}).run_bake_worker(sys.argv[sys.argv.index('--') + 1])"
+)
+
+
+def _principled(mat: bpy.types.Material) -> Optional[bpy.types.ShaderNode]:
+    if not (mat and mat.use_nodes and mat.node_tree):
+        return None
+    return next(
+        (node for node in mat.node_tree.nodes if node.type == "BSDF_PRINCIPLED"), None
+    )
+
+
+def procedural_inputs(mat: bpy.types.Material) -> List[str]:
+    """画像以外のノード（Noise / Voronoi / Wave など）から接続されている焼き込み対象の入力"""
+    principled = _principled(mat)
+    if principled is None:
+        return []
+    return [
+        name
+        for name in BAKE_CHANNELS
+        if name in principled.inputs
+        and principled.inputs[name].is_linked
+        and principled.inputs[name].links[0].from_node.type != "TEX_IMAGE"
+    ]
+
+
+def _garment_materials(obj: bpy.types.Object) -> List[bpy.types.Material]:
+    unique = {}
+    for slot in obj.material_slots:
+        if slot.material is not None:
+            unique.setdefault(slot.material.as_pointer(), slot.material)
+    return list(unique.values())
+
+
+def atlas_layout(count: int, size: int) -> List[Tuple[int, int, int]]:
+    """衣装 count 個を正方格子に並べたときの各タイルの (x, y, 一辺) をピクセル単位で返す"""
+    grid = max(1, math.ceil(math.sqrt(count)))
+    tile = size // grid
+    return [((i % grid) * tile, (i // grid) * tile, tile) for i in range(count)]
+
+
+def ensure_uv(obj: bpy.types.Object) -> None:
+    if obj.data.uv_layers:
+        return
+    bpy.context.view_layer.objects.active = obj
+    bpy.ops.object.mode_set(mode="EDIT")
+    bpy.ops.mesh.select_all(action="SELECT")
+    bpy.ops.uv.smart_project(island_margin=0.02)
+    bpy.ops.object.mode_set(mode="OBJECT")
+
+
+def _source_uv(mesh: bpy.types.Mesh) -> bpy.types.MeshUVLoopLayer:
+    return next(layer for layer in mesh.uv_layers if layer.name != ATLAS_UV_LAYER)
+
+
+def assign_atlas_uvs(obj: bpy.types.Object, x: int, y: int, tile: int, size: int):
+    """元のUV (0〜1) をアトラス上の自分のタイルへ縮小・移動したUVマップを作る"""
+    mesh = obj.data
+    uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    _source_uv(mesh).data.foreach_get("uv", uv)
+    uv = uv.reshape(-1, 2) * (tile / size) + np.array([x, y], dtype=np.float32) / size
+
+    layer = mesh.uv_layers.get(ATLAS_UV_LAYER) or mesh.uv_layers.new(
+        name=ATLAS_UV_LAYER
+    )
+    layer.data.foreach_set("uv", uv.ravel())
+    layer.active = True
+    layer.active_render = True
+
+
+def _emission_override(
+    materials: List[bpy.types.Material], input_name: str
+) -> List[Tuple[bpy.types.Material, Any, Any]]:
+    """指定入力の値をそのまま発光させる（EMITベイクで任意の入力を画像にする）"""
+    restore = []
+    for mat in materials:
+        principled = _principled(mat)
+        nodes = mat.node_tree.nodes
+        links = mat.node_tree.links
+        output = next(
+            (
+                node
+                for node in nodes
+                if node.type == "OUTPUT_MATERIAL" and node.is_active_output
+            ),
+            None,
+        )
+        if principled is None or output is None:
+            continue
+
+        emission = nodes.new("ShaderNodeEmission")
+        socket = principled.inputs[input_name]
+        if socket.is_linked:
+            links.new(socket.links[0].from_socket, emission.inputs["Color"])
+        elif socket.type == "RGBA":
+            emission.inputs["Color"].default_value = socket.default_value
+        else:
+            value = float(socket.default_value)
+            emission.inputs["Color"].default_value = (value, value, value, 1.0)
+
+        surface = output.inputs["Surface"]
+        previous = surface.links[0].from_socket if surface.is_linked else None
+        links.new(emission.outputs["Emission"], surface)
+        restore.append((mat, emission, (previous, surface)))
+    return restore
+
+
+def _restore_emission_override(restore) -> None:
+    for mat, emission, (previous, surface) in restore:
+        if previous is not None:
+            mat.node_tree.links.new(previous, surface)
+        mat.node_tree.nodes.remove(emission)
+
+
+@core_tracing.traced("bake.garment", "bake")
+def bake_garment(
+    obj: bpy.types.Object, inputs: List[str], tile: int
+) -> Dict[str, np.ndarray]:
+    """CPU Cycles で衣装1つ分のプロシージャル入力をタイル画像に焼き、(tile, tile, 4) の配列で返す"""
+    scene = bpy.context.scene
+    image = bpy.data.images.new(
+        "AWGP_BakeTile", tile, tile, alpha=True, float_buffer=True
+    )
+    materials = _garment_materials(obj)
+    targets = []
+    for mat in materials:
+        node = mat.node_tree.nodes.new("ShaderNodeTexImage")
+        node.image = image
+        mat.node_tree.nodes.active = node
+        targets.append((mat, node))
+
+    # タイルは元のUVで焼き、アトラス上の位置は後でUVをずらして合わせる
+    _source_uv(obj.data).active = True
+    for other in bpy.context.view_layer.objects:
+        other.select_set(False)
+    obj.select_set(True)
+    bpy.context.view_layer.objects.active = obj
+
+    # ユーザーのレンダー設定は焼き込み後に戻す
+    render_settings = (
+        scene.render.engine,
+        scene.cycles.device,
+        scene.cycles.samples,
+    )
+    results = {}
+    try:
+        scene.render.engine = "CYCLES"
+        scene.cycles.device = "CPU"
+        scene.cycles.samples = BAKE_SAMPLES
+        for input_name in inputs:
+            channel = BAKE_CHANNELS[input_name][0]
+            if input_name == "Normal":
+                bpy.ops.object.bake(
+                    type="NORMAL",
+                    normal_space="TANGENT",
+                    margin=BAKE_MARGIN,
+                    use_clear=True,
+                )
+            else:
+                restore = _emission_override(materials, input_name)
+                try:
+                    bpy.ops.object.bake(type="EMIT", margin=BAKE_MARGIN, use_clear=True)
+                finally:
+                    _restore_emission_override(restore)
+
+            pixels = np.empty(tile * tile * 4, dtype=np.float32)
+            image.pixels.foreach_get(pixels)
+            results[channel] = pixels.reshape(tile, tile, 4)
+    finally:
+        (
+            scene.render.engine,
+            scene.cycles.device,
+            scene.cycles.samples,
+        ) = render_settings
+        for mat, node in targets:
+            mat.node_tree.nodes.remove(node)
+        bpy.data.images.remove(image)
+
+    core_tracing.annotate(object=obj.name, channels=len(results), tile=tile)
+    return results
+
+
+def _worker_count(garments: int) -> int:
+    return max(1, min(garments, (os.cpu_count() or 2) // 2))
+
+
+def _bake_in_subprocesses(
+    plan: List[Tuple[bpy.types.Object, List[str]]],
+    tile: int,
+    work_dir: str,
+    workers: int,
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """衣装を複数の Blender バックグラウンドプロセスに分けて並列に焼く"""
+    blend_path = os.path.join(work_dir, "outfit.blend")
+    bpy.data.libraries.write(blend_path, {obj for obj, _ in plan}, fake_user=True)
+
+    threads = max(1, (os.cpu_count() or 2) // workers)
+    expr = _WORKER_EXPR.format(
+        root=str(_ADDON_ROOT.parent), module=f"{_ADDON_ROOT.name}.core_bake"
+    )
+    processes = []
+    for worker_id in range(workers):
+        assigned = plan[worker_id::workers]
+        if not assigned:
+            continue
+        job_path = os.path.join(work_dir, f"job-{worker_id}.json")
+        with open(job_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "objects": [
+                        {"name": obj.name, "inputs": inputs} for obj, inputs in assigned
+                    ],
+                    "tile": tile,
+                    "threads": threads,
+                    "output_dir": work_dir,
+                },
+                f,
+            )
+        log = open(_worker_log(work_dir, worker_id), "w", encoding="utf-8")
+        command = [
+            bpy.app.binary_path,
+            "--background",
+            "--factory-startup",
+            blend_path,
+            "--python-exit-code",
+            "1",
+            "--python-expr",
+            expr,
+            "--",
+            job_path,
+        ]
+        processes.append(
+            (
+                worker_id,
+                log,
+                subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT),
+            )
+        )
+
+    failures = []
+    for worker_id, log, process in processes:
+        try:
+            if process.wait(timeout=BAKE_WORKER_TIMEOUT) != 0:
+                failures.append(worker_id)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            failures.append(worker_id)
+        finally:
+            log.close()
+    if failures:
+        # 作業ディレクトリは消えるので、ログの末尾をここで残しておく
+        for worker_id in failures:
+            with open(
+                _worker_log(work_dir, worker_id), encoding="utf-8", errors="replace"
+            ) as f:
+                tail = f.readlines()[-20:]
+            logger.error(f"ベイクワーカー {worker_id} のログ:\n{''.join(tail)}")
+        raise RuntimeError(f"ベイクワーカーが失敗しました: {failures}")
+
+    tiles = {}
+    for obj, inputs in plan:
+        tiles[obj.name] = {
+            BAKE_CHANNELS[name][0]: np.load(
+                os.path.join(work_dir, _tile_filename(obj.name, name))
+            )
+            for name in inputs
+        }
+    return tiles
+
+
+def _worker_log(work_dir: str, worker_id: int) -> str:
+    return os.path.join(work_dir, f"worker-{worker_id}.log")
+
+
+def _tile_filename(object_name: str, input_name: str) -> str:
+    safe = "".join(c if c.isalnum() else "_" for c in object_name)
+    return f"{safe}_{BAKE_CHANNELS[input_name][0]}.npy"
+
+
+def run_bake_worker(job_path: str) -> None:
+    """バックグラウンドの Blender 内で実行され、割り当てられた衣装のタイルを .npy に保存"""
+    with open(job_path, encoding="utf-8") as f:
+        job = json.load(f)
+
+    scene = bpy.context.scene
+    scene.render.threads_mode = "FIXED"
+    scene.render.threads = job["threads"]
+    for entry in job["objects"]:
+        obj = bpy.data.objects[entry["name"]]
+        if obj.name not in scene.collection.objects:
+            scene.collection.objects.link(obj)
+        tiles = bake_garment(obj, entry["inputs"], job["tile"])
+        for name in entry["inputs"]:
+            np.save(
+                os.path.join(job["output_dir"], _tile_filename(obj.name, name)),
+                tiles[BAKE_CHANNELS[name][0]],
+            )
+        print(f"AWGP_BAKE_DONE {obj.name}", flush=True)
+
+
+def _linear_to_srgb(values: np.ndarray) -> np.ndarray:
+    values = np.clip(values, 0.0, 1.0)
+    return np.where(
+        values <= 0.0031308,
+        values * 12.92,
+        1.055 * np.power(values, 1.0 / 2.4) - 0.055,
+    )
+
+
+def _compose_atlases(
+    name: str,
+    tiles: Dict[str, Dict[str, np.ndarray]],
+    plan: List[Tuple[bpy.types.Object, List[str]]],
+    layout: List[Tuple[int, int, int]],
+    size: int,
+) -> Dict[str, bpy.types.Image]:
+    """各衣装のタイルを1枚のアトラスに並べ、チャンネルごとの画像を作る"""
+    atlases = {}
+    for input_name, (channel, non_color) in BAKE_CHANNELS.items():
+        if not any(channel in tiles[obj.name] for obj, _ in plan):
+            continue
+        pixels = np.empty((size, size, 4), dtype=np.float32)
+        pixels[:] = _EMPTY_PIXEL.get(input_name, (0.0, 0.0, 0.0, 1.0))
+        for (obj, _), (x, y, tile) in zip(plan, layout):
+            baked = tiles[obj.name].get(channel)
+            if baked is not None:
+                pixels[y : y + tile, x : x + tile] = baked
+        if not non_color:
+            pixels[..., :3] = _linear_to_srgb(pixels[..., :3])
+
+        image_name = f"AWGP_Atlas_{name}_{channel}"
+        image = bpy.data.images.get(image_name)
+        if image is not None and tuple(image.size) != (size, size):
+            bpy.data.images.remove(image)
+            image = None
+        if image is None:
+            image = bpy.data.images.new(image_name, size, size, alpha=True)
+        image.colorspace_settings.name = "Non-Color" if non_color else "sRGB"
+        image.pixels.foreach_set(pixels.ravel())
+        image.pack()
+        atlases[input_name] = image
+    return atlases
+
+
+def _remove_dangling_nodes(tree: bpy.types.NodeTree) -> None:
+    """出力がどこにも繋がっていないノードを取り除く（焼き込み済みのプロシージャルノード）"""
+    while True:
+        dangling = [
+            node
+            for node in tree.nodes
+            if node.type not in ("OUTPUT_MATERIAL", "BSDF_PRINCIPLED")
+            and node.outputs
+            and not any(output.is_linked for output in node.outputs)
+        ]
+        if not dangling:
+            return
+        for node in dangling:
+            tree.nodes.remove(node)
+
+
+def bake_material(
+    mat: bpy.types.Material, atlases: Dict[str, bpy.types.Image]
+) -> bpy.types.Material:
+    """プロシージャル入力をアトラス画像の参照に置き換えたマテリアルの複製を作る"""
+    baked = mat.copy()
+    baked.name = f"{mat.name}_Baked"
+    tree = baked.node_tree
+    principled = _principled(baked)
+
+    uv_node = tree.nodes.new("ShaderNodeUVMap")
+    uv_node.uv_map = ATLAS_UV_LAYER
+    uv_node.location = (-900, -300)
+    for offset, input_name in enumerate(procedural_inputs(baked)):
+        image = atlases.get(input_name)
+        if image is None:
+            continue
+        target = principled.inputs[input_name]
+        tree.links.remove(target.links[0])
+
+        image_node = tree.nodes.new("ShaderNodeTexImage")
+        image_node.image = image
+        image_node.location = (-600, -300 * offset)
+        tree.links.new(uv_node.outputs["UV"], image_node.inputs["Vector"])
+        if input_name == "Normal":
+            normal_map = tree.nodes.new("ShaderNodeNormalMap")
+            normal_map.uv_map = ATLAS_UV_LAYER
+            normal_map.location = (-300, -300 * offset)
+            tree.links.new(image_node.outputs["Color"], normal_map.inputs["Color"])
+            tree.links.new(normal_map.outputs["Normal"], target)
+        else:
+            tree.links.new(image_node.outputs["Color"], target)
+
+    _remove_dangling_nodes(tree)
+    return baked
+
+
+@core_tracing.traced("bake.outfit", "bake")
+def bake_outfit(
+    garments: List[bpy.types.Object],
+    name: str,
+    size: int = BAKE_ATLAS_SIZE,
+    workers: Optional[int] = None,
+    lods: Optional[Dict[str, List[bpy.types.Object]]] = None,
+) -> Dict[str, Any]:
+    """衣装一式のプロシージャルテクスチャを1枚のアトラスに焼き、マテリアルを画像参照に差し替える。
+    lods に渡した衣装名 → LODオブジェクトは、UVが元の衣装と同じ空間なので同じタイルを共有する"""
+    # 軽量表示中のマテリアルは布地ノードを繋ぎ直してから焼き、終わったら軽量表示に戻す
+    lite = {
+        mat.as_pointer(): mat
+        for obj in garments
+        if obj is not None and obj.type == "MESH"
+        for mat in _garment_materials(obj)
+        if mat.get(core_materials.SHADER_LOD_TAG) == "VIEWPORT"
+    }
+    for mat in lite.values():
+        core_materials.apply_shader_lod(mat, "FULL")
+    try:
+        result = _bake_outfit(garments, name, size, workers, lods or {})
+    finally:
+        for mat in lite.values():
+            core_materials.apply_shader_lod(mat, "VIEWPORT")
+    if lite:
+        for mat_name in result["materials"]:
+            core_materials.apply_shader_lod(bpy.data.materials[mat_name], "VIEWPORT")
+    return result
+
+
+def _bake_outfit(
+    garments: List[bpy.types.Object],
+    name: str,
+    size: int,
+    workers: Optional[int],
+    lods: Dict[str, List[bpy.types.Object]],
+) -> Dict[str, Any]:
+    plan = []
+    for obj in garments:
+        if obj is None or obj.type != "MESH":
+            continue
+        inputs = sorted(
+            {
+                input_name
+                for mat in _garment_materials(obj)
+                for input_name in procedural_inputs(mat)
+            },
+            key=list(BAKE_CHANNELS).index,
+        )
+        if inputs:
+            plan.append((obj, inputs))
+    if not plan:
+        return {"baked": 0, "atlases": [], "materials": []}
+
+    for obj, _ in plan:
+        ensure_uv(obj)
+    layout = atlas_layout(len(plan), size)
+    tile = layout[0][2]
+    workers = _worker_count(len(plan)) if workers is None else workers
+
+    with tempfile.TemporaryDirectory(prefix="awgp_bake_") as work_dir:
+        if workers > 1 and bpy.app.binary_path:
+            tiles = _bake_in_subprocesses(plan, tile, work_dir, workers)
+        else:
+            tiles = {obj.name: bake_garment(obj, inputs, tile) for obj, inputs in plan}
+
+    atlases = _compose_atlases(name, tiles, plan, layout, size)
+    targets = []
+    for (obj, _), (x, y, tile_size) in zip(plan, layout):
+        for target in [obj, *lods.get(obj.name, [])]:
+            assign_atlas_uvs(target, x, y, tile_size, size)
+            targets.append(target)
+
+    # 同じマテリアルを使う衣装は同じ複製を共有する（UVマップ名が共通なので各自のタイルを参照する）
+    replacements: Dict[int, bpy.types.Material] = {}
+    for obj in targets:
+        for slot in obj.material_slots:
+            mat = slot.material
+            if mat is None or not procedural_inputs(mat):
+                continue
+            if mat.as_pointer() not in replacements:
+                replacements[mat.as_pointer()] = bake_material(mat, atlases)
+            slot.material = replacements[mat.as_pointer()]
+
+    core_tracing.annotate(garments=len(plan), workers=workers, size=size)
+    logger.info(f"アトラスに焼き込み: {len(plan)} 着, {size}px, ワーカー {workers}")
+    return {
+        "baked": len(plan),
+        "atlases": [image.name for image in atlases.values()],
+        "materials": [mat.name for mat in replacements.values()],
+    }
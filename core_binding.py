@@ -0,0 +1,221 @@
+import bpy
+import numpy as np
+from mathutils import Matrix
+from mathutils.bvhtree import BVHTree
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+from . import core_tracing
+
+logger = logging.getLogger(__name__)
+
+# 一度に評価するシェイプキー数（キー数×頂点数×3角の一時配列を抑える）
+SHAPE_KEY_CHUNK = 32
+# 面積がこれ未満の三角形は縮退として最初の角に結び付ける
+DEGENERATE_AREA = 1e-12
+
+# 衣装名 → (シグネチャ, 結合)
+_bindings: Dict[str, Tuple[Tuple[Any, ...], "SurfaceBinding"]] = {}
+
+
+class SurfaceBinding:
+    """衣装の各頂点を素体の最近接三角形に結び付けたもの（重心座標＋法線方向オフセット）"""
+
+    def __init__(self, body: bpy.types.Object, garment: bpy.types.Object):
+        body_coords = read_coordinates(body.data)
+        self.body_triangles = triangle_indices(body.data)
+
+        # 衣装の頂点を素体のローカル座標に揃えて結合する
+        self.to_body = body.matrix_world.inverted() @ garment.matrix_world
+        rest = transform_points(read_coordinates(garment.data), self.to_body)
+        self.rest = rest
+
+        tree = BVHTree.FromPolygons(
+            body_coords.tolist(), self.body_triangles.tolist(), all_triangles=True
+        )
+        nearest = np.empty((len(rest), 3), dtype=np.float64)
+        faces = np.zeros(len(rest), dtype=np.int32)
+        for i, co in enumerate(rest):
+            location, _, index, _ = tree.find_nearest(co)
+            if location is None:
+                nearest[i] = co
+                continue
+            nearest[i] = location
+            faces[i] = index
+
+        self.triangles = self.body_triangles[faces]
+        corners = body_coords[self.triangles].astype(np.float64)
+        self.weights = barycentric_weights(corners, nearest)
+        self.offsets = np.einsum(
+            "ni,ni->n", rest - nearest, triangle_normals(corners[None])[0]
+        )
+        # 最近接点と頂点の距離（オフセット誤差の基準）
+        self.distances = np.linalg.norm(rest - nearest, axis=1)
+
+    def surface_points(self, coords: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """素体の頂点座標（キー数×頂点数×3）から、結合点と法線オフセット後の位置を返す"""
+        corners = coords[:, self.triangles]
+        points = np.einsum("knji,nj->kni", corners, self.weights)
+        offset_points = points + triangle_normals(corners) * self.offsets[None, :, None]
+        return points, offset_points
+
+
+def read_coordinates(mesh: bpy.types.Mesh) -> np.ndarray:
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    return coords.reshape(-1, 3).astype(np.float64)
+
+
+def triangle_indices(mesh: bpy.types.Mesh) -> np.ndarray:
+    mesh.calc_loop_triangles()
+    triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", triangles)
+    return triangles.reshape(-1, 3)
+
+
+def transform_points(points: np.ndarray, matrix: Matrix) -> np.ndarray:
+    m = np.array(matrix, dtype=np.float64)
+    return points @ m[:3, :3].T + m[:3, 3]
+
+
+def triangle_normals(corners: np.ndarray) -> np.ndarray:
+    """(..., 3角, 3) の三角形の単位法線"""
+    normals = np.cross(
+        corners[..., 1, :] - corners[..., 0, :], corners[..., 2, :] - corners[..., 0, :]
+    )
+    length = np.linalg.norm(normals, axis=-1, keepdims=True)
+    return normals / np.maximum(length, DEGENERATE_AREA)
+
+
+def barycentric_weights(corners: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """三角形上の点の重心座標（縮退三角形は最初の角に全ウェイト）"""
+    v0 = corners[:, 1] - corners[:, 0]
+    v1 = corners[:, 2] - corners[:, 0]
+    v2 = points - corners[:, 0]
+    d00 = np.einsum("ni,ni->n", v0, v0)
+    d01 = np.einsum("ni,ni->n", v0, v1)
+    d11 = np.einsum("ni,ni->n", v1, v1)
+    d20 = np.einsum("ni,ni->n", v2, v0)
+    d21 = np.einsum("ni,ni->n", v2, v1)
+    denom = d00 * d11 - d01 * d01
+    degenerate = np.abs(denom) < DEGENERATE_AREA
+    denom[degenerate] = 1.0
+
+    v = (d11 * d20 - d01 * d21) / denom
+    w = (d00 * d21 - d01 * d20) / denom
+    weights = np.clip(np.stack([1.0 - v - w, v, w], axis=1), 0.0, 1.0)
+    weights[degenerate] = (1.0, 0.0, 0.0)
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+def _binding_signature(
+    body: bpy.types.Object, garment: bpy.types.Object
+) -> Tuple[Any, ...]:
+    return (
+        body.name,
+        body.data.as_pointer(),
+        garment.data.as_pointer(),
+        len(body.data.vertices),
+        len(garment.data.vertices),
+        hash(read_coordinates(body.data).tobytes()),
+        hash(read_coordinates(garment.data).tobytes()),
+        tuple(map(tuple, body.matrix_world)),
+        tuple(map(tuple, garment.matrix_world)),
+    )
+
+
+@core_tracing.traced("surface_binding", "post")
+def surface_binding(
+    body: bpy.types.Object, garment: bpy.types.Object
+) -> SurfaceBinding:
+    """キャッシュ済みの結合を返す（どちらかの形状・配置が変わったら結合し直す）"""
+    signature = _binding_signature(body, garment)
+    cached = _bindings.get(garment.name)
+    if cached is not None and cached[0] == signature:
+        core_tracing.annotate(cached=True)
+        return cached[1]
+
+    binding = SurfaceBinding(body, garment)
+    _bindings[garment.name] = (signature, binding)
+    core_tracing.annotate(cached=False, vertices=len(binding.rest))
+    return binding
+
+
+def invalidate_bindings(garment_name: Optional[str] = None) -> None:
+    if garment_name is None:
+        _bindings.clear()
+    else:
+        _bindings.pop(garment_name, None)
+
+
+def _key_coordinates(mesh: bpy.types.Mesh, keys: List[Any]) -> np.ndarray:
+    coords = np.empty((len(keys), len(mesh.vertices) * 3), dtype=np.float32)
+    for row, key in zip(coords, keys):
+        key.data.foreach_get("co", row)
+    return coords.reshape(len(keys), -1, 3).astype(np.float64)
+
+
+@core_tracing.traced("shape_key_transfer", "post")
+def transfer_shape_keys(
+    body: bpy.types.Object, garment: bpy.types.Object
+) -> Dict[str, float]:
+    """素体の全シェイプキーを表面結合で衣装に転送し、キーごとの最大誤差を返す。
+    誤差は変形後の素体表面から衣装頂点までの距離が休止状態からどれだけずれたか"""
+    if body.data.shape_keys is None or garment.type != "MESH":
+        return {}
+
+    body_keys = list(body.data.shape_keys.key_blocks)
+    reference = body.data.shape_keys.reference_key
+    binding = surface_binding(body, garment)
+
+    # 衣装の現在形状を基準キーにし、コピー元から残った古いキーは作り直す
+    garment.shape_key_clear()
+    basis = garment.shape_key_add(name=reference.name, from_mix=False)
+    rest = read_coordinates(garment.data)
+    to_garment = np.array(binding.to_body.inverted(), dtype=np.float64)[:3, :3]
+    key_index = {key.name: i for i, key in enumerate(body_keys)}
+    reference_index = key_index[reference.name]
+
+    errors: Dict[str, float] = {}
+    written = {reference.name: basis}
+    for start in range(0, len(body_keys), SHAPE_KEY_CHUNK):
+        chunk = np.arange(start, min(start + SHAPE_KEY_CHUNK, len(body_keys)))
+        chunk = chunk[chunk != reference_index]
+        if not chunk.size:
+            continue
+        coords = _key_coordinates(
+            body.data, [reference] + [body_keys[i] for i in chunk]
+        )
+        points, moved = binding.surface_points(coords)
+
+        # 基準キーからの移動量を衣装の休止形状に足す。相対キーは衣装側でも同じ相対関係に
+        # 繋ぐので、Blender が評価するキー同士の差は素体の差と一致する
+        deltas = moved[1:] - moved[:1]
+        drift = np.abs(
+            np.linalg.norm(binding.rest + deltas - points[1:], axis=2)
+            - binding.distances
+        )
+        for i, delta, key_drift in zip(chunk, deltas, drift):
+            source = body_keys[i]
+            key = garment.shape_key_add(name=source.name, from_mix=False)
+            key.data.foreach_set(
+                "co", (rest + delta @ to_garment.T).astype(np.float32).ravel()
+            )
+            key.value = source.value
+            key.slider_min = source.slider_min
+            key.slider_max = source.slider_max
+            key.mute = source.mute
+            if source.vertex_group in garment.vertex_groups:
+                key.vertex_group = source.vertex_group
+            written[source.name] = key
+            errors[source.name] = float(key_drift.max()) if key_drift.size else 0.0
+
+    for source in body_keys:
+        if source.name != reference.name:
+            written[source.name].relative_key = written[source.relative_key.name]
+
+    worst = max(errors.values(), default=0.0)
+    core_tracing.annotate(keys=len(errors), max_error=worst)
+    logger.info(
+        f"シェイプキーを転送: {garment.name} ← {body.name} ({len(errors)}件, 最大誤差 {worst:.6f})"
+    )
+    return errors
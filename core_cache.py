@@ -0,0 +1,340 @@
+import bpy
+import sys
+import json
+import hashlib
+import numpy as np
+from collections import OrderedDict
+from mathutils import Matrix
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+from . import core_tracing, core_utils
+
+logger = logging.getLogger(__name__)
+
+# 生成形状に影響するプロパティ（マテリアル・リギングなどのポスト処理は含めない）
+CACHE_KEY_PROPERTIES = (
+    "wear_type",
+    "quality_level",
+    "tight_fit",
+    "thickness",
+    "sock_length",
+    "glove_fingers",
+    "skirt_length",
+    "pleat_count",
+    "pleat_depth",
+    "skirt_segments",
+    "skirt_rings",
+    "enable_cloth_sim",
+    "enable_edge_smoothing",
+    "progressive_fitting",
+    "preserve_shapekeys",
+    "use_vertex_groups",
+    "min_weight",
+    "target_triangles",
+    "preview_mode",
+    "preview_triangles",
+)
+MODIFIER_SETTINGS = {
+    "SUBSURF": ("levels", "render_levels"),
+}
+CLOTH_SETTINGS = ("quality", "vertex_group_mass")
+# 汎用属性の型 → (foreach のキー, 要素あたりの成分数, dtype)。文字列属性は対象外
+ATTRIBUTE_LAYOUTS = {
+    "FLOAT": ("value", 1, np.float32),
+    "INT": ("value", 1, np.int32),
+    "INT8": ("value", 1, np.int8),
+    "BOOLEAN": ("value", 1, bool),
+    "FLOAT2": ("vector", 2, np.float32),
+    "INT32_2D": ("value", 2, np.int32),
+    "FLOAT_VECTOR": ("vector", 3, np.float32),
+    "FLOAT_COLOR": ("color", 4, np.float32),
+    "BYTE_COLOR": ("color", 4, np.float32),
+    "QUATERNION": ("value", 4, np.float32),
+}
+
+_entries: "OrderedDict[str, CachedGarment]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+class CachedGarment:
+    """生成済み衣装メッシュのバッファ一式"""
+
+    def __init__(self, garment: bpy.types.Object):
+        mesh = garment.data
+        self.name = garment.name
+
+        self.vertices = _read(mesh.vertices, "co", len(mesh.vertices) * 3, np.float32)
+        self.edges = _read(mesh.edges, "vertices", len(mesh.edges) * 2, np.int32)
+        self.seams = _read(mesh.edges, "use_seam", len(mesh.edges), bool)
+        self.loop_vertices = _read(
+            mesh.loops, "vertex_index", len(mesh.loops), np.int32
+        )
+        self.loop_edges = _read(mesh.loops, "edge_index", len(mesh.loops), np.int32)
+        self.loop_starts = _read(
+            mesh.polygons, "loop_start", len(mesh.polygons), np.int32
+        )
+        self.loop_totals = _read(
+            mesh.polygons, "loop_total", len(mesh.polygons), np.int32
+        )
+        self.smooth = _read(mesh.polygons, "use_smooth", len(mesh.polygons), bool)
+
+        self.uv_layers = {
+            layer.name: _read(layer.data, "uv", len(mesh.loops) * 2, np.float32)
+            for layer in mesh.uv_layers
+        }
+        self.attributes = self._capture_attributes(mesh)
+        self.matrix_world = [list(row) for row in garment.matrix_world]
+        self.vertex_groups = self._capture_vertex_groups(garment)
+        self.shape_keys = self._capture_shape_keys(mesh)
+        self.modifiers = self._capture_modifiers(garment)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [
+            self.vertices,
+            self.edges,
+            self.seams,
+            self.loop_vertices,
+            self.loop_edges,
+            self.loop_starts,
+            self.loop_totals,
+            self.smooth,
+            *self.uv_layers.values(),
+            *(values for _, _, _, values in self.attributes),
+        ]
+        arrays += [
+            a for _, indices, weights in self.vertex_groups for a in (indices, weights)
+        ]
+        arrays += [coords for _, _, _, coords in self.shape_keys]
+        return sum(a.nbytes for a in arrays)
+
+    def _capture_attributes(
+        self, mesh: bpy.types.Mesh
+    ) -> List[Tuple[str, str, str, np.ndarray]]:
+        """UV・位置などの必須属性以外の汎用属性（プリーツの sharp_edge など）"""
+        sizes = {
+            "POINT": len(mesh.vertices),
+            "EDGE": len(mesh.edges),
+            "FACE": len(mesh.polygons),
+            "CORNER": len(mesh.loops),
+        }
+        attributes = []
+        for attribute in mesh.attributes:
+            layout = ATTRIBUTE_LAYOUTS.get(attribute.data_type)
+            if (
+                layout is None
+                or attribute.domain not in sizes
+                or attribute.is_internal
+                or attribute.is_required
+                or attribute.name in mesh.uv_layers
+            ):
+                continue
+            key, components, dtype = layout
+            values = _read(
+                attribute.data, key, sizes[attribute.domain] * components, dtype
+            )
+            attributes.append(
+                (attribute.name, attribute.data_type, attribute.domain, values)
+            )
+        return attributes
+
+    def _capture_vertex_groups(
+        self, garment: bpy.types.Object
+    ) -> List[Tuple[str, np.ndarray, np.ndarray]]:
+        members: Dict[int, Tuple[List[int], List[float]]] = {
+            vg.index: ([], []) for vg in garment.vertex_groups
+        }
+        for vert in garment.data.vertices:
+            for g in vert.groups:
+                if g.group in members:
+                    members[g.group][0].append(vert.index)
+                    members[g.group][1].append(g.weight)
+
+        return [
+            (
+                vg.name,
+                np.array(members[vg.index][0], dtype=np.int32),
+                np.array(members[vg.index][1], dtype=np.float32),
+            )
+            for vg in garment.vertex_groups
+        ]
+
+    def _capture_shape_keys(
+        self, mesh: bpy.types.Mesh
+    ) -> List[Tuple[str, str, float, np.ndarray]]:
+        if not mesh.shape_keys:
+            return []
+        return [
+            (
+                key.name,
+                key.relative_key.name,
+                key.value,
+                _read(key.data, "co", len(mesh.vertices) * 3, np.float32),
+            )
+            for key in mesh.shape_keys.key_blocks
+        ]
+
+    def _capture_modifiers(self, garment: bpy.types.Object) -> List[Dict[str, Any]]:
+        modifiers = []
+        for mod in garment.modifiers:
+            settings = {
+                attr: getattr(mod, attr) for attr in MODIFIER_SETTINGS.get(mod.type, ())
+            }
+            if mod.type == "CLOTH":
+                settings = {
+                    attr: getattr(mod.settings, attr) for attr in CLOTH_SETTINGS
+                }
+            modifiers.append({"name": mod.name, "type": mod.type, "settings": settings})
+        return modifiers
+
+    def instantiate(self) -> bpy.types.Object:
+        """バッファから一括でメッシュを復元"""
+        mesh = bpy.data.meshes.new(self.name)
+        mesh.vertices.add(len(self.vertices) // 3)
+        mesh.vertices.foreach_set("co", self.vertices)
+        mesh.edges.add(len(self.edges) // 2)
+        mesh.edges.foreach_set("vertices", self.edges)
+        mesh.edges.foreach_set("use_seam", self.seams)
+        mesh.loops.add(len(self.loop_vertices))
+        mesh.loops.foreach_set("vertex_index", self.loop_vertices)
+        mesh.loops.foreach_set("edge_index", self.loop_edges)
+        mesh.polygons.add(len(self.loop_starts))
+        mesh.polygons.foreach_set("loop_start", self.loop_starts)
+        if bpy.app.version < (4, 0, 0):
+            mesh.polygons.foreach_set("loop_total", self.loop_totals)
+        mesh.polygons.foreach_set("use_smooth", self.smooth)
+
+        for name, uv in self.uv_layers.items():
+            mesh.uv_layers.new(name=name).data.foreach_set("uv", uv)
+        for name, data_type, domain, values in self.attributes:
+            # use_smooth から作られる sharp_face などは既存の属性に上書きする
+            attribute = mesh.attributes.get(name) or mesh.attributes.new(
+                name, data_type, domain
+            )
+            attribute.data.foreach_set(ATTRIBUTE_LAYOUTS[data_type][0], values)
+        mesh.update()
+
+        obj = bpy.data.objects.new(self.name, mesh)
+        bpy.context.collection.objects.link(obj)
+        obj.matrix_world = Matrix(self.matrix_world)
+
+        for name, indices, weights in self.vertex_groups:
+            vg = obj.vertex_groups.new(name=name)
+            # 同じウェイトの頂点をまとめて追加し、add呼び出し回数を抑える
+            for weight in np.unique(weights):
+                vg.add(indices[weights == weight].tolist(), float(weight), "REPLACE")
+
+        for name, _, _, _ in self.shape_keys:
+            obj.shape_key_add(name=name, from_mix=False)
+        if self.shape_keys:
+            key_blocks = mesh.shape_keys.key_blocks
+            for name, relative_name, value, coords in self.shape_keys:
+                key = key_blocks[name]
+                key.data.foreach_set("co", coords)
+                key.relative_key = key_blocks[relative_name]
+                key.value = value
+
+        for spec in self.modifiers:
+            mod = obj.modifiers.new(name=spec["name"], type=spec["type"])
+            target = mod.settings if spec["type"] == "CLOTH" else mod
+            for attr, value in spec["settings"].items():
+                setattr(target, attr, value)
+
+        return obj
+
+
+def _read(collection, attr: str, size: int, dtype) -> np.ndarray:
+    buffer = np.empty(size, dtype=dtype)
+    collection.foreach_get(attr, buffer)
+    return buffer
+
+
+def body_fingerprint(obj: bpy.types.Object) -> str:
+    """素体の形状・トポロジ・頂点ウェイト・変換行列からハッシュを作る。
+    ウェイトはキャッシュ済みの行列ではなく毎回読み直した値を使う（古いウェイトで一致させない）"""
+    mesh = obj.data
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_read(mesh.vertices, "co", len(mesh.vertices) * 3, np.float32))
+    digest.update(_read(mesh.loops, "vertex_index", len(mesh.loops), np.int32))
+    digest.update(_read(mesh.polygons, "loop_start", len(mesh.polygons), np.int32))
+    digest.update(np.array(obj.matrix_world, dtype=np.float32).tobytes())
+    digest.update("|".join(vg.name for vg in obj.vertex_groups).encode("utf-8"))
+    for array in core_utils.read_vertex_weights(obj):
+        digest.update(array.tobytes())
+
+    if mesh.shape_keys:
+        for key in mesh.shape_keys.key_blocks:
+            digest.update(key.name.encode("utf-8"))
+            digest.update(_read(key.data, "co", len(mesh.vertices) * 3, np.float32))
+
+    return digest.hexdigest()
+
+
+def cache_key(props) -> str:
+    addon = sys.modules.get(__package__)
+    version = getattr(addon, "bl_info", {}).get("version", ())
+    payload = {
+        "body": props.base_body.name,
+        "fingerprint": body_fingerprint(props.base_body),
+        "ai_settings": props.get_ai_settings(),
+        "params": {name: getattr(props, name) for name in CACHE_KEY_PROPERTIES},
+        "version": list(version),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@core_tracing.traced("cache.lookup", "cache")
+def lookup(key: str) -> Optional[bpy.types.Object]:
+    """キャッシュにあれば衣装を復元して返す"""
+    entry = _entries.get(key)
+    if entry is None:
+        _stats["misses"] += 1
+        core_tracing.annotate(hit=False)
+        return None
+
+    _entries.move_to_end(key)
+    _stats["hits"] += 1
+    garment = entry.instantiate()
+    core_tracing.annotate(hit=True, vertices=len(garment.data.vertices))
+    logger.info(f"キャッシュから衣装を復元: {garment.name}")
+    return garment
+
+
+@core_tracing.traced("cache.store", "cache")
+def store(key: str, garment: bpy.types.Object, memory_cap_mb: int) -> bool:
+    """生成結果を保存し、上限を超えたら古いものから破棄"""
+    cap_bytes = memory_cap_mb * 1024 * 1024
+    if cap_bytes <= 0 or garment is None or garment.type != "MESH":
+        return False
+
+    try:
+        entry = CachedGarment(garment)
+    except Exception as e:
+        logger.warning(f"キャッシュ保存をスキップ: {e}")
+        return False
+
+    if entry.nbytes > cap_bytes:
+        logger.debug(f"キャッシュ上限を超えるため保存しません: {entry.nbytes} bytes")
+        return False
+
+    _entries[key] = entry
+    _entries.move_to_end(key)
+    while cache_size_bytes() > cap_bytes:
+        _entries.popitem(last=False)
+        _stats["evictions"] += 1
+
+    core_tracing.annotate(bytes=entry.nbytes, entries=len(_entries))
+    return True
+
+
+def cache_size_bytes() -> int:
+    return sum(entry.nbytes for entry in _entries.values())
+
+
+def cache_stats() -> Dict[str, int]:
+    return {**_stats, "entries": len(_entries), "bytes": cache_size_bytes()}
+
+
+def clear_cache() -> None:
+    _entries.clear()
@@ -0,0 +1,186 @@
+import bpy
+import re
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 削除は参照する側から順に行う（オブジェクト → メッシュ → マテリアル → ノードグループ → 画像）
+TRACKED_COLLECTIONS = ("objects", "meshes", "materials", "node_groups", "images")
+GARMENT_TAG = "awgp_garment"
+GARMENT_BODY_TAG = "awgp_base_body"
+GARMENT_TYPE_TAG = "awgp_wear_type"
+# 衣装と一緒に作られても衣装ではない補助オブジェクト（衝突プロキシなど）
+HELPER_TAG = "awgp_helper"
+ADDON_DATA_PREFIX = "AWGP_"
+
+
+class DatablockTransaction:
+    """生成1回分で作成されたデータブロックとモディファイアを追跡する"""
+
+    def __init__(self, label: str = "generation"):
+        self.label = label
+        self.active = False
+        self._baseline: Dict[str, Set[int]] = {}
+        self._modifier_baseline: Dict[int, Set[str]] = {}
+
+    def __enter__(self) -> "DatablockTransaction":
+        return self.begin()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_type is not None and self.active:
+            self.rollback()
+        return False
+
+    def begin(self) -> "DatablockTransaction":
+        self._baseline = {
+            name: {block.as_pointer() for block in getattr(bpy.data, name)}
+            for name in TRACKED_COLLECTIONS
+        }
+        self._modifier_baseline = {
+            obj.as_pointer(): {mod.name for mod in obj.modifiers}
+            for obj in bpy.data.objects
+        }
+        self.active = True
+        return self
+
+    def created(self, name: str) -> List[bpy.types.ID]:
+        known = self._baseline.get(name, set())
+        return [
+            block
+            for block in getattr(bpy.data, name)
+            if block.as_pointer() not in known
+        ]
+
+    def added_modifiers(self) -> List[Tuple[bpy.types.Object, bpy.types.Modifier]]:
+        """既存オブジェクト（素体など）に追加されたモディファイア"""
+        added = []
+        for obj in bpy.data.objects:
+            known = self._modifier_baseline.get(obj.as_pointer())
+            if known is None:
+                continue
+            added.extend((obj, mod) for mod in obj.modifiers if mod.name not in known)
+        return added
+
+    def counts(self) -> Dict[str, int]:
+        counts = {name: len(self.created(name)) for name in TRACKED_COLLECTIONS}
+        counts["modifiers"] = len(self.added_modifiers())
+        return counts
+
+    def rollback(self) -> int:
+        """このトランザクションで作成したものを全て破棄"""
+        if not self.active:
+            return 0
+
+        removed = 0
+        for obj, mod in self.added_modifiers():
+            obj.modifiers.remove(mod)
+            removed += 1
+
+        for name in TRACKED_COLLECTIONS:
+            collection = getattr(bpy.data, name)
+            for block in self.created(name):
+                collection.remove(block)
+                removed += 1
+
+        self.active = False
+        logger.info(f"データブロックをロールバック: {self.label} ({removed}件)")
+        return removed
+
+    def commit(
+        self, garment: bpy.types.Object, props, replace_previous: bool = False
+    ) -> Dict[str, int]:
+        """生成物にタグを付けて確定し、置き換え対象の古い衣装を回収"""
+        # シーンにリンクされていない作業用オブジェクト（プロキシ素体など）と補助オブジェクトは対象外
+        created_objects = [
+            obj
+            for obj in self.created("objects")
+            if obj.users_collection and not obj.get(HELPER_TAG)
+        ]
+        for obj in created_objects:
+            if obj.type == "MESH":
+                tag_garment(obj, props)
+
+        counts = self.counts()
+        self.active = False
+
+        if replace_previous:
+            keep = {obj.as_pointer() for obj in created_objects}
+            counts["superseded"] = collect_superseded(
+                props.base_body, props.wear_type, keep
+            )
+            # 古い衣装が消えたので ".001" などの重複回避サフィックスを外す
+            garment.name = re.sub(r"\.\d{3,}$", "", garment.name)
+
+        logger.info(f"データブロック確定: {self.label} {counts}")
+        return counts
+
+
+def tag_garment(obj: bpy.types.Object, props) -> None:
+    obj[GARMENT_TAG] = True
+    obj[GARMENT_BODY_TAG] = props.base_body.name if props.base_body else ""
+    obj[GARMENT_TYPE_TAG] = props.wear_type
+
+
+def remove_object(obj: Optional[bpy.types.Object]) -> None:
+    """オブジェクトを削除し、他から参照されなくなったメッシュも削除"""
+    if obj is None or obj.name not in bpy.data.objects:
+        return
+    data = obj.data
+    bpy.data.objects.remove(obj, do_unlink=True)
+    if isinstance(data, bpy.types.Mesh) and data.users == 0:
+        bpy.data.meshes.remove(data)
+
+
+def collect_superseded(
+    base_body: Optional[bpy.types.Object], wear_type: str, keep: Set[int]
+) -> int:
+    """同じ素体・衣装タイプの過去の生成結果（LODを含む）を削除"""
+    if base_body is None:
+        return 0
+
+    superseded = [
+        obj
+        for obj in bpy.data.objects
+        if obj.get(GARMENT_TAG)
+        and obj.get(GARMENT_BODY_TAG) == base_body.name
+        and obj.get(GARMENT_TYPE_TAG) == wear_type
+        and obj.as_pointer() not in keep
+    ]
+    for obj in superseded:
+        remove_object(obj)
+
+    if superseded:
+        purge_orphans()
+        logger.info(f"置き換えられた衣装を削除: {len(superseded)}件")
+    return len(superseded)
+
+
+def purge_orphans() -> Dict[str, int]:
+    """参照されていないアドオン由来のマテリアル・ノードグループ・画像を削除"""
+    removed = {}
+    for name in ("materials", "node_groups", "images"):
+        collection = getattr(bpy.data, name)
+        orphans = [
+            block
+            for block in collection
+            if block.users == 0
+            and not block.use_fake_user
+            and block.name.startswith(ADDON_DATA_PREFIX)
+        ]
+        for block in orphans:
+            collection.remove(block)
+        removed[name] = len(orphans)
+    return removed
+
+
+def datablock_counts() -> Dict[str, int]:
+    """バッチ実行でのリーク監視用に各データブロック数と未参照数を返す"""
+    counts = {name: len(getattr(bpy.data, name)) for name in TRACKED_COLLECTIONS}
+    counts["orphans"] = sum(
+        1
+        for name in TRACKED_COLLECTIONS[1:]
+        for block in getattr(bpy.data, name)
+        if block.users == 0 and not block.use_fake_user
+    )
+    return counts
@@ -1,13 +1,20 @@
 import bpy
 import bmesh
-import mathutils
 import math
 import numpy as np
 import time
 from mathutils import Vector, Matrix
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Callable, Iterator
 import logging
-from . import core_utils
+from . import (
+    core_binding,
+    core_utils,
+    core_tracing,
+    core_datablocks,
+    core_proxy,
+    core_skirt,
+    core_topology,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +31,15 @@ class VertexGroupError(AWGProException):
     pass
 
 
+# ミトン変換の閾値（距離はすべて手の長さに対する比率）
+MITTEN_FINGER_WEIGHT = 0.5
+MITTEN_FINGER_START = 0.55
+MITTEN_MERGE_RATIO = 0.08
+MITTEN_ROOT_CAP_DOT = 0.7
+# bmesh で頂点を削除した後も素体のウェイト行列を引けるよう、元の頂点番号を持たせる属性
+SOURCE_INDEX_ATTRIBUTE = "AWGP_SourceIndex"
+
+
 class GeometryQualityValidator:
     """組み込み幾何学品質検証システム"""
 
@@ -38,6 +54,7 @@ class GeometryQualityValidator:
             "degenerate_face_ratio_threshold": 0.05,
         }
 
+    @core_tracing.traced("validate_mesh", "validation")
     def validate_mesh_comprehensive(
         self, obj: bpy.types.Object, context: str = ""
     ) -> Dict[str, Any]:
@@ -54,6 +71,11 @@ class GeometryQualityValidator:
 
         # 基本統計の収集
         basic_stats = self._collect_basic_statistics(mesh)
+        core_tracing.annotate(
+            context=context,
+            vertices=basic_stats["vertex_count"],
+            faces=basic_stats["face_count"],
+        )
         logger.info(
             f"📊 Basic stats: {basic_stats['vertex_count']}v, {basic_stats['face_count']}f, {basic_stats['edge_count']}e"
         )
@@ -128,29 +150,26 @@ class GeometryQualityValidator:
 
         euler_characteristic = V - E + F
 
-        # エッジ-面の関係性チェック
-        edge_face_count = {}
-        for poly in mesh.polygons:
-            for i in range(len(poly.vertices)):
-                j = (i + 1) % len(poly.vertices)
-                edge = tuple(sorted([poly.vertices[i], poly.vertices[j]]))
-                edge_face_count[edge] = edge_face_count.get(edge, 0) + 1
+        # エッジ-面の関係性チェック（ループのエッジ番号から一括集計）
+        loop_edges = np.empty(len(mesh.loops), dtype=np.int64)
+        mesh.loops.foreach_get("edge_index", loop_edges)
+        edge_face_count = np.bincount(loop_edges, minlength=E)
 
         # 多様体性チェック
-        is_manifold = all(count <= 2 for count in edge_face_count.values())
-        boundary_edges = [edge for edge, count in edge_face_count.items() if count == 1]
-        non_manifold_edges = [
-            edge for edge, count in edge_face_count.items() if count > 2
-        ]
+        boundary_edge_count = int(np.count_nonzero(edge_face_count == 1))
+        non_manifold_edge_count = int(np.count_nonzero(edge_face_count > 2))
 
         return {
             "euler_characteristic": euler_characteristic,
-            "is_manifold": is_manifold,
-            "is_closed": len(boundary_edges) == 0,
-            "boundary_edge_count": len(boundary_edges),
-            "non_manifold_edge_count": len(non_manifold_edges),
+            "is_manifold": non_manifold_edge_count == 0,
+            "is_closed": boundary_edge_count == 0,
+            "boundary_edge_count": boundary_edge_count,
+            "boundary_loop_count": len(core_topology.boundary_loops(mesh))
+            if boundary_edge_count
+            else 0,
+            "non_manifold_edge_count": non_manifold_edge_count,
             "genus": max(0, (2 - euler_characteristic) // 2)
-            if len(boundary_edges) == 0
+            if boundary_edge_count == 0
             else None,
         }
 
@@ -347,12 +366,36 @@ class GeometryQualityValidator:
         return recommendations
 
 
+class PreviewQualityValidator(GeometryQualityValidator):
+    """プレビュー用の軽量検証（基本統計のみ）"""
+
+    def validate_mesh_comprehensive(
+        self, obj: bpy.types.Object, context: str = ""
+    ) -> Dict[str, Any]:
+        if not obj or obj.type != "MESH":
+            return {
+                "valid": False,
+                "error": "Invalid mesh object",
+                "overall_score": 0.0,
+            }
+
+        basic_stats = self._collect_basic_statistics(obj.data)
+        valid = basic_stats["vertex_count"] > 0 and basic_stats["face_count"] > 0
+        return {
+            "valid": valid,
+            "overall_score": 100.0 if valid else 0.0,
+            "basic_stats": basic_stats,
+            "preview": True,
+        }
+
+
 class VisualValidationLogger:
     """見た目検証とログ出力システム"""
 
     def __init__(self):
         self.validation_history = []
 
+    @core_tracing.traced("validate_visual", "validation")
     def validate_visual_appearance(
         self,
         original_obj: bpy.types.Object,
@@ -481,8 +524,9 @@ class VisualValidationLogger:
         """形状の整合性検証"""
         mesh = obj.data
 
-        # 基本的な形状チェック
-        has_holes = self._detect_holes(mesh)
+        # 基本的な形状チェック（開口部として分類できない小さな境界ループが穴）
+        openings = core_topology.classify_boundary_loops(mesh)
+        has_holes = any(info["type"] == "hole" for info in openings)
         has_strange_protrusions = self._detect_protrusions(mesh)
         shape_smoothness = self._calculate_shape_smoothness(mesh)
 
@@ -499,6 +543,7 @@ class VisualValidationLogger:
         return {
             "valid": shape_valid,
             "has_holes": has_holes,
+            "openings": [info["type"] for info in openings],
             "has_protrusions": has_strange_protrusions,
             "smoothness": shape_smoothness,
             "clothing_like": is_clothing_like,
@@ -584,19 +629,6 @@ class VisualValidationLogger:
         """表面積計算"""
         return sum(poly.area for poly in obj.data.polygons)
 
-    def _detect_holes(self, mesh: bpy.types.Mesh) -> bool:
-        """穴の検出"""
-        # 境界エッジの検出による穴の判定
-        edge_face_count = {}
-        for poly in mesh.polygons:
-            for i in range(len(poly.vertices)):
-                j = (i + 1) % len(poly.vertices)
-                edge = tuple(sorted([poly.vertices[i], poly.vertices[j]]))
-                edge_face_count[edge] = edge_face_count.get(edge, 0) + 1
-
-        boundary_edges = [edge for edge, count in edge_face_count.items() if count == 1]
-        return len(boundary_edges) > 0
-
     def _detect_protrusions(self, mesh: bpy.types.Mesh) -> bool:
         """異常な突起の検出"""
         if len(mesh.vertices) < 4:
@@ -663,20 +695,28 @@ class VisualValidationLogger:
         """プリーツ形状の解析"""
         mesh = obj.data
 
-        # シャープエッジによるプリーツ検出
-        sharp_edges = [e for e in mesh.edges if e.use_edge_sharp]
-        estimated_pleats = max(1, len(sharp_edges) // 2)
+        # シャープな折り目の本数によるプリーツ検出
+        estimated_pleats, sharp_count = core_topology.estimate_pleat_count(mesh)
+
+        # 裾の半径変位の周波数解析（細分化しても推定数が変わらない）
+        spectrum = core_topology.analyze_hem_pleats(mesh)
+        if spectrum is not None and spectrum["pleat_count"] > 0:
+            estimated_pleats = spectrum["pleat_count"]
 
         pleat_regularity = 1.0 - abs(estimated_pleats - expected_pleats) / max(
             expected_pleats, 1
         )
+        if spectrum is not None:
+            pleat_regularity *= spectrum["regularity"]
 
         return {
-            "pleat_detected": len(sharp_edges) > 0,
+            "pleat_detected": sharp_count > 0
+            or (spectrum is not None and spectrum["pleat_count"] > 0),
             "estimated_pleat_count": estimated_pleats,
             "expected_pleat_count": expected_pleats,
             "pleat_regularity": max(0.0, pleat_regularity),
-            "sharp_edge_count": len(sharp_edges),
+            "sharp_edge_count": sharp_count,
+            "spectrum": spectrum,
         }
 
     def _analyze_finger_geometry(
@@ -803,19 +843,35 @@ class UltimateAIWearGenerator:
 
     def __init__(self, props):
         self.props = props
-        self.base_obj = props.base_body
+        self.preview = props.preview_mode
+        self.base_obj = (
+            core_proxy.get_proxy_body(props.base_body, props.preview_triangles)
+            if self.preview
+            else props.base_body
+        )
         self.wear_type = props.wear_type
         self.quality = props.quality_level
         self.ai_settings = props.get_ai_settings()
         self.generation_start_time = time.time()
 
         # 品質検証システム
-        self.geometry_validator = GeometryQualityValidator()
+        self.geometry_validator = (
+            PreviewQualityValidator() if self.preview else GeometryQualityValidator()
+        )
         self.visual_validator = VisualValidationLogger()
 
         # 生成状態追跡
         self.generation_stages = []
         self.quality_checkpoints = []
+        self.lod_objects = []
+        self.garment = None
+        self.completed = False
+        self._stage_span = None
+
+        # 呼び出し側のトレーサーがあれば同じトレースにネストする
+        self.tracer = core_tracing.active_tracer() or core_tracing.Tracer(
+            f"AdaptiveWear {self.wear_type}"
+        )
 
         logger.info(
             f"🚀 Ultimate AI Wear Generator initialized for {self.wear_type} (Quality: {self.quality})"
@@ -824,46 +880,94 @@ class UltimateAIWearGenerator:
     def generate(self) -> Optional[bpy.types.Object]:
         """最高品質メッシュ生成"""
         try:
-            self._log_generation_start()
+            for _ in self.iter_stages():
+                pass
+            return self.garment if self.completed else None
 
-            # Stage 1: 前処理と検証
-            self._add_stage("preprocessing", "Preprocessing and validation")
-            if not self._validate_prerequisites():
-                return None
-
-            # Stage 2: ベースメッシュ生成
-            self._add_stage("base_mesh", "Base mesh generation")
-            garment = self._generate_base_mesh_with_validation()
-            if not garment:
-                return None
-
-            # Stage 3: 形状調整とフィッティング
-            self._add_stage("fitting", "Shape adjustment and fitting")
-            if not self._apply_intelligent_fitting(garment):
-                return None
-
-            # Stage 4: 品質向上処理
-            self._add_stage("enhancement", "Quality enhancement")
-            if not self._apply_quality_enhancements(garment):
-                return None
+        except Exception as e:
+            logger.error(f"❌ Ultimate generation failed: {str(e)}")
+            return None
 
-            # Stage 5: 最終検証と調整
-            self._add_stage("finalization", "Final validation and adjustment")
-            if not self._finalize_with_validation(garment):
-                return None
+    @property
+    def stage_count(self) -> int:
+        return len(self._stage_plan())
+
+    def iter_stages(self) -> Iterator[Dict[str, Any]]:
+        """ステージを1つずつ実行し、完了したステージ情報を返す"""
+        self._log_generation_start()
+
+        for stage_id, description, handler in self._stage_plan():
+            # モーダル実行ではステージ間で制御が戻るため、ステージごとに有効化する
+            with core_tracing.activate(self.tracer):
+                self._add_stage(stage_id, description)
+                success = handler()
+                self._close_stage_span()
+            if not success:
+                return
+            yield self.generation_stages[-1]
+
+        if self.preview:
+            core_proxy.mark_preview(self.garment, self.props)
+            logger.info(
+                f"👀 Preview generated in {(time.time() - self.generation_start_time) * 1000:.0f}ms: {self.garment.name}"
+            )
+            self.completed = True
+            return
 
-            # 視覚的検証
+        # 視覚的検証
+        with core_tracing.activate(self.tracer):
             visual_result = self.visual_validator.validate_visual_appearance(
-                self.base_obj, garment, self.wear_type, self.ai_settings
+                self.base_obj, self.garment, self.wear_type, self.ai_settings
             )
 
-            self._log_generation_completion(garment, visual_result)
+        self._log_generation_completion(self.garment, visual_result)
+        self.completed = True
 
-            return garment
+    def _stage_plan(self) -> List[Tuple[str, str, Callable[[], bool]]]:
+        """生成ステージの実行計画"""
+        plan = [
+            # Stage 1: 前処理と検証
+            (
+                "preprocessing",
+                "Preprocessing and validation",
+                self._validate_prerequisites,
+            ),
+            # Stage 2: ベースメッシュ生成
+            ("base_mesh", "Base mesh generation", self._run_base_mesh_stage),
+            # Stage 3: 形状調整とフィッティング
+            (
+                "fitting",
+                "Shape adjustment and fitting",
+                lambda: self._apply_intelligent_fitting(self.garment),
+            ),
+            # Stage 4: 品質向上処理
+            (
+                "enhancement",
+                "Quality enhancement",
+                lambda: self._apply_quality_enhancements(self.garment),
+            ),
+            # Stage 5: 最終検証と調整
+            (
+                "finalization",
+                "Final validation and adjustment",
+                lambda: self._finalize_with_validation(self.garment),
+            ),
+            # Stage 6: ポリゴン予算とLOD
+            (
+                "lod",
+                "Polygon budget and LOD chain",
+                lambda: self._apply_lod_chain(self.garment),
+            ),
+        ]
+        # プレビューは粗い形状の確認用なので予算・LODを省く
+        if self.preview:
+            plan = [stage for stage in plan if stage[0] != "lod"]
+        return plan
 
-        except Exception as e:
-            logger.error(f"❌ Ultimate generation failed: {str(e)}")
-            return None
+    def _run_base_mesh_stage(self) -> bool:
+        """ベースメッシュ生成ステージ"""
+        self.garment = self._generate_base_mesh_with_validation()
+        return self.garment is not None
 
     def _log_generation_start(self):
         """生成開始ログ"""
@@ -883,6 +987,7 @@ class UltimateAIWearGenerator:
             "status": "in_progress",
         }
         self.generation_stages.append(stage_info)
+        self._stage_span = self.tracer.begin(stage_id, "stage", description=description)
         logger.info(f"📍 Stage {len(self.generation_stages)}: {description}")
 
     def _complete_stage(self, success: bool, details: str = ""):
@@ -894,11 +999,23 @@ class UltimateAIWearGenerator:
             stage["duration"] = stage["end_time"] - stage["start_time"]
             stage["details"] = details
 
+            if self._stage_span is not None:
+                self.tracer.end(
+                    self._stage_span, status=stage["status"], details=details
+                )
+                self._stage_span = None
+
             status_emoji = "✅" if success else "❌"
             logger.info(
                 f"{status_emoji} Stage completed in {stage['duration']:.3f}s: {details}"
             )
 
+    def _close_stage_span(self):
+        """_complete_stageを経ずに終了したステージのスパンを閉じる"""
+        if self._stage_span is not None:
+            self.tracer.end(self._stage_span, status="incomplete")
+            self._stage_span = None
+
     def _validate_prerequisites(self) -> bool:
         """前提条件の検証"""
         try:
@@ -1046,8 +1163,7 @@ class UltimateAIWearGenerator:
 
         except Exception as e:
             logger.error(f"❌ Pants generation failed: {e}")
-            if pants_obj.name in bpy.data.objects:
-                bpy.data.objects.remove(pants_obj, do_unlink=True)
+            core_datablocks.remove_object(pants_obj)
             return None
 
     def _generate_tshirt_ultimate(self) -> Optional[bpy.types.Object]:
@@ -1105,8 +1221,7 @@ class UltimateAIWearGenerator:
 
         except Exception as e:
             logger.error(f"❌ T-shirt generation failed: {e}")
-            if tshirt_obj.name in bpy.data.objects:
-                bpy.data.objects.remove(tshirt_obj, do_unlink=True)
+            core_datablocks.remove_object(tshirt_obj)
             return None
 
     def _generate_bra_ultimate(self) -> Optional[bpy.types.Object]:
@@ -1161,8 +1276,7 @@ class UltimateAIWearGenerator:
 
         except Exception as e:
             logger.error(f"❌ Bra generation failed: {e}")
-            if bra_obj.name in bpy.data.objects:
-                bpy.data.objects.remove(bra_obj, do_unlink=True)
+            core_datablocks.remove_object(bra_obj)
             return None
 
     def _generate_socks_ultimate(self) -> Optional[bpy.types.Object]:
@@ -1215,8 +1329,7 @@ class UltimateAIWearGenerator:
 
         except Exception as e:
             logger.error(f"❌ Socks generation failed: {e}")
-            if socks_obj.name in bpy.data.objects:
-                bpy.data.objects.remove(socks_obj, do_unlink=True)
+            core_datablocks.remove_object(socks_obj)
             return None
 
     def _generate_gloves_ultimate(self) -> Optional[bpy.types.Object]:
@@ -1241,6 +1354,10 @@ class UltimateAIWearGenerator:
         bpy.context.collection.objects.link(gloves_obj)
 
         try:
+            source = mesh.attributes.new(SOURCE_INDEX_ATTRIBUTE, "INT", "POINT")
+            source.data.foreach_set(
+                "value", np.arange(len(mesh.vertices), dtype=np.int32)
+            )
             bm = bmesh.new()
             bm.from_mesh(mesh)
 
@@ -1270,6 +1387,7 @@ class UltimateAIWearGenerator:
 
             bm.to_mesh(mesh)
             bm.free()
+            mesh.attributes.remove(mesh.attributes[SOURCE_INDEX_ATTRIBUTE])
 
             core_utils.apply_edge_smoothing(gloves_obj)
 
@@ -1278,28 +1396,19 @@ class UltimateAIWearGenerator:
 
         except Exception as e:
             logger.error(f"❌ Gloves generation failed: {e}")
-            if gloves_obj.name in bpy.data.objects:
-                bpy.data.objects.remove(gloves_obj, do_unlink=True)
+            core_datablocks.remove_object(gloves_obj)
             return None
 
+    @core_tracing.traced("select_vertices", "selection")
     def _ai_select_vertices_enhanced(
         self, bm: bmesh.types.BMesh, groups: list, wear_type: str
     ) -> list:
         """強化AI頂点選択"""
         deform_layer = bm.verts.layers.deform.verify()
-        selected_verts = []
-
-        threshold_map = {
-            "pants": self.ai_settings.get("threshold", 0.3),
-            "tshirt": self.ai_settings.get("tshirt_threshold", 0.1),
-            "bra": self.ai_settings.get("bra_threshold", 0.1),
-            "gloves": self.ai_settings.get("hand_threshold", 0.1),
-            "socks": 0.1
-            * self.props.sock_length
-            * self.ai_settings.get("sock_multiplier", 1.0),
-        }
 
-        threshold = threshold_map.get(wear_type, 0.2)
+        threshold = core_utils.selection_threshold(
+            self.props, self.ai_settings, wear_type
+        )
         logger.debug(
             f"🎯 Using threshold {threshold:.3f} for {wear_type} vertex selection"
         )
@@ -1318,8 +1427,7 @@ class UltimateAIWearGenerator:
             weight_distribution.append(max_weight)
             total_weight += max_weight
 
-            if max_weight > threshold:
-                selected_verts.append(vert)
+        selected_verts = self._clean_selection(bm, weight_distribution, threshold)
 
         # 選択品質の分析
         if weight_distribution:
@@ -1330,6 +1438,12 @@ class UltimateAIWearGenerator:
                 f"📊 Selection analysis: avg_weight={avg_weight:.3f}, selected_ratio={selected_ratio:.3f}"
             )
 
+        core_tracing.annotate(
+            wear_type=wear_type,
+            groups=len(groups),
+            vertices_in=len(bm.verts),
+            selected=len(selected_verts),
+        )
         return list(set(selected_verts))
 
     def _height_based_selection_enhanced(
@@ -1381,11 +1495,10 @@ class UltimateAIWearGenerator:
     ) -> list:
         """強化長さベース選択"""
         deform_layer = bm.verts.layers.deform.verify()
-        min_weight = (
-            0.1 * self.props.sock_length * self.ai_settings.get("sock_multiplier", 1.0)
+        min_weight = core_utils.selection_threshold(
+            self.props, self.ai_settings, "socks"
         )
 
-        selected_verts = []
         weight_stats = []
 
         for vert in bm.verts:
@@ -1396,8 +1509,8 @@ class UltimateAIWearGenerator:
                     max_weight = max(max_weight, weight)
 
             weight_stats.append(max_weight)
-            if max_weight > min_weight:
-                selected_verts.append(vert)
+
+        selected_verts = self._clean_selection(bm, weight_stats, min_weight)
 
         if weight_stats:
             avg_weight = sum(weight_stats) / len(weight_stats)
@@ -1405,14 +1518,33 @@ class UltimateAIWearGenerator:
                 f"📐 Length selection: min_weight={min_weight:.3f}, avg_weight={avg_weight:.3f}"
             )
 
-        return list(set(selected_verts))
+        return selected_verts
 
+    def _clean_selection(
+        self, bm: bmesh.types.BMesh, max_weights: list, threshold: float
+    ) -> list:
+        """閾値選択から離れ小島と小さな穴を連結成分で取り除く"""
+        # bm は素体メッシュの複製から作られているので、辺配列は素体から一括で読める
+        mesh = self.base_obj.data
+        if len(mesh.vertices) == len(bm.verts) and len(mesh.edges) == len(bm.edges):
+            edges = core_topology.mesh_edge_array(mesh)
+        else:
+            edges = core_topology.bmesh_edge_array(bm)
+
+        mask = core_topology.clean_weight_selection(
+            edges, np.array(max_weights, dtype=np.float32), threshold
+        )
+        return [vert for vert, keep in zip(bm.verts, mask) if keep]
+
+    @core_tracing.traced("bmesh.delete_unselected", "bmesh")
     def _remove_unwanted_vertices_safe(
         self, bm: bmesh.types.BMesh, keep_verts: list
     ) -> None:
         """安全な不要頂点除去"""
         try:
-            verts_to_remove = [v for v in bm.verts if v not in keep_verts]
+            keep = set(keep_verts)
+            verts_to_remove = [v for v in bm.verts if v not in keep]
+            faces_before = len(bm.faces)
 
             if verts_to_remove:
                 logger.debug(f"🗑️  Removing {len(verts_to_remove)} unwanted vertices")
@@ -1423,9 +1555,16 @@ class UltimateAIWearGenerator:
                 bm.edges.ensure_lookup_table()
                 bm.faces.ensure_lookup_table()
 
+            core_tracing.annotate(
+                vertices_deleted=len(verts_to_remove),
+                vertices_out=len(bm.verts),
+                faces_deleted=faces_before - len(bm.faces),
+            )
+
         except Exception as e:
             logger.warning(f"⚠️  Vertex removal warning: {e}")
 
+    @core_tracing.traced("bmesh.thickness", "bmesh")
     def _apply_intelligent_thickness(
         self, bm: bmesh.types.BMesh, wear_type: str
     ) -> None:
@@ -1457,9 +1596,15 @@ class UltimateAIWearGenerator:
         for vert in bm.verts:
             vert.co += vert.normal * adjusted_thickness
 
+        core_tracing.annotate(vertices=len(bm.verts), thickness=adjusted_thickness)
+
+    @core_tracing.traced("bmesh.optimize", "bmesh")
     def _optimize_mesh_quality(self, bm: bmesh.types.BMesh) -> None:
         """メッシュ品質最適化"""
         try:
+            verts_before = len(bm.verts)
+            faces_before = len(bm.faces)
+
             # 重複頂点の除去
             bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.0001)
 
@@ -1477,11 +1622,17 @@ class UltimateAIWearGenerator:
             bm.edges.ensure_lookup_table()
             bm.faces.ensure_lookup_table()
 
+            core_tracing.annotate(
+                vertices_in=verts_before,
+                vertices_out=len(bm.verts),
+                faces_deleted=faces_before - len(bm.faces),
+            )
             logger.debug("✨ Mesh optimization completed")
 
         except Exception as e:
             logger.warning(f"⚠️  Mesh optimization warning: {e}")
 
+    @core_tracing.traced("bmesh.smooth", "bmesh")
     def _apply_ai_smoothing_enhanced(
         self, bm: bmesh.types.BMesh, iterations: int = 1
     ) -> None:
@@ -1505,6 +1656,7 @@ class UltimateAIWearGenerator:
 
             # スムージング後の品質チェック
             final_vert_count = len(bm.verts)
+            core_tracing.annotate(iterations=iterations, vertices=final_vert_count)
             if final_vert_count != original_vert_count:
                 logger.warning(
                     f"⚠️  Vertex count changed during smoothing: {original_vert_count} -> {final_vert_count}"
@@ -1513,32 +1665,258 @@ class UltimateAIWearGenerator:
         except Exception as e:
             logger.error(f"❌ AI smoothing failed: {e}")
 
+    @core_tracing.traced("bmesh.mitten", "bmesh")
     def _simplify_to_mitten_enhanced(self, bm: bmesh.types.BMesh) -> None:
-        """強化ミトン変換"""
+        """格子ハッシュの近接探索とクラスタ統合によるミトン変換（スケール非依存）"""
         try:
-            # 指の検出と統合
-            finger_verts = []
+            left_hand, right_hand = core_utils.find_hand_vertex_groups(self.base_obj)
+            hand_groups = [group for group in (left_hand, right_hand) if group]
+            finger_groups = self._find_finger_vertex_groups()
 
-            for vert in bm.verts:
-                # 簡易的な指検出（高いZ座標と外側のX座標）
-                if vert.co.z > 0 and abs(vert.co.x) > 0.2:
-                    finger_verts.append(vert)
+            if not hand_groups and not finger_groups:
+                logger.warning(
+                    "⚠️  No hand or finger vertex groups for mitten conversion"
+                )
+                return
 
-            if finger_verts:
-                logger.debug(
-                    f"🤏 Converting {len(finger_verts)} finger vertices to mitten"
+            bm.verts.ensure_lookup_table()
+            bm.verts.index_update()
+            verts = list(bm.verts)
+            coords = np.array([v.co[:] for v in verts], dtype=np.float64)
+            weights = self._collect_group_weights(bm, hand_groups + finger_groups)
+            hand_weights = weights[:, : len(hand_groups)]
+            finger_weights = weights[:, len(hand_groups) :]
+
+            body_center = np.array(self.base_obj.bound_box, dtype=np.float64).mean(
+                axis=0
+            )
+
+            # 左右の手を先に確定させ、bmesh操作でインデックスが変わっても参照を保持する
+            hand_regions = []
+            for side_mask in self._split_hands_by_side(coords, hand_weights):
+                region = self._detect_finger_region(
+                    coords, finger_weights, side_mask, body_center
                 )
+                if region is not None:
+                    finger_idx, labels, axis, hand_length = region
+                    hand_regions.append(
+                        ([verts[i] for i in finger_idx], labels, axis, hand_length)
+                    )
 
-                # 指部分の統合
-                bmesh.ops.remove_doubles(bm, verts=finger_verts, dist=0.08)
+            merged_total = 0
+            hull_total = 0
+            for finger_verts, labels, axis, hand_length in hand_regions:
+                merged_total += self._merge_finger_clusters(
+                    bm, finger_verts, labels, hand_length
+                )
+                hull_total += self._bridge_finger_hull(bm, finger_verts, axis)
 
-                # インデックス更新
-                bm.verts.ensure_lookup_table()
-                bm.faces.ensure_lookup_table()
+            bm.verts.ensure_lookup_table()
+            bm.edges.ensure_lookup_table()
+            bm.faces.ensure_lookup_table()
+
+            core_tracing.annotate(
+                hands=len(hand_regions),
+                vertices_fused=merged_total,
+                hull_faces=hull_total,
+                vertices_out=len(bm.verts),
+            )
+            logger.debug(
+                f"🤏 Mitten conversion: {len(hand_regions)} hands, {merged_total} vertices fused, {hull_total} hull faces"
+            )
 
         except Exception as e:
             logger.warning(f"⚠️  Mitten conversion warning: {e}")
 
+    def _find_finger_vertex_groups(self) -> list:
+        """指の頂点グループ検索"""
+        # thumb / index / 指 などの別名は presets/vertex_groups.json で "finger" に集約
+        return core_utils.find_vertex_groups_by_type(self.base_obj, "finger")
+
+    def _collect_group_weights(self, bm: bmesh.types.BMesh, groups: list) -> np.ndarray:
+        """頂点グループウェイトを (頂点数, グループ数) 行列として素体のウェイト行列から一括取得"""
+        # 元の頂点番号の属性が無ければ、頂点を削除していない bmesh とみなす
+        source_layer = bm.verts.layers.int.get(SOURCE_INDEX_ATTRIBUTE)
+        if source_layer is None:
+            source = np.arange(len(bm.verts))
+        else:
+            source = np.array([vert[source_layer] for vert in bm.verts], dtype=np.int64)
+        columns = [group.index for group in groups]
+        return core_utils.vertex_weight_matrix(self.base_obj)[source][:, columns]
+
+    def _split_hands_by_side(
+        self, coords: np.ndarray, hand_weights: np.ndarray
+    ) -> List[np.ndarray]:
+        """手ウェイトから左右の頂点マスクを分割"""
+        if hand_weights.shape[1] < 2:
+            return [np.ones(len(coords), dtype=bool)]
+
+        weighted = hand_weights.max(axis=1) > 0.0
+        centroids = []
+        for slot in range(2):
+            owned = weighted & (hand_weights[:, slot] >= hand_weights[:, 1 - slot])
+            if not np.any(owned):
+                return [np.ones(len(coords), dtype=bool)]
+            centroids.append(coords[owned].mean(axis=0))
+
+        # 手ウェイトを持たない指先頂点は近い方の手に割り当てる
+        distances = np.stack(
+            [np.linalg.norm(coords - centroid, axis=1) for centroid in centroids]
+        )
+        side = np.where(
+            weighted,
+            hand_weights[:, 1] > hand_weights[:, 0],
+            distances[1] < distances[0],
+        )
+        return [~side, side]
+
+    def _detect_finger_region(
+        self,
+        coords: np.ndarray,
+        finger_weights: np.ndarray,
+        side_mask: np.ndarray,
+        body_center: np.ndarray,
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, float]]:
+        """手の主軸に沿った指領域検出"""
+        hand_idx = np.flatnonzero(side_mask)
+        if len(hand_idx) < 4:
+            return None
+
+        hand_coords = coords[hand_idx]
+        centroid = hand_coords.mean(axis=0)
+        _, _, vt = np.linalg.svd(hand_coords - centroid, full_matrices=False)
+        axis = vt[0]
+        if np.dot(centroid - body_center, axis) < 0.0:
+            axis = -axis
+
+        projection = (hand_coords - centroid) @ axis
+        hand_length = float(projection.max() - projection.min())
+        if hand_length <= 0.0:
+            return None
+
+        if finger_weights.shape[1] > 0:
+            side_finger_weights = finger_weights[hand_idx]
+            in_finger = side_finger_weights.max(axis=1) >= MITTEN_FINGER_WEIGHT
+            labels = side_finger_weights.argmax(axis=1)
+        else:
+            # 指グループがない場合は手首から遠い側を指領域とし、幅方向の帯で指を区別する
+            in_finger = projection > projection.min() + (
+                MITTEN_FINGER_START * hand_length
+            )
+            lateral = (hand_coords - centroid) @ vt[1]
+            band = MITTEN_MERGE_RATIO * hand_length
+            labels = np.floor((lateral - lateral.min()) / max(band, 1e-9)).astype(
+                np.int64
+            )
+
+        if not np.any(in_finger):
+            return None
+
+        return hand_idx[in_finger], labels[in_finger], axis, hand_length
+
+    def _merge_finger_clusters(
+        self,
+        bm: bmesh.types.BMesh,
+        finger_verts: list,
+        labels: np.ndarray,
+        hand_length: float,
+    ) -> int:
+        """隣接する指同士の近接頂点を格子ハッシュ（close_pairs）で列挙し、クラスタ化して融合"""
+        if len(finger_verts) < 2:
+            return 0
+
+        radius = MITTEN_MERGE_RATIO * hand_length
+        coords = np.array([v.co[:] for v in finger_verts], dtype=np.float64)
+
+        pair_a, pair_b = core_topology.close_pairs(coords, radius)
+        # 同じ指の中の頂点は統合せず、指と指の隙間だけを埋める
+        across = labels[pair_a] != labels[pair_b]
+        pair_a, pair_b = pair_a[across], pair_b[across]
+        if not pair_a.size:
+            return 0
+
+        cluster = core_topology.label_components(len(coords), pair_a, pair_b)
+        counts = np.bincount(cluster, minlength=len(coords))
+        sums = np.zeros_like(coords)
+        np.add.at(sums, cluster, coords)
+        centroids = sums[cluster] / counts[cluster, None]
+
+        fused = np.flatnonzero(counts[cluster] > 1)
+        for i in fused:
+            finger_verts[i].co = centroids[i]
+
+        bmesh.ops.remove_doubles(
+            bm,
+            verts=[finger_verts[i] for i in fused],
+            dist=radius * 1e-3,
+        )
+        return len(fused)
+
+    def _bridge_finger_hull(
+        self, bm: bmesh.types.BMesh, finger_verts: list, axis: np.ndarray
+    ) -> int:
+        """統合後の指領域を凸包で覆い、手のひら側の開口部で既存メッシュと接続"""
+        alive = [v for v in finger_verts if v.is_valid]
+        if len(alive) < 4:
+            return 0
+
+        # 指の表面は凸包に置き換える（残すと凸包の面と重なって非多様体になる）
+        finger_set = set(alive)
+        finger_faces = [f for f in bm.faces if all(v in finger_set for v in f.verts)]
+        bmesh.ops.delete(bm, geom=finger_faces, context="FACES_ONLY")
+
+        hull = bmesh.ops.convex_hull(bm, input=alive, use_existing_faces=False)
+
+        interior = [
+            v for v in hull["geom_interior"] if isinstance(v, bmesh.types.BMVert)
+        ]
+        if interior:
+            bmesh.ops.delete(bm, geom=interior, context="VERTS")
+
+        hull_faces = [
+            f for f in hull["geom"] if isinstance(f, bmesh.types.BMFace) and f.is_valid
+        ]
+        wrist_direction = Vector(-axis)
+        root_caps = []
+        for face in hull_faces:
+            face.normal_update()
+            if face.normal.dot(wrist_direction) > MITTEN_ROOT_CAP_DOT:
+                root_caps.append(face)
+        if root_caps:
+            bmesh.ops.delete(bm, geom=root_caps, context="FACES_ONLY")
+
+        # 手のひらの面と辺を共有して1辺に3面以上付いた凸包の面は外す
+        hull_faces = [f for f in hull_faces if f.is_valid]
+        overlapping = [
+            f for f in hull_faces if any(len(e.link_faces) > 2 for e in f.edges)
+        ]
+        if overlapping:
+            bmesh.ops.delete(bm, geom=overlapping, context="FACES_ONLY")
+
+        # 元の指の内側に残った面の無い辺・頂点を消す
+        finger_set = {v for v in alive if v.is_valid}
+        loose_edges = [
+            e
+            for e in bm.edges
+            if not e.link_faces and any(v in finger_set for v in e.verts)
+        ]
+        if loose_edges:
+            bmesh.ops.delete(bm, geom=loose_edges, context="EDGES")
+        loose_verts = [v for v in finger_set if v.is_valid and not v.link_faces]
+        if loose_verts:
+            bmesh.ops.delete(bm, geom=loose_verts, context="VERTS")
+
+        # 手のひらの開口と凸包の縁の間に残った隙間を塞ぐ（手首側の開口は指領域外なので対象外）
+        finger_set = {v for v in finger_set if v.is_valid}
+        gaps = [
+            e
+            for e in bm.edges
+            if len(e.link_faces) == 1 and all(v in finger_set for v in e.verts)
+        ]
+        filled = bmesh.ops.holes_fill(bm, edges=gaps, sides=0)["faces"] if gaps else []
+
+        return len(hull_faces) - len(overlapping) + len(filled)
+
     def _apply_intelligent_fitting(self, garment: bpy.types.Object) -> bool:
         """インテリジェントフィッティング"""
         try:
@@ -1664,11 +2042,14 @@ class UltimateAIWearGenerator:
         try:
             logger.info("🏁 Finalizing garment with validation")
 
-            # メッシュクリーンアップ
+            # メッシュクリーンアップ（ライブ選択のヒートマップは素体から複製されるので外す）
             core_utils.fix_duplicate_vertices(garment)
+            core_utils.remove_color_attribute(
+                garment.data, core_utils.SELECTION_HEATMAP_ATTRIBUTE
+            )
 
             # 名前設定
-            garment.name = f"{self.base_obj.name}_{self.wear_type}_Ultimate"
+            garment.name = f"{self.props.base_body.name}_{self.wear_type}_Ultimate"
 
             # 最終品質検証
             final_validation = self.geometry_validator.validate_mesh_comprehensive(
@@ -1698,6 +2079,34 @@ class UltimateAIWearGenerator:
             self._complete_stage(False, str(e))
             return False
 
+    def _apply_lod_chain(self, garment: bpy.types.Object) -> bool:
+        """三角形予算の適用とLODチェーン生成"""
+        try:
+            lod_result = apply_polygon_budget(garment, self.props)
+            self.lod_objects = lod_result["lod_objects"]
+            transfer_body_shape_keys(garment, self.lod_objects, self.props)
+
+            if not lod_result["within_budget"]:
+                logger.error(
+                    f"❌ Triangle budget exceeded: {lod_result['triangles']} > {self.props.target_triangles}"
+                )
+                self._complete_stage(
+                    False,
+                    f"Triangle budget exceeded ({lod_result['triangles']} > {self.props.target_triangles})",
+                )
+                return False
+
+            self._complete_stage(
+                True,
+                f"Triangles {lod_result['original_triangles']} -> {lod_result['triangles']}, {len(self.lod_objects)} LOD levels",
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ LOD generation failed: {e}")
+            self._complete_stage(False, str(e))
+            return False
+
     def _log_generation_completion(
         self, garment: bpy.types.Object, visual_result: Dict[str, Any]
     ):
@@ -1719,6 +2128,14 @@ class UltimateAIWearGenerator:
                     f"   {stage['description']}: {stage['duration']:.3f}s ({stage['status']})"
                 )
 
+        # トレース上で自己時間の大きい処理
+        logger.info("🔬 Hotspots (self time):")
+        hotspots = sorted(
+            self.tracer.self_times_ms().items(), key=lambda item: item[1], reverse=True
+        )
+        for name, self_ms in hotspots[:5]:
+            logger.info(f"   {name}: {self_ms:.1f}ms")
+
         # 品質チェックポイントのサマリー
         logger.info("🏆 Quality checkpoints:")
         for checkpoint in self.quality_checkpoints:
@@ -1735,47 +2152,195 @@ class UltimateAIWearGenerator:
                 logger.info(f"   💡 {issue}")
 
 
-def generate_pleated_skirt(props) -> Optional[bpy.types.Object]:
-    """究極品質プリーツスカート生成"""
-    logger.info("👗 Starting ultimate pleated skirt generation")
+def apply_polygon_budget(garment: bpy.types.Object, props) -> Dict[str, Any]:
+    """二次誤差デシメーションによる三角形予算の強制とLODチェーン生成"""
+    original_triangles = core_utils.count_triangles(garment.data)
+    result = {
+        "original_triangles": original_triangles,
+        "triangles": original_triangles,
+        "within_budget": True,
+        "lod_objects": [],
+    }
+
+    budget = props.target_triangles
+    needs_budget = budget > 0 and original_triangles > budget
+    if not (needs_budget or props.generate_lods):
+        return result
 
+    if any(mod.type == "SUBSURF" for mod in garment.modifiers):
+        logger.warning(
+            "⚠️  Subdivision modifier multiplies the triangle count after the budget"
+        )
+
+    # 境界ループとUVシームは高コストとして扱い、縫い目と開口部の形を保つ
+    protect_group = core_utils.ensure_lod_protect_group(garment)
     try:
-        # 頂点グループの検索
-        hip_groups = core_utils.find_vertex_groups_by_type(props.base_body, "hip")
-        leg_groups = core_utils.find_vertex_groups_by_type(props.base_body, "leg")
+        if needs_budget:
+            result["triangles"] = core_utils.enforce_triangle_budget(
+                garment, budget, protect_group
+            )
+            result["within_budget"] = result["triangles"] <= budget
+            if not result["within_budget"]:
+                return result
 
-        if not hip_groups:
-            logger.error("❌ No hip vertex groups found for skirt generation")
-            return None
+        if props.generate_lods:
+            result["lod_objects"] = core_utils.build_lod_chain(
+                garment, props.lod_levels, props.lod_ratio, protect_group
+            )
+    finally:
+        # 保護グループはデシメーションにだけ使い、衣装とLODには残さない
+        for obj in [garment, *result["lod_objects"]]:
+            core_utils.remove_lod_protect_group(obj)
+
+    logger.info(
+        f"🔻 Polygon budget: {original_triangles} -> {result['triangles']} triangles, {len(result['lod_objects'])} LOD levels"
+    )
+    return result
 
+
+def transfer_body_shape_keys(
+    garment: bpy.types.Object, lod_objects: List[bpy.types.Object], props
+) -> Dict[str, float]:
+    """素体のシェイプキーを衣装とLODに表面結合で転送し、キーごとの最大誤差を返す"""
+    body = props.base_body
+    if not props.preserve_shapekeys or body is None or body.data.shape_keys is None:
+        return {}
+
+    errors = core_binding.transfer_shape_keys(body, garment)
+    for lod in lod_objects:
+        lod_errors = core_binding.transfer_shape_keys(body, lod)
+        for name, error in lod_errors.items():
+            errors[name] = max(errors.get(name, 0.0), error)
+
+    if errors:
+        worst = max(errors, key=errors.get)
         logger.info(
-            f"📍 Found vertex groups: {len(hip_groups)} hip, {len(leg_groups)} leg"
+            f"🎭 Shape keys transferred: {len(errors)} keys, max error {errors[worst]:.6f} ({worst})"
         )
+    return errors
+
+
+class PleatedSkirtGenerator:
+    """プリーツスカートの生成をステージ単位で進める（UltimateAIWearGenerator と同じ進め方で、
+    モーダル実行ではステージごとに制御が戻る）"""
 
-        # ベースメッシュ作成
-        skirt_obj = _create_skirt_base_mesh_ultimate(props, hip_groups + leg_groups)
-        if not skirt_obj:
+    def __init__(self, props):
+        self.props = props
+        self.preview = bool(props.preview_mode)
+        self.body = props.base_body
+        self.generation_stages: List[Dict[str, Any]] = []
+        self.garment: Optional[bpy.types.Object] = None
+        self.completed = False
+        self._hip_groups: List[bpy.types.VertexGroup] = []
+        self._leg_groups: List[bpy.types.VertexGroup] = []
+
+    def generate(self) -> Optional[bpy.types.Object]:
+        try:
+            for _ in self.iter_stages():
+                pass
+            return self.garment if self.completed else None
+        except Exception as e:
+            logger.error(f"❌ Pleated skirt generation failed: {e}")
             return None
 
-        # プリーツ生成
-        _create_pleats_geometry_ultimate(skirt_obj, props)
+    @property
+    def stage_count(self) -> int:
+        return len(self._stage_plan())
+
+    def iter_stages(self) -> Iterator[Dict[str, Any]]:
+        """ステージを1つずつ実行し、完了したステージ情報を返す"""
+        logger.info("👗 Starting ultimate pleated skirt generation")
+        for stage_id, description, handler in self._stage_plan():
+            stage = {
+                "id": stage_id,
+                "description": description,
+                "status": "in_progress",
+            }
+            self.generation_stages.append(stage)
+            with core_tracing.span(stage_id, "stage", description=description):
+                success = handler()
+            stage["status"] = "completed" if success else "failed"
+            if not success:
+                return
+            yield stage
+
+        if self.preview:
+            core_proxy.mark_preview(self.garment, self.props)
+        self.completed = True
+
+    def _stage_plan(self) -> List[Tuple[str, str, Callable[[], bool]]]:
+        plan = [
+            ("skirt_groups", "Hip and leg group lookup", self._find_groups),
+            ("skirt_loft", "Skirt loft and pleats", self._build_loft),
+            ("skirt_creases", "Pleat crease sharpening", self._sharpen_creases),
+            ("lod", "Polygon budget and LOD chain", self._apply_budget),
+            ("skirt_validation", "Skirt quality validation", self._validate),
+        ]
+        # プレビューは粗い形状の確認用なので予算・LODと検証を省く
+        if self.preview:
+            plan = [
+                stage for stage in plan if stage[0] not in ("lod", "skirt_validation")
+            ]
+        return plan
+
+    def _find_groups(self) -> bool:
+        if self.preview:
+            self.body = core_proxy.get_proxy_body(
+                self.props.base_body, self.props.preview_triangles
+            )
+        self._hip_groups = core_utils.find_vertex_groups_by_type(self.body, "hip")
+        self._leg_groups = core_utils.find_vertex_groups_by_type(self.body, "leg")
+        if not self._hip_groups:
+            logger.error("❌ No hip vertex groups found for skirt generation")
+            return False
+        logger.info(
+            f"📍 Found vertex groups: {len(self._hip_groups)} hip, {len(self._leg_groups)} leg"
+        )
+        return True
 
-        # 品質検証
+    def _build_loft(self) -> bool:
+        # ウエスト断面からのロフトとプリーツ変位（素体の密度ではなくスカートの解像度に比例）
+        self.garment = core_skirt.build_skirt(
+            self.props, self.body, self._hip_groups, self._leg_groups
+        )
+        return True
+
+    def _sharpen_creases(self) -> bool:
+        # 折り目のシャープエッジ（二面角から一括判定）
+        sharp_count = core_topology.mark_sharp_edges(self.garment.data)
+        logger.debug(f"✨ Applied sharp edges to {sharp_count} edges")
+        core_utils.apply_edge_smoothing(self.garment)
+        return True
+
+    def _apply_budget(self) -> bool:
+        lod_result = apply_polygon_budget(self.garment, self.props)
+        if not lod_result["within_budget"]:
+            logger.error(
+                f"❌ Skirt exceeds triangle budget: {lod_result['triangles']} > {self.props.target_triangles}"
+            )
+            core_datablocks.remove_object(self.garment)
+            self.garment = None
+            return False
+        transfer_body_shape_keys(self.garment, lod_result["lod_objects"], self.props)
+        return True
+
+    def _validate(self) -> bool:
         validator = GeometryQualityValidator()
         quality_result = validator.validate_mesh_comprehensive(
-            skirt_obj, "(pleated skirt)"
+            self.garment, "(pleated skirt)"
         )
 
-        # 視覚検証
         visual_validator = VisualValidationLogger()
         visual_result = visual_validator.validate_visual_appearance(
-            props.base_body,
-            skirt_obj,
+            self.props.base_body,
+            self.garment,
             "SKIRT",
-            {"pleat_count": props.pleat_count, "pleat_depth": props.pleat_depth},
+            {
+                "pleat_count": self.props.pleat_count,
+                "pleat_depth": self.props.pleat_depth,
+            },
         )
 
-        # ログ出力
         logger.info(f"🎯 Skirt generation completed:")
         logger.info(f"   Quality score: {quality_result['overall_score']:.1f}/100")
         logger.info(f"   Visual score: {visual_result['visual_score']:.1f}/100")
@@ -1786,251 +2351,10 @@ def generate_pleated_skirt(props) -> Optional[bpy.types.Object]:
             )
             for issue in quality_result.get("issues", []):
                 logger.warning(f"     - {issue}")
+        return True
 
-        return skirt_obj
-
-    except Exception as e:
-        logger.error(f"❌ Pleated skirt generation failed: {e}")
-        return None
-
-
-def _create_skirt_base_mesh_ultimate(
-    props, target_groups: list
-) -> Optional[bpy.types.Object]:
-    """究極品質スカートベースメッシュ作成"""
-    logger.info("🔧 Creating ultimate quality skirt base mesh")
-
-    mesh = props.base_body.data.copy()
-    skirt_obj = bpy.data.objects.new(f"{props.base_body.name}_Ultimate_Skirt", mesh)
-    bpy.context.collection.objects.link(skirt_obj)
-
-    try:
-        bm = bmesh.new()
-        bm.from_mesh(mesh)
-        deform_layer = bm.verts.layers.deform.verify()
-
-        logger.debug(f"🔧 Processing {len(bm.verts)} vertices for skirt base")
-
-        # 長さファクターに基づく選択
-        selected_verts = []
-        length_factor = props.skirt_length
-        min_weight = 0.15 * length_factor  # やや高い閾値
-
-        weight_stats = []
-        for vert in bm.verts:
-            max_weight = 0.0
-            for group in target_groups:
-                if group.index in vert[deform_layer]:
-                    weight = vert[deform_layer][group.index]
-                    max_weight = max(max_weight, weight)
-
-            weight_stats.append(max_weight)
-            if max_weight > min_weight:
-                selected_verts.append(vert)
-
-        if not selected_verts:
-            logger.error("❌ No vertices selected for skirt base mesh")
-            raise Exception("No vertices selected for skirt")
-
-        logger.info(
-            f"🎯 Selected {len(selected_verts)} vertices for skirt (min_weight: {min_weight:.3f})"
-        )
-
-        # 不要頂点の除去
-        verts_to_remove = [v for v in bm.verts if v not in selected_verts]
-        if verts_to_remove:
-            bmesh.ops.delete(bm, geom=verts_to_remove, context="VERTS")
-
-        # 厚み適用
-        thickness = props.thickness
-        bm.normal_update()
-        for vert in bm.verts:
-            vert.co += vert.normal * thickness
-
-        # メッシュ最適化
-        bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.0001)
-        bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
 
-        bm.to_mesh(mesh)
-        bm.free()
-
-        core_utils.apply_edge_smoothing(skirt_obj)
-
-        logger.info("✅ Skirt base mesh created successfully")
-        return skirt_obj
-
-    except Exception as e:
-        logger.error(f"❌ Skirt base mesh creation failed: {e}")
-        if skirt_obj.name in bpy.data.objects:
-            bpy.data.objects.remove(skirt_obj, do_unlink=True)
-        return None
-
-
-def _create_pleats_geometry_ultimate(skirt_obj: bpy.types.Object, props) -> None:
-    """究極品質プリーツ生成"""
-    logger.info(
-        f"📐 Creating ultimate pleats: count={props.pleat_count}, depth={props.pleat_depth}"
-    )
-
-    try:
-        bpy.context.view_layer.objects.active = skirt_obj
-        bpy.ops.object.mode_set(mode="EDIT")
-
-        bm = bmesh.from_edit_mesh(skirt_obj.data)
-
-        # ウエストと裾の頂点検出
-        waist_verts = _detect_waist_vertices_enhanced(bm)
-        hem_verts = _detect_hem_vertices_enhanced(bm)
-
-        logger.debug(
-            f"🔍 Detected {len(waist_verts)} waist vertices, {len(hem_verts)} hem vertices"
-        )
-
-        if not waist_verts or not hem_verts:
-            logger.warning("⚠️  Could not detect waist or hem vertices properly")
-            bpy.ops.object.mode_set(mode="OBJECT")
-            return
-
-        # プリーツ生成
-        angle_step = 2 * math.pi / props.pleat_count
-        successful_pleats = 0
-
-        for i in range(props.pleat_count):
-            try:
-                _create_single_pleat_ultimate(
-                    bm, waist_verts, hem_verts, i, angle_step, props.pleat_depth
-                )
-                successful_pleats += 1
-            except Exception as e:
-                logger.warning(f"⚠️  Pleat {i} creation failed: {e}")
-
-        logger.info(
-            f"✅ Created {successful_pleats}/{props.pleat_count} pleats successfully"
-        )
-
-        # シャープエッジ適用
-        _apply_pleat_sharp_edges_ultimate(bm)
-
-        bmesh.update_edit_mesh(skirt_obj.data)
-        bpy.ops.object.mode_set(mode="OBJECT")
-
-        logger.info("✅ Ultimate pleats geometry creation completed")
-
-    except Exception as e:
-        logger.error(f"❌ Pleats geometry creation failed: {e}")
-        try:
-            bpy.ops.object.mode_set(mode="OBJECT")
-        except:
-            pass
-
-
-def _detect_waist_vertices_enhanced(bm: bmesh.types.BMesh) -> List[bmesh.types.BMVert]:
-    """強化ウエスト頂点検出"""
-    if not bm.verts:
-        return []
-
-    z_coords = [v.co.z for v in bm.verts]
-    max_z = max(z_coords)
-    waist_threshold = max_z - 0.05  # より精密な閾値
-
-    waist_verts = [v for v in bm.verts if v.co.z >= waist_threshold]
-
-    # 角度でソート
-    def angle_from_center(v):
-        return math.atan2(v.co.y, v.co.x)
-
-    waist_verts.sort(key=angle_from_center)
-
-    logger.debug(
-        f"🔍 Waist detection: max_z={max_z:.3f}, threshold={waist_threshold:.3f}"
-    )
-
-    return waist_verts
-
-
-def _detect_hem_vertices_enhanced(bm: bmesh.types.BMesh) -> List[bmesh.types.BMVert]:
-    """強化裾頂点検出"""
-    if not bm.verts:
-        return []
-
-    z_coords = [v.co.z for v in bm.verts]
-    min_z = min(z_coords)
-    hem_threshold = min_z + 0.05  # より精密な閾値
-
-    hem_verts = [v for v in bm.verts if v.co.z <= hem_threshold]
-
-    # 角度でソート
-    def angle_from_center(v):
-        return math.atan2(v.co.y, v.co.x)
-
-    hem_verts.sort(key=angle_from_center)
-
-    logger.debug(f"🔍 Hem detection: min_z={min_z:.3f}, threshold={hem_threshold:.3f}")
-
-    return hem_verts
-
-
-def _create_single_pleat_ultimate(
-    bm, waist_verts, hem_verts, pleat_index, angle_step, depth
-):
-    """究極品質単一プリーツ作成"""
-    if not waist_verts or not hem_verts:
-        return
-
-    waist_count = len(waist_verts)
-    hem_count = len(hem_verts)
-
-    if waist_count == 0 or hem_count == 0:
-        return
-
-    # より精密なインデックス計算
-    waist_ratio = pleat_index / max(1, pleat_index + 1)
-    hem_ratio = pleat_index / max(1, pleat_index + 1)
-
-    waist_idx = int(waist_ratio * waist_count) % waist_count
-    hem_idx = int(hem_ratio * hem_count) % hem_count
-
-    if waist_idx < len(waist_verts) and hem_idx < len(hem_verts):
-        waist_vert = waist_verts[waist_idx]
-        hem_vert = hem_verts[hem_idx]
-
-        # プリーツオフセットの計算
-        fold_direction = (
-            Vector(
-                (
-                    math.cos(angle_step * pleat_index),
-                    math.sin(angle_step * pleat_index),
-                    0,
-                )
-            )
-            * depth
-        )
-
-        # より自然なプリーツ変形
-        waist_vert.co += fold_direction * 0.3
-        hem_vert.co += fold_direction * 0.7
-
-        logger.debug(f"📐 Created pleat {pleat_index} with depth {depth:.4f}")
-
-
-def _apply_pleat_sharp_edges_ultimate(bm: bmesh.types.BMesh):
-    """究極品質プリーツシャープエッジ適用"""
-    try:
-        sharp_angle_threshold = math.radians(45)  # 45度
-        sharp_edge_count = 0
-
-        for edge in bm.edges:
-            if len(edge.link_faces) == 2:
-                face1, face2 = edge.link_faces
-                try:
-                    angle = face1.normal.angle(face2.normal)
-                    if angle > sharp_angle_threshold:
-                        edge.smooth = False
-                        sharp_edge_count += 1
-                except:
-                    continue
-
-        logger.debug(f"✨ Applied sharp edges to {sharp_edge_count} edges")
-
-    except Exception as e:
-        logger.warning(f"⚠️  Sharp edge application warning: {e}")
+@core_tracing.traced("generate_pleated_skirt")
+def generate_pleated_skirt(props) -> Optional[bpy.types.Object]:
+    """究極品質プリーツスカート生成"""
+    return PleatedSkirtGenerator(props).generate()
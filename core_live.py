@@ -0,0 +1,194 @@
+import bpy
+import time
+import numpy as np
+from bpy.app.handlers import persistent
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+from . import core_topology, core_utils
+
+logger = logging.getLogger(__name__)
+
+LIVE_DEBOUNCE_SECONDS = 0.15
+LIVE_FRAME_BUDGET_MS = 16.0
+
+# 選択色: 閾値未満は青系（ウェイトに比例して明るく）、閾値以上は黄→赤
+UNSELECTED_COLOR = np.array([0.05, 0.1, 0.35, 1.0], dtype=np.float32)
+UNSELECTED_PEAK_COLOR = np.array([0.1, 0.45, 0.9, 1.0], dtype=np.float32)
+SELECTED_COLOR = np.array([1.0, 0.85, 0.1, 1.0], dtype=np.float32)
+SELECTED_PEAK_COLOR = np.array([0.9, 0.1, 0.05, 1.0], dtype=np.float32)
+
+_pending = {"scene": "", "deadline": 0.0}
+last_update: Dict[str, Any] = {}
+
+
+def selection_weights(props) -> Tuple[Optional[np.ndarray], float]:
+    """生成時と同じ頂点グループ・閾値で、頂点ごとの最大ウェイトを求める"""
+    body = props.base_body
+    rule = core_utils.SELECTION_RULES.get(props.wear_type)
+    if body is None or body.type != "MESH" or rule is None:
+        return None, 0.0
+
+    selection_type, keywords = rule
+    group_index = core_utils.vertex_group_index(body)
+    indices: List[int] = sorted(
+        {slot for keyword in keywords for slot in group_index.find(keyword)}
+    )
+    threshold = core_utils.selection_threshold(
+        props, props.get_ai_settings(), selection_type
+    )
+    if not indices:
+        return np.zeros(len(body.data.vertices), dtype=np.float32), threshold
+
+    return core_utils.vertex_weight_matrix(body)[:, indices].max(axis=1), threshold
+
+
+def heatmap_colors(
+    max_weights: np.ndarray, threshold: float, selected: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """selected を省略すると閾値だけで色分けする"""
+    if selected is None:
+        selected = max_weights > threshold
+    below = np.clip(max_weights / max(threshold, 1e-6), 0.0, 1.0)[:, None]
+    above = np.clip((max_weights - threshold) / max(1.0 - threshold, 1e-6), 0.0, 1.0)[
+        :, None
+    ]
+
+    colors = UNSELECTED_COLOR + (UNSELECTED_PEAK_COLOR - UNSELECTED_COLOR) * below
+    colors[selected] = (
+        SELECTED_COLOR + (SELECTED_PEAK_COLOR - SELECTED_COLOR) * above
+    )[selected]
+    return colors.astype(np.float32)
+
+
+def update_selection_heatmap(props) -> Optional[Dict[str, Any]]:
+    """選択マスクを素体のカラー属性に書き込む（衣装は生成しない）"""
+    start = time.perf_counter()
+    max_weights, threshold = selection_weights(props)
+    if max_weights is None:
+        return None
+
+    # 生成と同じく離れ小島と小さな穴を整理したマスクで色分けする
+    mesh = props.base_body.data
+    selected = core_topology.clean_weight_selection(
+        core_topology.mesh_edge_array(mesh), max_weights, threshold
+    )
+    attribute = mesh.color_attributes.get(core_utils.SELECTION_HEATMAP_ATTRIBUTE)
+    if attribute is None:
+        attribute = mesh.color_attributes.new(
+            core_utils.SELECTION_HEATMAP_ATTRIBUTE, "FLOAT_COLOR", "POINT"
+        )
+    attribute.data.foreach_set(
+        "color", heatmap_colors(max_weights, threshold, selected).ravel()
+    )
+    mesh.color_attributes.active_color = attribute
+    mesh.update()
+
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    last_update.clear()
+    last_update.update(
+        {
+            "body": props.base_body.name,
+            "wear_type": props.wear_type,
+            "selected": int(np.count_nonzero(selected)),
+            "vertices": len(max_weights),
+            "threshold": threshold,
+            "elapsed_ms": elapsed_ms,
+        }
+    )
+    if elapsed_ms > LIVE_FRAME_BUDGET_MS:
+        logger.warning(
+            f"ライブ選択がフレーム予算を超過: {elapsed_ms:.1f}ms > {LIVE_FRAME_BUDGET_MS}ms"
+        )
+    return last_update
+
+
+def clear_selection_heatmap(props) -> None:
+    if props.base_body is not None and props.base_body.type == "MESH":
+        core_utils.remove_color_attribute(
+            props.base_body.data, core_utils.SELECTION_HEATMAP_ATTRIBUTE
+        )
+        props.base_body.data.update()
+    last_update.clear()
+
+
+def schedule_update(scene: bpy.types.Scene) -> None:
+    """連続した変更をまとめ、最後の変更から一定時間後に1回だけ再選択"""
+    _pending["scene"] = scene.name
+    _pending["deadline"] = time.perf_counter() + LIVE_DEBOUNCE_SECONDS
+    if not bpy.app.timers.is_registered(_flush_pending):
+        bpy.app.timers.register(_flush_pending, first_interval=LIVE_DEBOUNCE_SECONDS)
+
+
+def _flush_pending() -> Optional[float]:
+    remaining = _pending["deadline"] - time.perf_counter()
+    if remaining > 0.0:
+        return remaining
+
+    scene = bpy.data.scenes.get(_pending["scene"])
+    props = getattr(scene, "adaptive_wear_generator_pro", None)
+    if props is not None and props.live_mode:
+        try:
+            update_selection_heatmap(props)
+        except Exception as e:
+            logger.error(f"ライブ選択の更新に失敗: {e}")
+    return None
+
+
+def on_setting_changed(props, context: bpy.types.Context) -> None:
+    """選択に影響するプロパティの update コールバック"""
+    if props.live_mode:
+        schedule_update(context.scene)
+
+
+def on_live_mode_changed(props, context: bpy.types.Context) -> None:
+    if props.live_mode:
+        _show_attribute_colors(context)
+        schedule_update(context.scene)
+    else:
+        clear_selection_heatmap(props)
+
+
+def _show_attribute_colors(context: bpy.types.Context) -> None:
+    screen = getattr(context, "screen", None)
+    if screen is None:
+        return
+    for area in screen.areas:
+        if area.type == "VIEW_3D":
+            area.spaces.active.shading.color_type = "ATTRIBUTE"
+
+
+@persistent
+def _on_depsgraph_update(scene: bpy.types.Scene, depsgraph) -> None:
+    """素体の形状が更新されたら（モードを問わず）キャッシュを破棄して再選択"""
+    for update in depsgraph.updates:
+        obj = update.id.original if update.id else None
+        if not (isinstance(obj, bpy.types.Object) and update.is_updated_geometry):
+            continue
+        if core_utils.invalidate_vertex_weights(obj.name):
+            props = getattr(scene, "adaptive_wear_generator_pro", None)
+            if props is not None and props.live_mode and props.base_body == obj:
+                schedule_update(scene)
+
+
+@persistent
+def _on_load_post(*args) -> None:
+    """別の .blend を開いたら、解放済みメッシュに結び付いたウェイト行列を捨てる"""
+    core_utils.invalidate_vertex_weights()
+    last_update.clear()
+
+
+def register() -> None:
+    if _on_depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    if _on_load_post not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_on_load_post)
+
+
+def unregister() -> None:
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    if bpy.app.timers.is_registered(_flush_pending):
+        bpy.app.timers.unregister(_flush_pending)
+    core_utils.invalidate_vertex_weights()
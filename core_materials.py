@@ -1,11 +1,49 @@
 import bpy
+import hashlib
+import json
 import re
 import logging
+from bpy.app.handlers import persistent
 from typing import Optional, Dict, Any, Tuple
+from . import core_presets, core_tracing
 
 logger = logging.getLogger(__name__)
 
-
+# 衣装タイプごとの布地テクスチャ。同じ種類なら衣装タイプが違ってもマテリアルを共有できる
+TEXTURE_VARIANTS = {
+    "t_shirt": "fabric",
+    "pants": "fabric",
+    "bra": "lace",
+    "socks": "knit",
+    "gloves": "knit",
+    "skirt": "pleated",
+}
+MATERIAL_KEY_TAG = "awgp_material_key"
+# 布地ノードグループの構造を変えたら上げる（古い版はその場で作り直される）
+NODE_GROUP_VERSION = 1
+NODE_GROUP_VERSION_TAG = "awgp_node_group_version"
+# シェーダーLOD: FULL = 布地テクスチャ・透過あり, VIEWPORT = 単色・不透明の軽量表示
+SHADER_LOD_TAG = "awgp_shader_lod"
+SHADER_LOD_FULL_BLEND_TAG = "awgp_full_blend_method"
+SHADER_LOD_FULL_REFRACTION_TAG = "awgp_full_screen_refraction"
+ADDON_MATERIAL_PREFIX = "AWGP_"
+# Blender 4.0 で名前が変わった Principled BSDF の入力（3.x の名前 → 4.x の名前）
+PRINCIPLED_INPUTS_4X = {
+    "Specular": "Specular IOR Level",
+    "Subsurface": "Subsurface Weight",
+    "Emission": "Emission Color",
+}
+
+# レンダリング・保存の間だけ FULL に戻していることを示す
+_suspended_lod = {"active": False}
+# プロンプト解析結果の保持数（バッチで使われるプロンプトの種類より十分多く）
+MAX_PARSED_PROMPTS = 256
+
+# (プリセットの版, 衣装タイプ, プロンプト) → 解析結果
+_parsed_prompts: Dict[Tuple[int, str, str], Dict[str, Any]] = {}
+
+
+@core_tracing.traced("text_material", "post")
 def apply_text_material(
     obj: bpy.types.Object, wear_type: str, material_prompt: str
 ) -> None:
@@ -19,12 +57,27 @@ def apply_text_material(
         f"オブジェクト '{obj.name}' にテキストマテリアルを適用 (タイプ: {wear_type}, プロンプト: '{material_prompt}')"
     )
 
-    material_properties = _parse_material_prompt(material_prompt)
-    mat = _create_ai_material(obj, wear_type, material_properties)
+    material_properties = _parse_material_prompt(material_prompt, wear_type)
+    mat = _create_ai_material(wear_type, material_properties)
+    apply_shader_lod(mat, scene_shader_lod(bpy.context.scene))
     _apply_material_to_object(obj, mat)
+    purge_unused_materials()
+
+
+def _parse_material_prompt(prompt: str, wear_type: str = "") -> Dict[str, Any]:
+    """同じプロンプトの解析結果は使い回す（呼び出し側が変更しても影響しないようコピーを返す）"""
+    key = (core_presets.version("materials"), wear_type.upper(), prompt)
+    properties = _parsed_prompts.get(key)
+    if properties is None:
+        if len(_parsed_prompts) >= MAX_PARSED_PROMPTS:
+            _parsed_prompts.pop(next(iter(_parsed_prompts)))
+        properties = _parsed_prompts[key] = _parse_material_prompt_uncached(
+            prompt, wear_type
+        )
+    return dict(properties)
 
 
-def _parse_material_prompt(prompt: str) -> Dict[str, Any]:
+def _parse_material_prompt_uncached(prompt: str, wear_type: str) -> Dict[str, Any]:
     properties = {
         "base_color": (0.5, 0.5, 0.5, 1.0),
         "metallic": 0.0,
@@ -36,6 +89,14 @@ def _parse_material_prompt(prompt: str) -> Dict[str, Any]:
         "alpha": 1.0,
     }
 
+    # 衣装タイプの既定素材（presets/materials.json）をプロンプトで上書きする
+    preset = core_presets.material_preset(wear_type) if wear_type else None
+    if preset:
+        properties["base_color"] = preset["color"]
+        properties["roughness"] = preset["roughness"]
+        properties["specular"] = preset["specular"]
+        properties["alpha"] = preset["alpha"]
+
     prompt_lower = prompt.lower()
 
     if "シルク" in prompt or "silk" in prompt_lower:
@@ -85,15 +146,29 @@ def _parse_material_prompt(prompt: str) -> Dict[str, Any]:
     return properties
 
 
+def texture_variant(wear_type: str) -> str:
+    return TEXTURE_VARIANTS.get(wear_type.lower(), "plain")
+
+
+def material_key(wear_type: str, properties: Dict[str, Any]) -> str:
+    """解析済みプロパティとテクスチャの種類から決まるマテリアルのハッシュ"""
+    payload = {"properties": properties, "variant": texture_variant(wear_type)}
+    encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
 def _create_ai_material(
-    obj: bpy.types.Object, wear_type: str, properties: Dict[str, Any]
+    wear_type: str, properties: Dict[str, Any]
 ) -> bpy.types.Material:
-    mat_name = f"AWGP_AI_{wear_type}_{obj.name}"
+    """同じ内容のマテリアルが既にあれば再利用し、無ければ1つだけ作る"""
+    key = material_key(wear_type, properties)
+    mat_name = f"AWGP_AI_{texture_variant(wear_type)}_{key}"
     mat = bpy.data.materials.get(mat_name)
 
     if mat is None:
         try:
             mat = bpy.data.materials.new(name=mat_name)
+            mat[MATERIAL_KEY_TAG] = key
             mat.use_nodes = True
             nodes = mat.node_tree.nodes
             nodes.clear()
@@ -109,27 +184,21 @@ def _create_ai_material(
                 principled_bsdf.outputs["BSDF"], material_output.inputs["Surface"]
             )
 
-            principled_bsdf.inputs["Base Color"].default_value = properties[
-                "base_color"
-            ]
-            principled_bsdf.inputs["Metallic"].default_value = properties["metallic"]
-            principled_bsdf.inputs["Roughness"].default_value = properties["roughness"]
-            principled_bsdf.inputs["Specular"].default_value = properties["specular"]
-            principled_bsdf.inputs["Alpha"].default_value = properties["alpha"]
-
-            if hasattr(principled_bsdf.inputs, "Subsurface"):
-                principled_bsdf.inputs["Subsurface"].default_value = properties[
-                    "subsurface"
-                ]
-
+            values = {
+                "Base Color": properties["base_color"],
+                "Metallic": properties["metallic"],
+                "Roughness": properties["roughness"],
+                "Specular": properties["specular"],
+                "Alpha": properties["alpha"],
+                "Subsurface": properties["subsurface"],
+            }
             if properties["emission_strength"] > 0:
-                principled_bsdf.inputs["Emission"].default_value = properties[
-                    "emission"
-                ]
-                if hasattr(principled_bsdf.inputs, "Emission Strength"):
-                    principled_bsdf.inputs[
-                        "Emission Strength"
-                    ].default_value = properties["emission_strength"]
+                values["Emission"] = properties["emission"]
+                values["Emission Strength"] = properties["emission_strength"]
+            for name, value in values.items():
+                socket = principled_input(principled_bsdf, name)
+                if socket is not None:
+                    socket.default_value = value
 
             if properties["alpha"] < 1.0:
                 mat.blend_method = "BLEND"
@@ -141,89 +210,224 @@ def _create_ai_material(
         except Exception as e:
             logger.error(f"AIマテリアル '{mat_name}' の作成に失敗しました: {e}")
             return _create_fallback_material(wear_type)
+    else:
+        logger.debug(f"AIマテリアル '{mat_name}' を再利用します。")
 
     return mat
 
 
+def principled_input(
+    principled_bsdf: bpy.types.Node, name: str
+) -> Optional[bpy.types.NodeSocket]:
+    """3.x の入力名で Principled BSDF の入力を引く（実行中のBlenderの名前に読み替え、無ければ None）"""
+    if bpy.app.version >= (4, 0, 0):
+        name = PRINCIPLED_INPUTS_4X.get(name, name)
+    return principled_bsdf.inputs.get(name)
+
+
 def _add_texture_nodes(
     mat: bpy.types.Material, wear_type: str, properties: Dict[str, Any]
 ) -> None:
+    """布地ノードグループを1ノードとして配置し、出力を同名の Principled BSDF 入力へ繋ぐ"""
     nodes = mat.node_tree.nodes
-    links = mat.node_tree.links
-
     principled_bsdf = nodes.get("Principled BSDF")
-    if not principled_bsdf:
+    group = texture_node_group(texture_variant(wear_type))
+    if not principled_bsdf or group is None:
         return
 
-    if wear_type.lower() in ["t_shirt", "pants"]:
-        _add_fabric_texture(nodes, links, principled_bsdf)
-    elif wear_type.lower() == "bra":
-        _add_lace_texture(nodes, links, principled_bsdf)
-    elif wear_type.lower() in ["socks", "gloves"]:
-        _add_knit_texture(nodes, links, principled_bsdf)
-    elif wear_type.lower() == "skirt":
-        _add_pleated_texture(nodes, links, principled_bsdf)
+    group_node = nodes.new("ShaderNodeGroup")
+    group_node.node_tree = group
+    group_node.location = (-300, 0)
+    parameters = {
+        "Base Color": properties["base_color"],
+        "Roughness": properties["roughness"],
+        "Alpha": properties["alpha"],
+    }
+    for name, value in parameters.items():
+        if name in group_node.inputs:
+            group_node.inputs[name].default_value = value
+    _link_group_outputs(mat.node_tree, principled_bsdf, group_node)
+
+
+def _link_group_outputs(tree, principled_bsdf, group_node) -> None:
+    for output in group_node.outputs:
+        tree.links.new(output, principled_bsdf.inputs[output.name])
+
+
+def texture_node_group(variant: str) -> Optional[bpy.types.ShaderNodeTree]:
+    """布地テクスチャのノードグループを返す。無いか版が古ければその場で作り直す"""
+    builder = _GROUP_BUILDERS.get(variant)
+    if builder is None:
+        return None
+
+    name = f"AWGP_{variant.capitalize()}"
+    group = bpy.data.node_groups.get(name)
+    if group is not None and group.get(NODE_GROUP_VERSION_TAG) == NODE_GROUP_VERSION:
+        return group
+
+    # 名前を保ったまま中身だけ作り直すので、既存のマテリアルにも新しい版が反映される
+    if group is None:
+        group = bpy.data.node_groups.new(name, "ShaderNodeTree")
+    else:
+        group.nodes.clear()
+        group.interface.clear()
+    builder(group)
+    group[NODE_GROUP_VERSION_TAG] = NODE_GROUP_VERSION
+    logger.debug(f"ノードグループ '{name}' (v{NODE_GROUP_VERSION}) を作成しました。")
+    return group
+
+
+def _group_socket(group, name: str, in_out: str, socket_type: str, default=None):
+    socket = group.interface.new_socket(
+        name=name, in_out=in_out, socket_type=socket_type
+    )
+    if default is not None:
+        socket.default_value = default
+    return socket
 
 
-def _add_fabric_texture(nodes, links, principled_bsdf):
+def _group_io(group) -> Tuple[bpy.types.Node, bpy.types.Node]:
+    group_input = group.nodes.new("NodeGroupInput")
+    group_input.location = (-800, 0)
+    group_output = group.nodes.new("NodeGroupOutput")
+    group_output.location = (400, 0)
+    return group_input, group_output
+
+
+def _build_fabric_group(group) -> None:
+    """ノイズで粗さにむらを付ける（Tシャツ・パンツ）"""
+    _group_socket(group, "Roughness", "INPUT", "NodeSocketFloat", 0.5)
+    _group_socket(group, "Scale", "INPUT", "NodeSocketFloat", 10.0)
+    _group_socket(group, "Roughness", "OUTPUT", "NodeSocketFloat")
+    nodes, links = group.nodes, group.links
+    group_input, group_output = _group_io(group)
+
     noise_texture = nodes.new("ShaderNodeTexNoise")
-    noise_texture.location = (-400, 0)
-    noise_texture.inputs["Scale"].default_value = 10.0
+    noise_texture.location = (-600, 0)
     noise_texture.inputs["Detail"].default_value = 2.0
     noise_texture.inputs["Roughness"].default_value = 0.5
 
     color_ramp = nodes.new("ShaderNodeValToRGB")
-    color_ramp.location = (-200, 0)
+    color_ramp.location = (-400, 0)
     color_ramp.color_ramp.elements[0].position = 0.4
     color_ramp.color_ramp.elements[1].position = 0.6
 
+    # 指定の粗さを中心に ±25% 揺らす
+    variation = nodes.new("ShaderNodeMath")
+    variation.operation = "MULTIPLY_ADD"
+    variation.location = (-100, 0)
+    variation.inputs[1].default_value = 0.5
+    variation.inputs[2].default_value = 0.75
+
+    roughness = nodes.new("ShaderNodeMath")
+    roughness.operation = "MULTIPLY"
+    roughness.use_clamp = True
+    roughness.location = (150, 0)
+
+    links.new(group_input.outputs["Scale"], noise_texture.inputs["Scale"])
     links.new(noise_texture.outputs["Fac"], color_ramp.inputs["Fac"])
-    links.new(color_ramp.outputs["Color"], principled_bsdf.inputs["Roughness"])
+    links.new(color_ramp.outputs["Color"], variation.inputs[0])
+    links.new(variation.outputs["Value"], roughness.inputs[0])
+    links.new(group_input.outputs["Roughness"], roughness.inputs[1])
+    links.new(roughness.outputs["Value"], group_output.inputs["Roughness"])
+
 
+def _build_lace_group(group) -> None:
+    """ボロノイの網目を透過にする（ブラ）"""
+    _group_socket(group, "Alpha", "INPUT", "NodeSocketFloat", 1.0)
+    _group_socket(group, "Scale", "INPUT", "NodeSocketFloat", 20.0)
+    _group_socket(group, "Alpha", "OUTPUT", "NodeSocketFloat")
+    nodes, links = group.nodes, group.links
+    group_input, group_output = _group_io(group)
 
-def _add_lace_texture(nodes, links, principled_bsdf):
     voronoi_texture = nodes.new("ShaderNodeTexVoronoi")
-    voronoi_texture.location = (-400, 0)
-    voronoi_texture.inputs["Scale"].default_value = 20.0
+    voronoi_texture.location = (-600, 0)
 
     color_ramp = nodes.new("ShaderNodeValToRGB")
-    color_ramp.location = (-200, 0)
+    color_ramp.location = (-400, 0)
     color_ramp.color_ramp.elements[0].position = 0.3
     color_ramp.color_ramp.elements[1].position = 0.7
 
+    alpha = nodes.new("ShaderNodeMath")
+    alpha.operation = "MULTIPLY"
+    alpha.use_clamp = True
+    alpha.location = (150, 0)
+
+    links.new(group_input.outputs["Scale"], voronoi_texture.inputs["Scale"])
     links.new(voronoi_texture.outputs["Distance"], color_ramp.inputs["Fac"])
-    links.new(color_ramp.outputs["Alpha"], principled_bsdf.inputs["Alpha"])
+    links.new(color_ramp.outputs["Color"], alpha.inputs[0])
+    links.new(group_input.outputs["Alpha"], alpha.inputs[1])
+    links.new(alpha.outputs["Value"], group_output.inputs["Alpha"])
 
 
-def _add_knit_texture(nodes, links, principled_bsdf):
+def _build_knit_group(group) -> None:
+    """波模様のバンプで編み目を表現する（靴下・手袋）"""
+    _group_socket(group, "Scale", "INPUT", "NodeSocketFloat", 5.0)
+    _group_socket(group, "Distortion", "INPUT", "NodeSocketFloat", 2.0)
+    _group_socket(group, "Strength", "INPUT", "NodeSocketFloat", 0.3)
+    _group_socket(group, "Normal", "OUTPUT", "NodeSocketVector")
+    nodes, links = group.nodes, group.links
+    group_input, group_output = _group_io(group)
+
     wave_texture = nodes.new("ShaderNodeTexWave")
     wave_texture.location = (-400, 0)
-    wave_texture.inputs["Scale"].default_value = 5.0
-    wave_texture.inputs["Distortion"].default_value = 2.0
 
     bump_node = nodes.new("ShaderNodeBump")
-    bump_node.location = (-200, 0)
-    bump_node.inputs["Strength"].default_value = 0.3
+    bump_node.location = (-100, 0)
 
+    links.new(group_input.outputs["Scale"], wave_texture.inputs["Scale"])
+    links.new(group_input.outputs["Distortion"], wave_texture.inputs["Distortion"])
+    links.new(group_input.outputs["Strength"], bump_node.inputs["Strength"])
     links.new(wave_texture.outputs["Color"], bump_node.inputs["Height"])
-    links.new(bump_node.outputs["Normal"], principled_bsdf.inputs["Normal"])
+    links.new(bump_node.outputs["Normal"], group_output.inputs["Normal"])
 
 
-def _add_pleated_texture(nodes, links, principled_bsdf):
-    gradient_texture = nodes.new("ShaderNodeTexGradient")
-    gradient_texture.location = (-400, 0)
-    gradient_texture.gradient_type = "LINEAR"
+def _build_pleated_group(group) -> None:
+    """縦方向のグラデーションで折り目の陰影を付ける（スカート）"""
+    _group_socket(group, "Base Color", "INPUT", "NodeSocketColor", (0.5, 0.5, 0.5, 1.0))
+    _group_socket(group, "Scale", "INPUT", "NodeSocketFloat", 10.0)
+    _group_socket(group, "Shading", "INPUT", "NodeSocketFloat", 0.5)
+    _group_socket(group, "Base Color", "OUTPUT", "NodeSocketColor")
+    nodes, links = group.nodes, group.links
+    group_input, group_output = _group_io(group)
+
+    texture_coord = nodes.new("ShaderNodeTexCoord")
+    texture_coord.location = (-800, -200)
+
+    scale = nodes.new("ShaderNodeCombineXYZ")
+    scale.location = (-600, -300)
+    scale.inputs["X"].default_value = 1.0
+    scale.inputs["Z"].default_value = 1.0
 
     mapping_node = nodes.new("ShaderNodeMapping")
-    mapping_node.location = (-600, 0)
-    mapping_node.inputs["Scale"].default_value = (1.0, 10.0, 1.0)
+    mapping_node.location = (-400, -200)
 
-    texture_coord = nodes.new("ShaderNodeTexCoord")
-    texture_coord.location = (-800, 0)
+    gradient_texture = nodes.new("ShaderNodeTexGradient")
+    gradient_texture.location = (-200, -200)
+    gradient_texture.gradient_type = "LINEAR"
+
+    shade = nodes.new("ShaderNodeMix")
+    shade.data_type = "RGBA"
+    shade.blend_type = "MULTIPLY"
+    shade.location = (100, 0)
 
+    links.new(group_input.outputs["Scale"], scale.inputs["Y"])
     links.new(texture_coord.outputs["Generated"], mapping_node.inputs["Vector"])
+    links.new(scale.outputs["Vector"], mapping_node.inputs["Scale"])
     links.new(mapping_node.outputs["Vector"], gradient_texture.inputs["Vector"])
-    links.new(gradient_texture.outputs["Color"], principled_bsdf.inputs["Base Color"])
+    # Mix ノードは型ごとに同名ソケットを持つので、カラー用の A/B/Result を番号で指定する
+    links.new(group_input.outputs["Shading"], shade.inputs[0])
+    links.new(group_input.outputs["Base Color"], shade.inputs[6])
+    links.new(gradient_texture.outputs["Color"], shade.inputs[7])
+    links.new(shade.outputs[2], group_output.inputs["Base Color"])
+
+
+_GROUP_BUILDERS = {
+    "fabric": _build_fabric_group,
+    "lace": _build_lace_group,
+    "knit": _build_knit_group,
+    "pleated": _build_pleated_group,
+}
 
 
 def _apply_material_to_object(
@@ -244,6 +448,120 @@ def _apply_material_to_object(
         logger.error(f"オブジェクト '{obj.name}' へのマテリアル適用に失敗しました: {e}")
 
 
+def scene_shader_lod(scene: Optional[bpy.types.Scene]) -> str:
+    props = getattr(scene, "adaptive_wear_generator_pro", None)
+    return props.shader_lod if props is not None else "FULL"
+
+
+def apply_shader_lod(mat: bpy.types.Material, level: str) -> bool:
+    """1つのマテリアルを FULL / VIEWPORT に切り替える。変更があれば True"""
+    if mat is None or mat.get(SHADER_LOD_TAG, "FULL") == level:
+        return False
+
+    principled_bsdf = None
+    group_nodes = []
+    if mat.use_nodes and mat.node_tree:
+        for node in mat.node_tree.nodes:
+            if node.type == "BSDF_PRINCIPLED":
+                principled_bsdf = node
+            elif node.type == "GROUP" and node.node_tree is not None:
+                group_nodes.append(node)
+
+    if level == "VIEWPORT":
+        # 布地ノードグループを切り離すと、Principled BSDF に設定済みの単色パラメータで描画される
+        if principled_bsdf is not None:
+            for node in group_nodes:
+                for output in node.outputs:
+                    for link in list(output.links):
+                        mat.node_tree.links.remove(link)
+        mat[SHADER_LOD_FULL_BLEND_TAG] = mat.blend_method
+        mat[SHADER_LOD_FULL_REFRACTION_TAG] = mat.use_screen_refraction
+        mat.blend_method = "OPAQUE"
+        mat.use_screen_refraction = False
+    else:
+        if principled_bsdf is not None:
+            for node in group_nodes:
+                _link_group_outputs(mat.node_tree, principled_bsdf, node)
+        mat.blend_method = mat.get(SHADER_LOD_FULL_BLEND_TAG, mat.blend_method)
+        mat.use_screen_refraction = bool(
+            mat.get(SHADER_LOD_FULL_REFRACTION_TAG, mat.use_screen_refraction)
+        )
+
+    mat[SHADER_LOD_TAG] = level
+    return True
+
+
+@core_tracing.traced("shader_lod", "post")
+def set_shader_lod(level: str) -> int:
+    """アドオンが作成した全マテリアル (AWGP_*) のシェーダーLODを切り替え、変更数を返す"""
+    changed = sum(
+        apply_shader_lod(mat, level)
+        for mat in bpy.data.materials
+        if mat.name.startswith(ADDON_MATERIAL_PREFIX)
+    )
+    core_tracing.annotate(level=level, changed=changed)
+    if changed:
+        logger.info(f"シェーダーLODを {level} に切り替え: {changed}件")
+    return changed
+
+
+def on_shader_lod_changed(props, context: bpy.types.Context) -> None:
+    set_shader_lod(props.shader_lod)
+
+
+@persistent
+def _restore_full_shaders(scene: bpy.types.Scene, *args) -> None:
+    """レンダリング・保存（エクスポート用の .blend を含む）の間は完全なシェーダーに戻す"""
+    scene = scene if isinstance(scene, bpy.types.Scene) else bpy.context.scene
+    if scene_shader_lod(scene) == "VIEWPORT" and not _suspended_lod["active"]:
+        _suspended_lod["active"] = True
+        set_shader_lod("FULL")
+
+
+@persistent
+def _resume_viewport_shaders(scene: bpy.types.Scene, *args) -> None:
+    if _suspended_lod["active"]:
+        _suspended_lod["active"] = False
+        set_shader_lod("VIEWPORT")
+
+
+_HANDLERS = (
+    ("render_pre", _restore_full_shaders),
+    ("render_post", _resume_viewport_shaders),
+    ("render_cancel", _resume_viewport_shaders),
+    ("save_pre", _restore_full_shaders),
+    ("save_post", _resume_viewport_shaders),
+)
+
+
+def register() -> None:
+    for name, handler in _HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if handler not in handlers:
+            handlers.append(handler)
+
+
+def unregister() -> None:
+    for name, handler in _HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if handler in handlers:
+            handlers.remove(handler)
+
+
+def purge_unused_materials() -> int:
+    """どのオブジェクトからも使われなくなった共有マテリアルを削除"""
+    unused = [
+        mat
+        for mat in bpy.data.materials
+        if MATERIAL_KEY_TAG in mat and mat.users == 0 and not mat.use_fake_user
+    ]
+    for mat in unused:
+        bpy.data.materials.remove(mat)
+    if unused:
+        logger.debug(f"未使用の共有マテリアルを削除: {len(unused)}件")
+    return len(unused)
+
+
 def _create_fallback_material(wear_type: str) -> bpy.types.Material:
     mat_name = f"AWGP_Fallback_{wear_type}"
     mat = bpy.data.materials.get(mat_name)
@@ -255,6 +573,7 @@ def _create_fallback_material(wear_type: str) -> bpy.types.Material:
     return mat
 
 
+@core_tracing.traced("default_material", "post")
 def apply_default_material(obj: bpy.types.Object, wear_type: str) -> None:
     if not obj or obj.type != "MESH":
         logger.warning(
@@ -282,21 +601,13 @@ def apply_default_material(obj: bpy.types.Object, wear_type: str) -> None:
                 principled_bsdf.outputs["BSDF"], material_output.inputs["Surface"]
             )
 
-            color = (0.5, 0.5, 0.5, 1)
-            if wear_type.lower() == "t_shirt":
-                color = (0.8, 0.2, 0.2, 1)
-            elif wear_type.lower() == "pants":
-                color = (0.2, 0.2, 0.8, 1)
-            elif wear_type.lower() == "bra":
-                color = (0.8, 0.5, 0.2, 1)
-            elif wear_type.lower() == "socks":
-                color = (0.3, 0.3, 0.3, 1)
-            elif wear_type.lower() == "gloves":
-                color = (0.2, 0.8, 0.2, 1)
-            elif wear_type.lower() == "skirt":
-                color = (0.8, 0.2, 0.8, 1)
-
-            principled_bsdf.inputs["Base Color"].default_value = color
+            preset = core_presets.material_preset(wear_type)
+            if preset:
+                principled_bsdf.inputs["Base Color"].default_value = preset["color"]
+                principled_bsdf.inputs["Roughness"].default_value = preset["roughness"]
+                principled_bsdf.inputs["Alpha"].default_value = preset["alpha"]
+            else:
+                principled_bsdf.inputs["Base Color"].default_value = (0.5, 0.5, 0.5, 1)
             logger.debug(f"新しいデフォルトマテリアル '{mat_name}' を作成しました。")
         except Exception as e:
             logger.error(f"デフォルトマテリアル '{mat_name}' の作成に失敗しました: {e}")
@@ -315,3 +626,4 @@ def apply_default_material(obj: bpy.types.Object, wear_type: str) -> None:
             )
     except Exception as e:
         logger.error(f"オブジェクト '{obj.name}' へのマテリアル適用に失敗しました: {e}")
+    purge_unused_materials()
@@ -1,15 +1,91 @@
 import bpy
 import bmesh
+import re
 import time
 from bpy.types import Operator
-from typing import Set, Optional, Dict, Any
+from typing import Set, Optional, Dict, Any, Iterator, List, Tuple
 import logging
-from . import core_generators, core_utils, core_materials
+from . import (
+    core_bake,
+    core_cache,
+    core_datablocks,
+    core_generators,
+    core_materials,
+    core_pose,
+    core_proxy,
+    core_tracing,
+    core_utils,
+)
 
 logger = logging.getLogger(__name__)
 
+MODAL_STEP_INTERVAL = 0.05
+
+
+def _lookup_cached_garment(
+    props,
+) -> Tuple[Optional[str], Optional[bpy.types.Object]]:
+    """キャッシュキーと、ヒットした場合は復元した衣装を返す"""
+    # プレビューは素体全体のハッシュ計算の方が生成より重くなるためキャッシュしない
+    if props.cache_memory_mb <= 0 or props.preview_mode:
+        return None, None
+    key = core_cache.cache_key(props)
+    garment = core_cache.lookup(key)
+    # LODは別オブジェクトなのでキャッシュせず、復元した本体から作り直す
+    if garment is not None and props.generate_lods:
+        lod_result = core_generators.apply_polygon_budget(garment, props)
+        core_generators.transfer_body_shape_keys(
+            garment, lod_result["lod_objects"], props
+        )
+    return key, garment
+
+
+def _store_cached_garment(
+    key: Optional[str], garment: Optional[bpy.types.Object], props
+) -> None:
+    if key is not None and garment is not None:
+        core_cache.store(key, garment, props.cache_memory_mb)
+
+
+def _export_trace(tracer: Optional[core_tracing.Tracer], props) -> None:
+    if tracer is not None and props.trace_export_path:
+        tracer.export(bpy.path.abspath(props.trace_export_path))
+
 
-class AWGP_OT_GenerateWear(Operator):
+class _PostProcessingMixin:
+    """同期版とモーダル版の生成オペレーターで共有するポスト処理
+    （core_safety が登録前に両方のクラスで厳格版へ差し替える）"""
+
+    def _apply_post_processing(self, garment: bpy.types.Object, props) -> None:
+        try:
+            if props.use_text_material and props.material_prompt:
+                core_materials.apply_text_material(
+                    garment, props.wear_type, props.material_prompt
+                )
+            else:
+                core_materials.apply_default_material(garment, props.wear_type)
+
+            if props.wear_type == "SKIRT":
+                quality_report = core_utils.evaluate_pleats_geometry(
+                    garment, props.pleat_count
+                )
+                if quality_report["total_score"] < 70:
+                    logger.warning(
+                        f"スカート品質スコアが低いです: {quality_report['total_score']}"
+                    )
+
+            if props.enable_cloth_sim:
+                core_utils.setup_cloth_simulation(garment, props.base_body)
+
+            if props.auto_rigging:
+                armature = core_utils.find_armature(props.base_body)
+                if armature:
+                    core_utils.apply_rigging(garment, props.base_body, armature)
+        except Exception as e:
+            logger.error(f"ポストプロセシングエラー: {str(e)}")
+
+
+class AWGP_OT_GenerateWear(_PostProcessingMixin, Operator):
     bl_idname = "awgp.generate_wear"
     bl_label = "Generate Wear"
     bl_description = "AI駆動で衣装を自動生成します"
@@ -30,17 +106,23 @@ class AWGP_OT_GenerateWear(Operator):
             return {"CANCELLED"}
 
         start_time = time.time()
+        tracer = core_tracing.Tracer(f"AdaptiveWear {props.wear_type}")
+        transaction = core_datablocks.DatablockTransaction(props.wear_type).begin()
         logger.info(
             f"衣装生成開始: タイプ={props.wear_type}, 品質={props.quality_level}"
         )
 
         try:
-            garment = self._generate_garment(props)
-            if not garment:
-                self.report({"ERROR"}, "衣装生成に失敗しました")
-                return {"CANCELLED"}
-
-            self._apply_post_processing(garment, props)
+            with core_tracing.activate(tracer):
+                garment = self._generate_garment(props)
+                if not garment:
+                    transaction.rollback()
+                    self.report({"ERROR"}, "衣装生成に失敗しました")
+                    return {"CANCELLED"}
+
+                with core_tracing.span("post_processing", "post"):
+                    self._apply_post_processing(garment, props)
+            transaction.commit(garment, props, props.replace_previous_garment)
             core_utils.select_single_object(garment)
 
             elapsed_time = time.time() - start_time
@@ -54,48 +136,430 @@ class AWGP_OT_GenerateWear(Operator):
             return {"FINISHED"}
 
         except core_generators.AWGProException as e:
+            transaction.rollback()
             logger.error(f"衣装生成エラー: {str(e)}")
             self.report({"ERROR"}, f"生成エラー: {str(e)}")
             return {"CANCELLED"}
         except Exception as e:
+            transaction.rollback()
             logger.error(f"予期しない衣装生成エラー: {str(e)}")
             self.report({"ERROR"}, f"予期しないエラー: {str(e)}")
             return {"CANCELLED"}
+        finally:
+            _export_trace(tracer, props)
 
     def _generate_garment(self, props) -> Optional[bpy.types.Object]:
+        cache_key, garment = _lookup_cached_garment(props)
+        if garment is not None:
+            return garment
+
         if props.wear_type == "SKIRT":
-            return core_generators.generate_pleated_skirt(props)
+            garment = core_generators.generate_pleated_skirt(props)
         else:
-            generator = core_generators.OptimizedAIWearGenerator(props)
-            return generator.generate()
+            generator = core_generators.UltimateAIWearGenerator(props)
+            garment = generator.generate()
 
-    def _apply_post_processing(self, garment: bpy.types.Object, props) -> None:
+        _store_cached_garment(cache_key, garment, props)
+        return garment
+
+
+class AWGP_OT_GenerateWearModal(_PostProcessingMixin, Operator):
+    bl_idname = "awgp.generate_wear_modal"
+    bl_label = "Generate Wear (Interactive)"
+    bl_description = "生成ステージをタイマーで1つずつ実行します。ESCでキャンセルし、作成途中のデータを破棄します"
+    bl_options = {"REGISTER", "UNDO"}
+
+    _timer = None
+    _steps = None
+    _generator = None
+    _garment = None
+    _transaction = None
+    _tracer = None
+    _start_time = 0.0
+
+    @classmethod
+    def poll(cls, context: bpy.types.Context) -> bool:
+        return AWGP_OT_GenerateWear.poll(context)
+
+    def invoke(self, context: bpy.types.Context, event: bpy.types.Event) -> Set[str]:
+        # ウィンドウが無い（バックグラウンド実行など）ときはタイマーを使えないので一括で進める
+        if context.window is None:
+            return self.execute(context)
+        if not self._begin(context):
+            return {"CANCELLED"}
+
+        wm = context.window_manager
+        wm.progress_begin(0, 100)
+        self._timer = wm.event_timer_add(MODAL_STEP_INTERVAL, window=context.window)
+        wm.modal_handler_add(self)
+        self._set_status(context, "生成準備中")
+        return {"RUNNING_MODAL"}
+
+    def execute(self, context: bpy.types.Context) -> Set[str]:
+        """同じステージをタイマーを使わずに最後まで実行する"""
+        if not self._begin(context):
+            return {"CANCELLED"}
         try:
-            if props.use_text_material and props.material_prompt:
-                core_materials.apply_text_material(
-                    garment, props.wear_type, props.material_prompt
-                )
-            else:
-                core_materials.apply_default_material(garment, props.wear_type)
+            with core_tracing.activate(self._tracer):
+                for _ in self._steps:
+                    pass
+        except Exception as e:
+            logger.error(f"段階的衣装生成エラー: {str(e)}")
+            return self._cancel(context, f"生成エラー: {str(e)}", "ERROR")
+        return self._finish(context)
 
-            if props.wear_type == "SKIRT":
-                quality_report = core_utils.evaluate_pleats_geometry(
-                    garment, props.pleat_count
-                )
-                if quality_report["total_score"] < 70:
-                    logger.warning(
-                        f"スカート品質スコアが低いです: {quality_report['total_score']}"
-                    )
+    def _begin(self, context: bpy.types.Context) -> bool:
+        props = context.scene.adaptive_wear_generator_pro
 
-            if props.enable_cloth_sim:
-                core_utils.setup_cloth_simulation(garment, props.base_body)
+        is_valid, errors = props.validate_settings()
+        if not is_valid:
+            for error in errors:
+                self.report({"ERROR"}, error)
+            return False
 
-            if props.auto_rigging:
-                armature = core_utils.find_armature(props.base_body)
-                if armature:
-                    core_utils.apply_rigging(garment, props.base_body, armature)
+        logger.info(
+            f"段階的衣装生成開始: タイプ={props.wear_type}, 品質={props.quality_level}"
+        )
+        self._start_time = time.time()
+        self._transaction = core_datablocks.DatablockTransaction(
+            props.wear_type
+        ).begin()
+        self._tracer = core_tracing.Tracer(f"AdaptiveWear {props.wear_type}")
+        self._generator = None
+        self._garment = None
+        self._steps = self._iter_generation(props)
+        return True
+
+    def modal(self, context: bpy.types.Context, event: bpy.types.Event) -> Set[str]:
+        if event.type == "ESC" and event.value == "PRESS":
+            return self._cancel(context, "衣装生成をキャンセルしました", "WARNING")
+
+        # タイマー以外のイベントはビューポート操作のためにそのまま流す
+        if event.type != "TIMER":
+            return {"PASS_THROUGH"}
+
+        try:
+            with core_tracing.activate(self._tracer):
+                progress, description = next(self._steps)
+        except StopIteration:
+            return self._finish(context)
         except Exception as e:
-            logger.error(f"ポストプロセシングエラー: {str(e)}")
+            logger.error(f"段階的衣装生成エラー: {str(e)}")
+            return self._cancel(context, f"生成エラー: {str(e)}", "ERROR")
+
+        context.window_manager.progress_update(int(progress * 100))
+        self._set_status(context, f"{description} ({progress:.0%})")
+        return {"RUNNING_MODAL"}
+
+    def _iter_generation(self, props) -> Iterator[Tuple[float, str]]:
+        """生成を1ステージずつ進め、(進捗率, 完了ステージ名) を返す"""
+        cache_key, cached = _lookup_cached_garment(props)
+        if cached is not None:
+            self._garment = cached
+            yield 1.0, "Restored from cache"
+            return
+
+        if props.wear_type == "SKIRT":
+            self._generator = core_generators.PleatedSkirtGenerator(props)
+        else:
+            self._generator = core_generators.UltimateAIWearGenerator(props)
+        total = self._generator.stage_count
+        for index, stage in enumerate(self._generator.iter_stages(), 1):
+            yield index / total, stage["description"]
+
+        if self._generator.completed:
+            self._garment = self._generator.garment
+            _store_cached_garment(cache_key, self._garment, props)
+
+    def _finish(self, context: bpy.types.Context) -> Set[str]:
+        props = context.scene.adaptive_wear_generator_pro
+        garment = self._garment
+        if not garment:
+            failed = self._failed_stage()
+            message = (
+                f"衣装生成に失敗しました: {failed}"
+                if failed
+                else "衣装生成に失敗しました"
+            )
+            return self._cancel(context, message, "ERROR")
+
+        try:
+            # 同期版と同じ厳格なポスト処理（core_safetyで差し替え済み）
+            with core_tracing.activate(self._tracer):
+                with core_tracing.span("post_processing", "post"):
+                    self._apply_post_processing(garment, props)
+        except Exception as e:
+            logger.error(f"段階的衣装生成のポスト処理エラー: {str(e)}")
+            return self._cancel(context, f"ポスト処理エラー: {str(e)}", "ERROR")
+
+        self._transaction.commit(garment, props, props.replace_previous_garment)
+        core_utils.select_single_object(garment)
+        self._end_modal(context)
+
+        elapsed_time = time.time() - self._start_time
+        logger.info(
+            f"段階的衣装生成完了: {garment.name} (処理時間: {elapsed_time:.2f}秒)"
+        )
+        self.report(
+            {"INFO"},
+            f"{props.wear_type} 生成完了: {garment.name} ({elapsed_time:.1f}秒)",
+        )
+        return {"FINISHED"}
+
+    def _cancel(self, context: bpy.types.Context, message: str, level: str) -> Set[str]:
+        if self._steps is not None:
+            self._steps.close()
+        # 編集モードのまま中断された場合に備えてオブジェクトモードへ戻す
+        if context.mode != "OBJECT":
+            try:
+                bpy.ops.object.mode_set(mode="OBJECT")
+            except RuntimeError:
+                pass
+        removed = self._transaction.rollback() if self._transaction else 0
+        self._end_modal(context)
+
+        logger.warning(f"{message} (破棄したデータブロック: {removed})")
+        self.report({level}, message)
+        return {"CANCELLED"}
+
+    def _end_modal(self, context: bpy.types.Context) -> None:
+        wm = context.window_manager
+        if self._timer is not None:
+            wm.event_timer_remove(self._timer)
+            self._timer = None
+        wm.progress_end()
+        self._set_status(context, None)
+        _export_trace(self._tracer, context.scene.adaptive_wear_generator_pro)
+
+    def _set_status(self, context: bpy.types.Context, text: Optional[str]) -> None:
+        if context.area is None:
+            return
+        if text is None:
+            context.area.header_text_set(None)
+        else:
+            context.area.header_text_set(f"AdaptiveWear: {text} - ESCでキャンセル")
+
+    def _failed_stage(self) -> Optional[str]:
+        if self._generator is None:
+            return None
+        for stage in self._generator.generation_stages:
+            if stage["status"] == "failed":
+                return stage["description"]
+        return None
+
+
+class AWGP_OT_PromotePreview(Operator):
+    bl_idname = "awgp.promote_preview"
+    bl_label = "Promote Preview"
+    bl_description = (
+        "プレビューで決めたパラメータのまま、元の素体でフル解像度の衣装を生成します"
+    )
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context: bpy.types.Context) -> bool:
+        return AWGP_OT_GenerateWear.poll(context)
+
+    def execute(self, context: bpy.types.Context) -> Set[str]:
+        props = context.scene.adaptive_wear_generator_pro
+        previews = core_proxy.find_preview_garments(props.base_body, props.wear_type)
+
+        preview_mode = props.preview_mode
+        props.preview_mode = False
+        try:
+            result = bpy.ops.awgp.generate_wear()
+        finally:
+            props.preview_mode = preview_mode
+
+        if "FINISHED" not in result:
+            self.report({"ERROR"}, "フル解像度での生成に失敗しました")
+            return {"CANCELLED"}
+
+        # replace_previous_garment が無効でもプレビューは残さない
+        for name in previews:
+            core_datablocks.remove_object(bpy.data.objects.get(name))
+
+        self.report({"INFO"}, f"プレビューを確定しました: {context.active_object.name}")
+        return {"FINISHED"}
+
+
+class AWGP_OT_BakeOutfitAtlas(Operator):
+    bl_idname = "awgp.bake_outfit_atlas"
+    bl_label = "Bake Outfit Atlas"
+    bl_description = "素体の衣装一式のプロシージャルテクスチャを1枚のアトラス画像に焼き込み、Unity/VRChat向けに画像テクスチャへ差し替えます"
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context: bpy.types.Context) -> bool:
+        props = context.scene.adaptive_wear_generator_pro
+        return props.base_body is not None and context.mode == "OBJECT"
+
+    def execute(self, context: bpy.types.Context) -> Set[str]:
+        props = context.scene.adaptive_wear_generator_pro
+        body_name = props.base_body.name
+        # LODは元の衣装のタイルを共有させる
+        garments = _outfit_garments(body_name)
+        lods = {
+            obj.name: [
+                lod
+                for lod in bpy.data.objects
+                if re.fullmatch(re.escape(obj.name) + r"_LOD\d+", lod.name)
+            ]
+            for obj in garments
+        }
+        if not garments:
+            self.report({"WARNING"}, "焼き込む衣装がありません")
+            return {"CANCELLED"}
+
+        try:
+            result = core_bake.bake_outfit(
+                garments,
+                body_name,
+                size=int(props.bake_atlas_size),
+                workers=props.bake_workers or None,
+                lods=lods,
+            )
+        except Exception as e:
+            logger.error(f"アトラスへの焼き込みに失敗: {e}")
+            self.report({"ERROR"}, f"焼き込みに失敗しました: {e}")
+            return {"CANCELLED"}
+
+        if not result["baked"]:
+            self.report({"INFO"}, "プロシージャルテクスチャを使う衣装はありません")
+            return {"FINISHED"}
+        self.report(
+            {"INFO"},
+            f"{result['baked']} 着をアトラスに焼き込みました: {', '.join(result['atlases'])}",
+        )
+        return {"FINISHED"}
+
+
+class AWGP_OT_PoseSweep(Operator):
+    bl_idname = "awgp.pose_sweep"
+    bl_label = "Pose Sweep Check"
+    bl_description = "腕上げ・腕組み・しゃがみ・座り・伏せの各姿勢で素体と衣装一式をスキニングし、衣装の貫通頂点を数えて姿勢ごとのヒートマップ属性に書き込みます"
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context: bpy.types.Context) -> bool:
+        return AWGP_OT_BakeOutfitAtlas.poll(context)
+
+    def execute(self, context: bpy.types.Context) -> Set[str]:
+        props = context.scene.adaptive_wear_generator_pro
+        armature = core_utils.find_armature(props.base_body)
+        if armature is None:
+            self.report({"ERROR"}, "素体にアーマチュアがありません")
+            return {"CANCELLED"}
+        garments = _outfit_garments(props.base_body.name)
+        if not garments:
+            self.report({"WARNING"}, "検査する衣装がありません")
+            return {"CANCELLED"}
+
+        try:
+            results = core_pose.sweep_poses(props.base_body, garments, armature)
+        except Exception as e:
+            logger.error(f"姿勢スイープに失敗: {e}")
+            self.report({"ERROR"}, f"姿勢スイープに失敗しました: {e}")
+            return {"CANCELLED"}
+
+        totals = {
+            pose: sum(by_pose[pose]["penetrating"] for by_pose in results.values())
+            for pose in core_pose.POSE_LIBRARY
+        }
+        summary = ", ".join(f"{pose} {count}" for pose, count in totals.items())
+        level = "WARNING" if any(totals.values()) else "INFO"
+        self.report({level}, f"貫通頂点数: {summary}")
+        return {"FINISHED"}
+
+
+def _outfit_garments(body_name: str) -> List[bpy.types.Object]:
+    """素体に生成された衣装一式（プレビュー・LOD・衝突プロキシなどの補助オブジェクトを除く）"""
+    return [
+        obj
+        for obj in bpy.data.objects
+        if obj.get(core_datablocks.GARMENT_TAG)
+        and obj.get(core_datablocks.GARMENT_BODY_TAG) == body_name
+        and not obj.get(core_proxy.PREVIEW_TAG)
+        and not obj.get(core_datablocks.HELPER_TAG)
+        and not re.search(r"_LOD\d+$", obj.name)
+    ]
+
+
+class AWGP_OT_BakeClothCache(Operator):
+    bl_idname = "awgp.bake_cloth_cache"
+    bl_label = "Bake Cloth Cache"
+    bl_description = "選択した衣装のクロスをタイマーで1フレームずつ進めてキャッシュに焼き込みます。焼き込み後はシミュレーションせずにドレープを確認できます（ESCで中断）"
+    bl_options = {"REGISTER"}
+
+    _timer = None
+    _cache = None
+    _frame = 0
+    _original_frame = 0
+
+    @classmethod
+    def poll(cls, context: bpy.types.Context) -> bool:
+        return (
+            context.mode == "OBJECT"
+            and _cloth_modifier(context.active_object) is not None
+        )
+
+    def invoke(self, context: bpy.types.Context, event: bpy.types.Event) -> Set[str]:
+        garment = context.active_object
+        self._cache = _cloth_modifier(garment).point_cache
+        with context.temp_override(point_cache=self._cache):
+            bpy.ops.ptcache.free_bake()
+
+        self._original_frame = context.scene.frame_current
+        self._frame = self._cache.frame_start
+        wm = context.window_manager
+        wm.progress_begin(self._cache.frame_start, self._cache.frame_end)
+        self._timer = wm.event_timer_add(MODAL_STEP_INTERVAL, window=context.window)
+        wm.modal_handler_add(self)
+        logger.info(
+            f"クロスキャッシュ焼き込み開始: {garment.name} ({self._cache.frame_start}-{self._cache.frame_end})"
+        )
+        return {"RUNNING_MODAL"}
+
+    def execute(self, context: bpy.types.Context) -> Set[str]:
+        return self.invoke(context, None)
+
+    def modal(self, context: bpy.types.Context, event: bpy.types.Event) -> Set[str]:
+        if event.type == "ESC" and event.value == "PRESS":
+            self._end_modal(context)
+            self.report({"WARNING"}, "クロスキャッシュの焼き込みを中断しました")
+            return {"CANCELLED"}
+        if event.type != "TIMER":
+            return {"PASS_THROUGH"}
+
+        # フレームを順に進めるとシミュレーション結果がキャッシュに溜まる
+        context.scene.frame_set(self._frame)
+        context.window_manager.progress_update(self._frame)
+        if self._frame < self._cache.frame_end:
+            self._frame += 1
+            return {"RUNNING_MODAL"}
+
+        with context.temp_override(point_cache=self._cache):
+            bpy.ops.ptcache.bake_from_cache()
+        self._end_modal(context)
+        self.report(
+            {"INFO"},
+            f"クロスキャッシュを焼き込みました: {self._cache.frame_start}-{self._cache.frame_end}",
+        )
+        return {"FINISHED"}
+
+    def _end_modal(self, context: bpy.types.Context) -> None:
+        wm = context.window_manager
+        if self._timer is not None:
+            wm.event_timer_remove(self._timer)
+            self._timer = None
+        wm.progress_end()
+        context.scene.frame_set(self._original_frame)
+
+
+def _cloth_modifier(obj: Optional[bpy.types.Object]) -> Optional[bpy.types.Modifier]:
+    if obj is None:
+        return None
+    return next((mod for mod in obj.modifiers if mod.type == "CLOTH"), None)
 
 
 class AWGP_OT_DiagnoseBones(Operator):
@@ -137,6 +601,7 @@ class AWGP_OT_DiagnoseBones(Operator):
             "vertex_groups": [],
             "bones": [],
             "hand_groups": {},
+            "humanoid_mapping": {},
             "mapping_issues": [],
             "mesh_quality": {},
             "compatibility_issues": [],
@@ -146,12 +611,17 @@ class AWGP_OT_DiagnoseBones(Operator):
             result["vertex_groups"] = [vg.name for vg in mesh_obj.vertex_groups]
             logger.info(f"頂点グループ数: {len(result['vertex_groups'])}")
 
+        deform_bones = []
         if armature_obj and armature_obj.type == "ARMATURE":
             result["bones"] = [b.name for b in armature_obj.data.bones]
+            deform_bones = [b.name for b in armature_obj.data.bones if b.use_deform]
             logger.info(f"ボーン数: {len(result['bones'])}")
 
+        result["humanoid_mapping"] = core_utils.humanoid_mapping(
+            result["vertex_groups"], result["bones"], deform_bones
+        )
         result["mapping_issues"] = self._detect_mapping_issues(
-            result["vertex_groups"], result["bones"]
+            result["vertex_groups"], result["bones"], result["humanoid_mapping"]
         )
         result["mesh_quality"] = self._analyze_mesh_quality(mesh_obj)
         result["compatibility_issues"] = self._check_compatibility(mesh_obj)
@@ -164,18 +634,31 @@ class AWGP_OT_DiagnoseBones(Operator):
 
         return result
 
-    def _detect_mapping_issues(self, vertex_groups: list, bones: list) -> list:
-        issues = []
-        for bone_name in bones:
-            if bone_name not in vertex_groups:
+    def _detect_mapping_issues(
+        self,
+        vertex_groups: list,
+        bones: list,
+        humanoid_mapping: Dict[str, Dict[str, Optional[str]]],
+    ) -> list:
+        # 名前の集合で引き、ボーン数×頂点グループ数の走査を避ける
+        group_names = set(vertex_groups)
+        bone_names = set(bones)
+        issues = [
+            f"ボーン '{bone_name}' に対応する頂点グループがありません"
+            for bone_name in bones
+            if bone_name not in group_names
+        ]
+        issues.extend(
+            f"頂点グループ '{vg_name}' に対応するボーンがありません"
+            for vg_name in vertex_groups
+            if vg_name not in bone_names
+        )
+
+        for slot, entry in humanoid_mapping.items():
+            if entry["status"] == "name_mismatch":
                 issues.append(
-                    f"ボーン '{bone_name}' に対応する頂点グループがありません"
+                    f"{slot}: 頂点グループ '{entry['group']}' とボーン '{entry['bone']}' は同じ部位ですが名前が一致しません"
                 )
-
-        for vg_name in vertex_groups:
-            if vg_name not in bones:
-                issues.append(f"頂点グループ '{vg_name}' に対応するボーンがありません")
-
         return issues
 
     def _analyze_mesh_quality(self, obj: bpy.types.Object) -> Dict[str, Any]:
@@ -233,6 +716,15 @@ class AWGP_OT_DiagnoseBones(Operator):
         logger.info(f"頂点グループ: {len(result['vertex_groups'])}個")
         logger.info(f"ボーン: {len(result['bones'])}個")
 
+        mapping = result["humanoid_mapping"]
+        covered = [slot for slot, entry in mapping.items() if entry["status"] == "ok"]
+        logger.info(f"ヒューマノイド対応: {len(covered)}/{len(mapping)} スロット")
+        for slot, entry in mapping.items():
+            if entry["status"] not in ("ok", "missing"):
+                logger.info(
+                    f" - {slot}: {entry['status']} (ボーン={entry['bone']}, 頂点グループ={entry['group']})"
+                )
+
         quality = result["mesh_quality"]
         logger.info(
             f"メッシュ品質: 頂点={quality['vertex_count']}, 面={quality['face_count']}"
@@ -0,0 +1,302 @@
+import bpy
+import math
+import numpy as np
+from mathutils.bvhtree import BVHTree
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+from . import core_binding, core_tracing, core_utils
+
+logger = logging.getLogger(__name__)
+
+# ボーン名（正規化後）から姿勢で動かす役割を決める。先に一致した役割を使う（foot は動かさない）
+POSE_BONE_ROLES = (
+    ("foot", ("foot", "ankle", "toe", "足首", "つま先")),
+    ("forearm", ("forearm", "lowerarm", "elbow", "前腕", "ひじ")),
+    ("upper_arm", ("upperarm", "uparm", "arm", "上腕", "腕")),
+    ("shin", ("shin", "calf", "lowerleg", "knee", "すね", "ひざ", "膝")),
+    ("thigh", ("thigh", "upperleg", "upleg", "leg", "太もも", "脚", "足")),
+    ("spine", ("spine", "chest", "torso", "上半身")),
+)
+# 上位の役割の子孫で同じ名前に一致したボーンは下位の役割に回す（Mixamo の UpLeg → Leg など）
+POSE_CHAIN_ROLES = {"upper_arm": "forearm", "thigh": "shin"}
+
+# 姿勢ごとの (役割, 回転軸, 角度) の並び。軸はアーマチュア空間で素体の左側(+X)について定義し、
+# 右側は X=0 面で鏡像にする。Blenderの人型は前が -Y、上が +Z
+POSE_LIBRARY: Dict[str, Tuple[Tuple[str, Tuple[float, float, float], float], ...]] = {
+    "rest": (),
+    "arms_up": (("upper_arm", (0.0, -1.0, 0.0), 80.0),),
+    "arms_crossed": (
+        ("upper_arm", (0.0, 0.0, -1.0), 70.0),
+        ("forearm", (0.0, 0.0, -1.0), 90.0),
+    ),
+    "crouch": (
+        ("spine", (1.0, 0.0, 0.0), 30.0),
+        ("thigh", (-1.0, 0.0, 0.0), 110.0),
+        ("shin", (1.0, 0.0, 0.0), 130.0),
+    ),
+    "sit": (
+        ("thigh", (-1.0, 0.0, 0.0), 90.0),
+        ("shin", (1.0, 0.0, 0.0), 90.0),
+    ),
+    "prone": (
+        ("spine", (-1.0, 0.0, 0.0), 20.0),
+        ("upper_arm", (0.0, -1.0, 0.0), 160.0),
+    ),
+}
+# 素体表面からこの深さ以上内側にある衣装頂点を貫通とみなす
+PENETRATION_TOLERANCE = 0.001
+PENETRATION_ATTRIBUTE_PREFIX = "AWGP_Penetration_"
+# 最近接点の重心座標がこれ以下の角は0とみなし、点が辺・頂点の上にあると判定する
+FEATURE_TOLERANCE = 1e-5
+
+
+def pose_bones(armature: bpy.types.Object) -> Dict[Tuple[str, str], str]:
+    """(役割, 左右) → ボーン名。同じ役割に複数一致したら根元に近いボーンを使う"""
+    depth = {bone.name: len(bone.parent_recursive) for bone in armature.data.bones}
+    candidates: Dict[Tuple[str, str], List[bpy.types.Bone]] = {}
+    for bone in sorted(armature.data.bones, key=lambda bone: depth[bone.name]):
+        side, name = core_utils.normalize_group_name(bone.name)
+        for role, terms in POSE_BONE_ROLES:
+            if any(term in name for term in terms):
+                candidates.setdefault((role, side), []).append(bone)
+                break
+
+    assigned = {key: bones[0].name for key, bones in candidates.items()}
+    for (role, side), bones in candidates.items():
+        lower = POSE_CHAIN_ROLES.get(role)
+        if lower is None or (lower, side) in assigned:
+            continue
+        chain = [bone for bone in bones[1:] if bones[0] in bone.parent_recursive]
+        if chain:
+            assigned[(lower, side)] = chain[0].name
+    return assigned
+
+
+def _rotation_about(
+    axis: Tuple[float, float, float], degrees: float, pivot: np.ndarray
+) -> np.ndarray:
+    """pivot を通る軸まわりの回転（4x4）"""
+    x, y, z = np.asarray(axis, dtype=np.float64) / np.linalg.norm(axis)
+    c, s = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+    rotation = np.array(
+        [
+            [c + x * x * (1 - c), x * y * (1 - c) - z * s, x * z * (1 - c) + y * s],
+            [y * x * (1 - c) + z * s, c + y * y * (1 - c), y * z * (1 - c) - x * s],
+            [z * x * (1 - c) - y * s, z * y * (1 - c) + x * s, c + z * z * (1 - c)],
+        ]
+    )
+    matrix = np.eye(4)
+    matrix[:3, :3] = rotation
+    matrix[:3, 3] = pivot - rotation @ pivot
+    return matrix
+
+
+def library_skinning_matrices(
+    armature: bpy.types.Object, pose: str
+) -> Dict[str, np.ndarray]:
+    """姿勢ライブラリの1姿勢について、ボーン名 → 休止姿勢からのスキニング行列（アーマチュア空間）"""
+    bones = pose_bones(armature)
+    local: Dict[str, np.ndarray] = {}
+    for role, axis, degrees in POSE_LIBRARY[pose]:
+        for side in ("L", "R", ""):
+            name = bones.get((role, side))
+            if name is None:
+                continue
+            # 右側は鏡像: 軸の Y・Z 成分を反転
+            mirrored = axis if side != "R" else (axis[0], -axis[1], -axis[2])
+            pivot = np.array(armature.data.bones[name].head_local, dtype=np.float64)
+            local[name] = _rotation_about(mirrored, degrees, pivot) @ local.get(
+                name, np.eye(4)
+            )
+
+    # 親から順に合成し、子は親の変形を引き継ぐ
+    matrices: Dict[str, np.ndarray] = {}
+    for bone in sorted(
+        armature.data.bones, key=lambda bone: len(bone.parent_recursive)
+    ):
+        parent = matrices[bone.parent.name] if bone.parent else np.eye(4)
+        matrices[bone.name] = parent @ local.get(bone.name, np.eye(4))
+    return matrices
+
+
+def current_skinning_matrices(armature: bpy.types.Object) -> Dict[str, np.ndarray]:
+    """アーマチュアの現在のポーズ行列からスキニング行列を作る"""
+    return {
+        pose_bone.name: np.array(pose_bone.matrix, dtype=np.float64)
+        @ np.linalg.inv(np.array(pose_bone.bone.matrix_local, dtype=np.float64))
+        for pose_bone in armature.pose.bones
+    }
+
+
+def skin_vertices(
+    coords: np.ndarray, weights: np.ndarray, matrices: np.ndarray
+) -> np.ndarray:
+    """線形ブレンドスキニング。coords (頂点, 3), weights (頂点, ボーン), matrices (姿勢, ボーン, 4, 4)
+    から (姿勢, 頂点, 3) を返す。ウェイトの無い頂点は動かさない"""
+    totals = weights.sum(axis=1)
+    weighted = totals > 0.0
+    normalized = np.zeros_like(weights, dtype=np.float64)
+    normalized[weighted] = weights[weighted] / totals[weighted, None]
+
+    poses, bones = matrices.shape[:2]
+    blended = np.matmul(normalized, matrices[:, :, :3, :].reshape(poses, bones, 12))
+    blended = blended.reshape(poses, len(coords), 3, 4)
+    blended[:, ~weighted, :, :3] += np.eye(3)
+    return np.einsum("pnij,nj->pni", blended[..., :3], coords) + blended[..., 3]
+
+
+def _skinning_inputs(
+    obj: bpy.types.Object, armature: bpy.types.Object
+) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """アーマチュア空間の頂点座標と、ボーンに対応する頂点グループだけのウェイト行列"""
+    to_armature = armature.matrix_world.inverted() @ obj.matrix_world
+    coords = core_binding.transform_points(
+        core_binding.read_coordinates(obj.data), to_armature
+    )
+    weights = core_utils.vertex_weight_matrix(obj)
+    columns = [vg.index for vg in obj.vertex_groups if vg.name in armature.data.bones]
+    names = [obj.vertex_groups[i].name for i in columns]
+    return coords, weights[:, columns], names
+
+
+def _pose_matrix_stack(
+    names: List[str], pose_matrices: List[Dict[str, np.ndarray]]
+) -> np.ndarray:
+    return np.array(
+        [[matrices[name] for name in names] for matrices in pose_matrices]
+    ).reshape(len(pose_matrices), len(names), 4, 4)
+
+
+@core_tracing.traced("pose_sweep", "validation")
+def sweep_poses(
+    body: bpy.types.Object,
+    garments: List[bpy.types.Object],
+    armature: bpy.types.Object,
+    poses: Optional[List[str]] = None,
+    write_heatmaps: bool = True,
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """素体と衣装を姿勢ライブラリの各姿勢でスキニングし、衣装頂点の素体への貫通を数える。
+    戻り値は 衣装名 → 姿勢名 → {"penetrating", "max_depth"}。姿勢 "current" は現在のポーズ"""
+    poses = list(POSE_LIBRARY) if poses is None else poses
+    pose_matrices = [
+        current_skinning_matrices(armature)
+        if pose == "current"
+        else library_skinning_matrices(armature, pose)
+        for pose in poses
+    ]
+
+    body_coords, body_weights, body_names = _skinning_inputs(body, armature)
+    posed_body = skin_vertices(
+        body_coords, body_weights, _pose_matrix_stack(body_names, pose_matrices)
+    )
+    triangles = core_binding.triangle_indices(body.data)
+    trees = [
+        BVHTree.FromPolygons(coords.tolist(), triangles.tolist())
+        for coords in posed_body
+    ]
+
+    results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for garment in garments:
+        coords, weights, names = _skinning_inputs(garment, armature)
+        if not names:
+            logger.warning(
+                f"'{garment.name}' にボーンのウェイトがないため休止形状のまま検査します"
+            )
+        posed = skin_vertices(coords, weights, _pose_matrix_stack(names, pose_matrices))
+        results[garment.name] = {}
+        for pose, tree, points, body_points in zip(poses, trees, posed, posed_body):
+            depth = penetration_depths(tree, points, body_points, triangles)
+            penetrating = depth > PENETRATION_TOLERANCE
+            results[garment.name][pose] = {
+                "penetrating": int(np.count_nonzero(penetrating)),
+                "max_depth": float(depth.max(initial=0.0)),
+            }
+            if write_heatmaps:
+                write_penetration_heatmap(garment.data, pose, depth)
+
+    core_tracing.annotate(poses=len(poses), garments=len(garments))
+    for name, by_pose in results.items():
+        summary = ", ".join(
+            f"{pose} {stats['penetrating']}" for pose, stats in by_pose.items()
+        )
+        logger.info(f"姿勢スイープ: {name} 貫通頂点数 ({summary})")
+    return results
+
+
+def pseudo_normals(
+    coords: np.ndarray, triangles: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """面・頂点・辺の擬似法線。頂点は接する面法線を角度で重み付けした和、辺は両側の面法線の和。
+    戻り値は (面法線, 頂点法線, 三角形の各角の対辺キー, 辺キー（昇順）, 辺法線)"""
+    corners = coords[triangles]
+    face = core_binding.triangle_normals(corners)
+
+    vertex = np.zeros_like(coords)
+    for k in range(3):
+        u = corners[:, (k + 1) % 3] - corners[:, k]
+        v = corners[:, (k + 2) % 3] - corners[:, k]
+        lengths = np.linalg.norm(u, axis=1) * np.linalg.norm(v, axis=1)
+        cosine = np.einsum("ni,ni->n", u, v) / np.maximum(
+            lengths, core_binding.DEGENERATE_AREA
+        )
+        angle = np.arccos(np.clip(cosine, -1.0, 1.0))
+        np.add.at(vertex, triangles[:, k], angle[:, None] * face)
+
+    # 角 k の対辺 (k+1, k+2) を頂点番号の組で一意なキーにする
+    a = triangles[:, [1, 2, 0]].astype(np.int64)
+    b = triangles[:, [2, 0, 1]].astype(np.int64)
+    corner_edges = np.minimum(a, b) * len(coords) + np.maximum(a, b)
+    edge_keys, inverse = np.unique(corner_edges.ravel(), return_inverse=True)
+    edge = np.zeros((len(edge_keys), 3))
+    np.add.at(edge, inverse, np.repeat(face, 3, axis=0))
+    return face, vertex, corner_edges, edge_keys, edge
+
+
+def penetration_depths(
+    tree: BVHTree, points: np.ndarray, coords: np.ndarray, triangles: np.ndarray
+) -> np.ndarray:
+    """素体（coords, triangles から作った tree）の内側にある点の、表面までの深さ（外側は0）を返す。
+    内外は最近接点が面・辺・頂点のどこにあるかで擬似法線を使い分けて判定するので、
+    脇や股のような凹んだ辺・頂点の近くでも、どの面が最近接に選ばれたかに左右されない。
+    コストは1点あたり BVH の最近接探索1回（Python ループ）で、特徴の判定と符号付けは NumPy で一括"""
+    nearest = points.copy()
+    faces = np.full(len(points), -1, dtype=np.int64)
+    for i, co in enumerate(points):
+        location, _, index, _ = tree.find_nearest(co)
+        if location is not None:
+            nearest[i] = location
+            faces[i] = index
+
+    depth = np.zeros(len(points))
+    found = np.flatnonzero(faces >= 0)
+    if not found.size:
+        return depth
+
+    face, vertex, corner_edges, edge_keys, edge = pseudo_normals(coords, triangles)
+    hit_faces = faces[found]
+    corners = triangles[hit_faces]
+    bary = core_binding.barycentric_weights(coords[corners], nearest[found])
+    on_feature = (bary > FEATURE_TOLERANCE).sum(axis=1)
+
+    normals = face[hit_faces]
+    at_vertex = on_feature == 1
+    normals[at_vertex] = vertex[corners[at_vertex, bary[at_vertex].argmax(axis=1)]]
+    at_edge = on_feature == 2
+    keys = corner_edges[hit_faces[at_edge], bary[at_edge].argmin(axis=1)]
+    normals[at_edge] = edge[np.searchsorted(edge_keys, keys)]
+
+    offset = points[found] - nearest[found]
+    signed = np.einsum("ni,ni->n", offset, normals)
+    depth[found] = np.where(signed < 0.0, np.linalg.norm(offset, axis=1), 0.0)
+    return depth
+
+
+def write_penetration_heatmap(
+    mesh: bpy.types.Mesh, pose: str, depth: np.ndarray
+) -> None:
+    """姿勢ごとの貫通深さを頂点の FLOAT 属性に書き込む（属性表示でヒートマップとして確認できる）"""
+    name = f"{PENETRATION_ATTRIBUTE_PREFIX}{pose}"
+    attribute = mesh.attributes.get(name)
+    if attribute is None:
+        attribute = mesh.attributes.new(name, "FLOAT", "POINT")
+    attribute.data.foreach_set("value", depth.astype(np.float32))
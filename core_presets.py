@@ -0,0 +1,203 @@
+import json
+import os
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRESETS_DIR = os.path.join(os.path.dirname(__file__), "presets")
+# 更新時刻の確認間隔。連続した参照ではファイルを見に行かない
+PRESET_RECHECK_SECONDS = 1.0
+
+
+class PresetFile:
+    """JSONプリセット1ファイル分。初回参照時に読み込み、更新時刻が変わったときだけ読み直す"""
+
+    def __init__(self, filename: str, build: Callable[[Any], Dict[str, Any]]):
+        self.path = os.path.join(PRESETS_DIR, filename)
+        self.build = build
+        self.index: Dict[str, Any] = {}
+        self.mtime: Optional[int] = None
+        self.checked = 0.0
+        self.version = 0
+
+    def get(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        if self.mtime is not None and now - self.checked < PRESET_RECHECK_SECONDS:
+            return self.index
+
+        self.checked = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            if self.mtime != -1:
+                logger.error(f"プリセットが見つかりません: {self.path} ({e})")
+                self.index = {}
+                self.mtime = -1
+                self.version += 1
+            return self.index
+
+        if mtime != self.mtime:
+            self._load(mtime)
+        return self.index
+
+    def _load(self, mtime: int) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.index = self.build(json.load(f))
+            logger.debug(f"プリセットを読み込み: {os.path.basename(self.path)}")
+        except (OSError, ValueError) as e:
+            # 編集途中の壊れたファイルでは直前の内容を使い続ける
+            logger.error(f"プリセットの読み込みに失敗: {self.path} ({e})")
+        self.mtime = mtime
+        self.version += 1
+
+
+def _unit(value: Any, key: str) -> float:
+    """0〜1 の数値であることを確認して float で返す"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{key} は数値ではありません")
+    if not 0.0 <= value <= 1.0:
+        raise ValueError(f"{key} が範囲外です: {value}")
+    return float(value)
+
+
+def _color(value: Any) -> Tuple[float, float, float, float]:
+    if not isinstance(value, list) or len(value) not in (3, 4):
+        raise ValueError("color はRGBまたはRGBAの配列ではありません")
+    rgba = list(value) + [1.0] * (4 - len(value))
+    return tuple(_unit(channel, "color") for channel in rgba)
+
+
+def _entries(raw: Any, label: str) -> List[Dict[str, Any]]:
+    """検証に失敗した項目は警告して飛ばし、残りの項目だけを使う"""
+    if not isinstance(raw, list):
+        raise ValueError(f"{label} のトップレベルが配列ではありません")
+    entries = [entry for entry in raw if isinstance(entry, dict)]
+    if len(entries) < len(raw):
+        logger.warning(
+            f"{label}: オブジェクトでない項目を {len(raw) - len(entries)} 件無視"
+        )
+    return entries
+
+
+def _index_materials(raw: Any) -> Dict[str, Any]:
+    by_wear_type: Dict[str, Dict[str, Any]] = {}
+    by_name: Dict[str, Dict[str, Any]] = {}
+    for entry in _entries(raw, "materials.json"):
+        try:
+            preset = {
+                "wear_type": str(entry["wear_type"]).upper(),
+                "name": str(entry["name"]),
+                "color": _color(entry["color"]),
+                "alpha": _unit(entry["alpha"], "alpha"),
+                "specular": _unit(entry["specular"], "specular"),
+                "roughness": _unit(entry["roughness"], "roughness"),
+            }
+        except (KeyError, ValueError) as e:
+            logger.warning(f"materials.json の項目を無視: {entry.get('name')} ({e})")
+            continue
+        # 同じ衣装タイプに複数ある場合は先頭を既定にする
+        by_wear_type.setdefault(preset["wear_type"], preset)
+        by_name[preset["name"]] = preset
+    return {"by_wear_type": by_wear_type, "by_name": by_name}
+
+
+def _index_wear_types(raw: Any) -> Dict[str, Any]:
+    by_id: Dict[str, Dict[str, Any]] = {}
+    for entry in _entries(raw, "wear_types.json"):
+        try:
+            settings = entry["mesh_settings"]
+            groups = settings["vertex_groups"]
+            if not isinstance(groups, list) or not all(
+                isinstance(name, str) for name in groups
+            ):
+                raise ValueError("vertex_groups は文字列の配列ではありません")
+            preset = {
+                "id": str(entry["id"]).upper(),
+                "name": str(entry["name"]),
+                "additional_props": tuple(entry.get("additional_props", ())),
+                "vertex_groups": tuple(groups),
+                "selection_threshold": _unit(
+                    settings["selection_threshold"], "selection_threshold"
+                ),
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"wear_types.json の項目を無視: {entry.get('id')} ({e})")
+            continue
+        by_id[preset["id"]] = preset
+    return by_id
+
+
+def _index_vertex_groups(raw: Any) -> Dict[str, Any]:
+    if not isinstance(raw, dict):
+        raise ValueError(
+            "vertex_groups.json のトップレベルがオブジェクトではありません"
+        )
+    return {
+        str(part): tuple(alias for alias in aliases if isinstance(alias, str))
+        for part, aliases in raw.items()
+        if isinstance(aliases, list)
+    }
+
+
+def _index_humanoid_bones(raw: Any) -> Dict[str, Any]:
+    """{"center": {スロット: 別名}, "paired": {スロット: 別名}}。paired は左右があるスロット"""
+    if not isinstance(raw, dict):
+        raise ValueError(
+            "humanoid_bones.json のトップレベルがオブジェクトではありません"
+        )
+    index = {}
+    for kind in ("center", "paired"):
+        slots = raw.get(kind, {})
+        if not isinstance(slots, dict):
+            raise ValueError(
+                f"humanoid_bones.json の {kind} がオブジェクトではありません"
+            )
+        index[kind] = {
+            str(slot): tuple(alias for alias in aliases if isinstance(alias, str))
+            for slot, aliases in slots.items()
+            if isinstance(aliases, list)
+        }
+    return index
+
+
+_presets: Dict[str, PresetFile] = {
+    "materials": PresetFile("materials.json", _index_materials),
+    "wear_types": PresetFile("wear_types.json", _index_wear_types),
+    "vertex_groups": PresetFile("vertex_groups.json", _index_vertex_groups),
+    "humanoid_bones": PresetFile("humanoid_bones.json", _index_humanoid_bones),
+}
+
+
+def version(kind: str) -> int:
+    """プリセットが読み直されるたびに増える番号（派生キャッシュの無効化用）"""
+    preset = _presets[kind]
+    preset.get()
+    return preset.version
+
+
+def material_preset(wear_type: str) -> Optional[Dict[str, Any]]:
+    return _presets["materials"].get().get("by_wear_type", {}).get(wear_type.upper())
+
+
+def material_preset_by_name(name: str) -> Optional[Dict[str, Any]]:
+    return _presets["materials"].get().get("by_name", {}).get(name)
+
+
+def wear_type_preset(wear_type: str) -> Optional[Dict[str, Any]]:
+    return _presets["wear_types"].get().get(wear_type.upper())
+
+
+def selection_threshold(wear_type: str, default: float) -> float:
+    preset = wear_type_preset(wear_type)
+    return preset["selection_threshold"] if preset else default
+
+
+def group_synonyms() -> Dict[str, Tuple[str, ...]]:
+    return _presets["vertex_groups"].get()
+
+
+def humanoid_bones() -> Dict[str, Dict[str, Tuple[str, ...]]]:
+    return _presets["humanoid_bones"].get()
@@ -9,6 +9,7 @@ from bpy.props import (
     StringProperty,
 )
 from typing import Optional
+from . import core_live, core_materials
 
 
 def poll_mesh_objects(self, obj: bpy.types.Object) -> bool:
@@ -21,6 +22,7 @@ class AWGProPropertyGroup(PropertyGroup):
         description="衣装生成の基となる3Dメッシュ",
         type=bpy.types.Object,
         poll=poll_mesh_objects,
+        update=core_live.on_setting_changed,
     )
 
     wear_type: EnumProperty(
@@ -36,6 +38,7 @@ class AWGProPropertyGroup(PropertyGroup):
             ("SKIRT", "プリーツスカート", "動きのあるプリーツスカートを生成"),
         ],
         default="T_SHIRT",
+        update=core_live.on_setting_changed,
     )
 
     quality_level: EnumProperty(
@@ -50,6 +53,27 @@ class AWGProPropertyGroup(PropertyGroup):
         default="ULTIMATE",
     )
 
+    preview_mode: BoolProperty(
+        name="プレビューモード",
+        description="間引いたプロキシ素体で粗い衣装を高速生成（パラメータ調整用）。確定は「Promote Preview」で行う",
+        default=False,
+    )
+
+    preview_triangles: IntProperty(
+        name="プロキシ三角形数",
+        description="プレビュー用プロキシ素体の三角形数",
+        default=3000,
+        min=500,
+        max=50000,
+    )
+
+    live_mode: BoolProperty(
+        name="ライブ選択プレビュー",
+        description="閾値や丈を変更すると選択範囲を素体のカラー属性にヒートマップ表示（衣装は生成しない）",
+        default=False,
+        update=core_live.on_live_mode_changed,
+    )
+
     tight_fit: BoolProperty(
         name="密着フィット",
         description="素体に密着したフィッティングを適用",
@@ -77,6 +101,7 @@ class AWGProPropertyGroup(PropertyGroup):
         min=0.0,
         max=1.0,
         precision=2,
+        update=core_live.on_setting_changed,
     )
 
     ai_subdivision: BoolProperty(
@@ -101,6 +126,7 @@ class AWGProPropertyGroup(PropertyGroup):
         min=0.0,
         max=1.0,
         precision=2,
+        update=core_live.on_setting_changed,
     )
 
     glove_fingers: BoolProperty(
@@ -116,6 +142,7 @@ class AWGProPropertyGroup(PropertyGroup):
         min=0.0,
         max=1.0,
         precision=2,
+        update=core_live.on_setting_changed,
     )
 
     pleat_count: IntProperty(
@@ -135,6 +162,22 @@ class AWGProPropertyGroup(PropertyGroup):
         precision=3,
     )
 
+    skirt_segments: IntProperty(
+        name="周方向分割数",
+        description="スカートの周方向の頂点数（プリーツ数×2の倍数に切り上げ）",
+        default=96,
+        min=24,
+        max=512,
+    )
+
+    skirt_rings: IntProperty(
+        name="縦方向分割数",
+        description="ウエストから裾までのリング数",
+        default=24,
+        min=4,
+        max=256,
+    )
+
     enable_cloth_sim: BoolProperty(
         name="クロスシミュレーション",
         description="リアルな布の動きをシミュレート",
@@ -150,7 +193,9 @@ class AWGProPropertyGroup(PropertyGroup):
     )
 
     preserve_shapekeys: BoolProperty(
-        name="シェイプキー保持", description="元のシェイプキーを保持", default=True
+        name="シェイプキー保持",
+        description="素体のシェイプキーを表面結合で衣装とLODに転送",
+        default=True,
     )
 
     use_vertex_groups: BoolProperty(
@@ -186,6 +231,7 @@ class AWGProPropertyGroup(PropertyGroup):
         min=0.0,
         max=1.0,
         precision=2,
+        update=core_live.on_setting_changed,
     )
 
     ai_bra_threshold: FloatProperty(
@@ -195,6 +241,7 @@ class AWGProPropertyGroup(PropertyGroup):
         min=0.0,
         max=1.0,
         precision=2,
+        update=core_live.on_setting_changed,
     )
 
     ai_tshirt_threshold: FloatProperty(
@@ -204,6 +251,7 @@ class AWGProPropertyGroup(PropertyGroup):
         min=0.0,
         max=1.0,
         precision=2,
+        update=core_live.on_setting_changed,
     )
 
     ai_sock_multiplier: FloatProperty(
@@ -213,6 +261,7 @@ class AWGProPropertyGroup(PropertyGroup):
         min=0.1,
         max=3.0,
         precision=2,
+        update=core_live.on_setting_changed,
     )
 
     ai_tight_offset: FloatProperty(
@@ -239,6 +288,92 @@ class AWGProPropertyGroup(PropertyGroup):
         default=True,
     )
 
+    target_triangles: IntProperty(
+        name="目標三角形数",
+        description="メイン衣装の三角形数の上限（0=制限なし）。超過できない場合は生成を中止",
+        default=0,
+        min=0,
+        max=500000,
+    )
+
+    generate_lods: BoolProperty(
+        name="LOD生成",
+        description="境界ループとUVシームを保持したデシメーションでLODチェーンを生成",
+        default=False,
+    )
+
+    lod_levels: IntProperty(
+        name="LOD段数",
+        description="生成するLODの段数",
+        default=2,
+        min=1,
+        max=4,
+    )
+
+    lod_ratio: FloatProperty(
+        name="LOD縮小率",
+        description="各LOD段で三角形数に掛ける比率",
+        default=0.5,
+        min=0.1,
+        max=0.9,
+        precision=2,
+    )
+
+    replace_previous_garment: BoolProperty(
+        name="既存衣装を置き換え",
+        description="同じ素体・衣装タイプで再生成したとき、以前の生成結果と未使用になったデータを削除（既定では残す）",
+        default=False,
+    )
+
+    cache_memory_mb: IntProperty(
+        name="キャッシュ上限 (MB)",
+        description="同じ素体・同じ設定の生成結果を再利用するキャッシュのメモリ上限（0=無効）。超過時は古いものから破棄",
+        default=256,
+        min=0,
+        max=8192,
+    )
+
+    bake_atlas_size: EnumProperty(
+        name="アトラス解像度",
+        description="衣装一式のプロシージャルテクスチャを焼き込む画像の一辺",
+        items=[
+            ("1024", "1024", "1024 x 1024"),
+            ("2048", "2048", "2048 x 2048"),
+            ("4096", "4096", "4096 x 4096"),
+        ],
+        default="2048",
+    )
+
+    bake_workers: IntProperty(
+        name="ベイクプロセス数",
+        description="衣装ごとのベイクを並列に行うバックグラウンドBlenderの数（0=CPUコア数から自動, 1=このBlender内で順に実行）",
+        default=0,
+        min=0,
+        max=16,
+    )
+
+    shader_lod: EnumProperty(
+        name="シェーダー表示",
+        description="ビューポートでの衣装マテリアルの表示品質（レンダリング・保存中は自動的に完全表示に戻ります）",
+        items=[
+            ("FULL", "完全", "布地テクスチャと透過を含む本来のシェーダー"),
+            (
+                "VIEWPORT",
+                "軽量",
+                "単色・不透明の軽量シェーダー（衣装の多いシーン向け）",
+            ),
+        ],
+        default="FULL",
+        update=core_materials.on_shader_lod_changed,
+    )
+
+    trace_export_path: StringProperty(
+        name="トレース出力先",
+        description="生成ごとのステージ別処理時間をChrome trace JSON（about:tracing）として保存（空欄=出力しない）",
+        default="",
+        subtype="FILE_PATH",
+    )
+
     def get_ai_settings(self) -> dict:
         return {
             "quality_mode": self.ai_quality_mode,
@@ -268,4 +403,6 @@ class AWGProPropertyGroup(PropertyGroup):
                 errors.append("プリーツ数は6から24の範囲で設定してください")
             if self.pleat_depth < 0.01 or self.pleat_depth > 0.2:
                 errors.append("プリーツ深さは0.01から0.2の範囲で設定してください")
+        if 0 < self.target_triangles < 64:
+            errors.append("目標三角形数は0（制限なし）または64以上で設定してください")
         return len(errors) == 0, errors
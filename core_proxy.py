@@ -0,0 +1,98 @@
+import bpy
+import hashlib
+import numpy as np
+from typing import Dict, List, Tuple
+import logging
+from . import core_binding, core_datablocks, core_tracing, core_utils
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_TAG = "awgp_preview"
+PROXY_SUFFIX = "_AWGP_Proxy"
+
+# 素体名 → (プロキシキー, プロキシオブジェクト名)。プロキシはシーンにリンクしない
+_proxies: Dict[str, Tuple[str, str]] = {}
+
+
+def _proxy_key(body: bpy.types.Object, target_triangles: int) -> str:
+    mesh = body.data
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(coords)
+    digest.update(
+        f"{mesh.as_pointer()}:{len(mesh.polygons)}:{target_triangles}".encode()
+    )
+    digest.update("|".join(vg.name for vg in body.vertex_groups).encode("utf-8"))
+    return digest.hexdigest()
+
+
+@core_tracing.traced("proxy_body", "preview")
+def get_proxy_body(body: bpy.types.Object, target_triangles: int) -> bpy.types.Object:
+    """間引いたプロキシ素体を返す（素体の形状が変わらない限り再利用）"""
+    key = _proxy_key(body, target_triangles)
+    cached_key, proxy_name = _proxies.get(body.name, ("", ""))
+    proxy = bpy.data.objects.get(proxy_name)
+    if proxy is not None and cached_key == key:
+        core_tracing.annotate(cached=True)
+        return proxy
+
+    # 素体が編集された・三角形数が変わった場合は古いプロキシを捨てて作り直す
+    core_datablocks.remove_object(proxy)
+    proxy = build_proxy_body(body, target_triangles)
+    _proxies[body.name] = (key, proxy.name)
+    core_tracing.annotate(cached=False, vertices=len(proxy.data.vertices))
+    return proxy
+
+
+def build_proxy_body(body: bpy.types.Object, target_triangles: int) -> bpy.types.Object:
+    start_triangles = core_utils.count_triangles(body.data)
+    mesh = None
+    if start_triangles > target_triangles:
+        mesh = core_utils.decimate_mesh_data(body, target_triangles)
+    if mesh is None:
+        mesh = body.data.copy()
+    mesh.name = f"{body.data.name}{PROXY_SUFFIX}"
+
+    proxy = bpy.data.objects.new(f"{body.name}{PROXY_SUFFIX}", mesh)
+    proxy.matrix_world = body.matrix_world.copy()
+    transfer_weights_nearest(body, proxy)
+
+    logger.info(
+        f"プロキシ素体を作成: {proxy.name} ({start_triangles} -> {core_utils.count_triangles(mesh)} 三角形)"
+    )
+    return proxy
+
+
+def transfer_weights_nearest(
+    source: bpy.types.Object, target: bpy.types.Object
+) -> None:
+    """最近傍頂点のウェイトをそのまま写す。最近傍は生成時と同じ表面結合から、
+    結合先の三角形で重心座標が最大の角を取る"""
+    binding = core_binding.surface_binding(source, target)
+    nearest = binding.triangles[
+        np.arange(len(binding.triangles)), binding.weights.argmax(axis=1)
+    ]
+    transferred = core_utils.vertex_weight_matrix(source)[nearest]
+
+    target.vertex_groups.clear()
+    steps = np.floor(transferred * core_utils.WEIGHT_STEPS + 0.5).astype(np.int64)
+    core_utils.write_vertex_weights(
+        target, [vg.name for vg in source.vertex_groups], steps
+    )
+
+
+def mark_preview(garment: bpy.types.Object, props) -> None:
+    garment.name = f"{props.base_body.name}_{props.wear_type}_Preview"
+    garment[PREVIEW_TAG] = True
+
+
+def find_preview_garments(body: bpy.types.Object, wear_type: str) -> List[str]:
+    return [
+        obj.name
+        for obj in bpy.data.objects
+        if obj.get(PREVIEW_TAG)
+        and obj.get(core_datablocks.GARMENT_BODY_TAG) == body.name
+        and obj.get(core_datablocks.GARMENT_TYPE_TAG) == wear_type
+    ]
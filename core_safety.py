@@ -59,8 +59,11 @@ def strict_apply_post_processing(self: Any, garment: Any, props: Any) -> None:
 
 
 def install_strict_generation_contract(core_operators: Any) -> None:
-    """Install the fail-closed method before Blender registers the operator."""
+    """Install the fail-closed method before Blender registers the operators."""
 
+    core_operators.AWGP_OT_GenerateWearModal._apply_post_processing = (
+        strict_apply_post_processing
+    )
     operator = core_operators.AWGP_OT_GenerateWear
     operator._apply_post_processing = strict_apply_post_processing
     operator.bl_description = (
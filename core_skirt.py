@@ -0,0 +1,274 @@
+import bpy
+import math
+import numpy as np
+from typing import Any, Dict
+import logging
+from . import core_tracing, core_utils
+
+logger = logging.getLogger(__name__)
+
+# 腰回りとして扱う頂点ウェイト
+SKIRT_BODY_WEIGHT = 0.5
+# ウエスト断面として使う帯の厚み（素体の高さに対する比率）
+SKIRT_WAIST_BAND = 0.03
+# 裾に向かって広がる割合（ウエスト半径に対する比率）
+SKIRT_FLARE = 0.35
+# 素体（脚）との最小すき間（厚みに加算）
+SKIRT_CLEARANCE = 0.01
+# ウエストでのプリーツ深さ（裾を1とした比率）
+SKIRT_PLEAT_WAIST_RATIO = 0.3
+# 裾で脚グループに移すウェイトの割合
+SKIRT_LEG_BLEND = 0.6
+
+
+def angular_profile(
+    offsets: np.ndarray, segments: int, minimum: float = 0.0
+) -> np.ndarray:
+    """中心からの水平オフセット (N, 2) を角度ビンごとの最大半径に集約（空のビンは周期補間）"""
+    radii = np.full(segments, np.nan)
+    if len(offsets):
+        angles = np.arctan2(offsets[:, 1], offsets[:, 0]) % (2 * math.pi)
+        bins = np.minimum(
+            (angles / (2 * math.pi) * segments).astype(np.int64), segments - 1
+        )
+        filled = np.zeros(segments)
+        np.maximum.at(filled, bins, np.hypot(offsets[:, 0], offsets[:, 1]))
+        hit = np.bincount(bins, minlength=segments) > 0
+        radii[hit] = filled[hit]
+
+    known = np.flatnonzero(~np.isnan(radii))
+    if len(known) == 0:
+        return np.full(segments, minimum)
+    if len(known) < segments:
+        radii = np.interp(np.arange(segments), known, radii[known], period=segments)
+    return np.maximum(radii, minimum)
+
+
+@core_tracing.traced("skirt.measure_body", "skirt")
+def measure_body(
+    body: bpy.types.Object, hip_groups: list, leg_groups: list, segments: int
+) -> Dict[str, Any]:
+    """素体からウエスト断面・股下・床の高さを測る（素体のローカル座標）"""
+    mesh = body.data
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    coords = coords.reshape(-1, 3)
+
+    weights = core_utils.vertex_weight_matrix(body)
+    hip_weight = weights[:, [g.index for g in hip_groups]].max(axis=1)
+    leg_weight = (
+        weights[:, [g.index for g in leg_groups]].max(axis=1)
+        if leg_groups
+        else np.zeros(len(coords), dtype=np.float32)
+    )
+    hip_mask = hip_weight >= SKIRT_BODY_WEIGHT
+    if not np.any(hip_mask):
+        hip_mask = hip_weight > 0.0
+    if not np.any(hip_mask):
+        raise ValueError("腰の頂点グループにウェイトを持つ頂点がありません")
+    leg_mask = leg_weight >= SKIRT_BODY_WEIGHT
+
+    body_height = float(np.ptp(coords[:, 2])) or 1.0
+    waist_z = float(coords[hip_mask, 2].max())
+    crotch_z = float(coords[hip_mask, 2].min())
+    floor_z = float(
+        coords[leg_mask, 2].min() if np.any(leg_mask) else coords[:, 2].min()
+    )
+    center = coords[hip_mask, :2].mean(axis=0)
+
+    # 腕などが同じ高さにあっても拾わないよう、腰ウェイトを持つ頂点だけで断面を取る
+    band = hip_mask & (coords[:, 2] >= waist_z - SKIRT_WAIST_BAND * body_height)
+    minimum_radius = 0.1 * float(
+        np.ptp(coords[hip_mask | leg_mask, :2], axis=0).max() or body_height
+    )
+    waist_profile = angular_profile(coords[band, :2] - center, segments, minimum_radius)
+
+    return {
+        "coords": coords,
+        "body_mask": hip_mask | leg_mask,
+        "center": center,
+        "waist_z": waist_z,
+        "crotch_z": crotch_z,
+        "floor_z": floor_z,
+        "body_height": body_height,
+        "waist_profile": waist_profile,
+    }
+
+
+def hem_height(measure: Dict[str, Any], skirt_length: float) -> float:
+    """丈 0.0=膝上, 1.0=足首 を高さに変換"""
+    leg_length = max(
+        measure["crotch_z"] - measure["floor_z"], 0.25 * measure["body_height"]
+    )
+    above_knee = measure["crotch_z"] - 0.35 * leg_length
+    ankle = measure["floor_z"] + 0.1 * leg_length
+    hem_z = above_knee + (ankle - above_knee) * skirt_length
+    return min(hem_z, measure["waist_z"] - 0.05 * measure["body_height"])
+
+
+def pleat_offsets(
+    theta: np.ndarray, t: np.ndarray, pleat_count: int, depth: float
+) -> np.ndarray:
+    """全プリーツの半径方向の変位を一括計算（θ: 周方向角度, t: ウエスト0〜裾1）"""
+    phase = (theta * pleat_count / (2 * math.pi)) % 1.0
+    fold = 1.0 - 4.0 * np.abs(phase - 0.5)  # 山と谷が交互に並ぶ三角波
+    fade = SKIRT_PLEAT_WAIST_RATIO + (1.0 - SKIRT_PLEAT_WAIST_RATIO) * t
+    return depth * fold * fade
+
+
+def skirt_segments(requested: int, pleat_count: int) -> int:
+    """山と谷の折り目が必ず頂点列に乗るよう、周方向分割数をプリーツ数×2の倍数に切り上げる"""
+    step = 2 * max(pleat_count, 1)
+    return max(step, int(math.ceil(requested / step)) * step)
+
+
+@core_tracing.traced("skirt.loft", "skirt")
+def loft_skirt_radii(
+    measure: Dict[str, Any], hem_z: float, rings: int, segments: int, thickness: float
+) -> np.ndarray:
+    """ウエスト断面から裾までの各リング・各角度の半径 (rings, segments)"""
+    t = np.linspace(0.0, 1.0, rings)
+    offset = thickness + SKIRT_CLEARANCE
+    radii = (measure["waist_profile"][None, :] + offset) * (
+        1.0 + SKIRT_FLARE * t[:, None]
+    )
+
+    # 各リングの高さ帯にある腰・脚の頂点を外側に包む（素体を1回走査するだけ）
+    coords = measure["coords"][measure["body_mask"]]
+    z = np.linspace(measure["waist_z"], hem_z, rings)
+    inside = (coords[:, 2] <= z[0]) & (coords[:, 2] >= z[-1])
+    coords = coords[inside]
+    if len(coords):
+        ring_index = np.clip(
+            np.rint(
+                (z[0] - coords[:, 2]) / max(z[0] - z[-1], 1e-6) * (rings - 1)
+            ).astype(np.int64),
+            0,
+            rings - 1,
+        )
+        offsets = coords[:, :2] - measure["center"]
+        angles = np.arctan2(offsets[:, 1], offsets[:, 0]) % (2 * math.pi)
+        bins = np.minimum(
+            (angles / (2 * math.pi) * segments).astype(np.int64), segments - 1
+        )
+        envelope = np.zeros((rings, segments))
+        np.maximum.at(
+            envelope, (ring_index, bins), np.hypot(offsets[:, 0], offsets[:, 1])
+        )
+        radii = np.maximum(radii, envelope + offset)
+
+    # 裾に向かって狭まらないようにする
+    return np.maximum.accumulate(radii, axis=0)
+
+
+def build_ring_mesh(
+    name: str, positions: np.ndarray, rings: int, segments: int
+) -> bpy.types.Mesh:
+    """(rings*segments, 3) の頂点から周方向に閉じた四角形帯メッシュをバッファ一括で作成"""
+    ring = np.arange(rings - 1)[:, None]
+    seg = np.arange(segments)[None, :]
+    nxt = (seg + 1) % segments
+    a = ring * segments + seg
+    b = ring * segments + nxt
+    c = (ring + 1) * segments + nxt
+    d = (ring + 1) * segments + seg
+    loops = np.stack([a, d, c, b], axis=-1).reshape(-1).astype(np.int32)
+    face_count = (rings - 1) * segments
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(positions))
+    mesh.vertices.foreach_set("co", positions.astype(np.float32).ravel())
+    mesh.loops.add(len(loops))
+    mesh.loops.foreach_set("vertex_index", loops)
+    mesh.polygons.add(face_count)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, len(loops), 4, dtype=np.int32))
+    if bpy.app.version < (4, 0, 0):
+        mesh.polygons.foreach_set("loop_total", np.full(face_count, 4, dtype=np.int32))
+    mesh.polygons.foreach_set("use_smooth", np.ones(face_count, dtype=bool))
+    mesh.update(calc_edges=True)
+
+    # 周方向 u・縦方向 v のUV。最後の列は u=1 にして継ぎ目でUVが折り返さないようにする
+    u = np.stack([seg, seg, seg + 1, seg + 1], axis=-1) / segments
+    v = np.stack([ring, ring + 1, ring + 1, ring], axis=-1) / max(rings - 1, 1)
+    u, v = np.broadcast_arrays(u, v)
+    uv = np.stack([u.reshape(-1), 1.0 - v.reshape(-1)], axis=-1).astype(np.float32)
+    mesh.uv_layers.new(name="UVMap").data.foreach_set("uv", uv.ravel())
+
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int64)
+    mesh.edges.foreach_get("vertices", edges)
+    columns = edges.reshape(-1, 2) % segments
+    mesh.edges.foreach_set("use_seam", (columns[:, 0] == 0) & (columns[:, 1] == 0))
+    return mesh
+
+
+def assign_skirt_weights(
+    skirt_obj: bpy.types.Object,
+    body: bpy.types.Object,
+    hip_group: bpy.types.VertexGroup,
+    t: np.ndarray,
+    side: np.ndarray,
+) -> None:
+    """腰グループ→左右の脚グループへ縦方向にブレンドしたウェイトを付与"""
+    index = core_utils.vertex_group_index(body)
+    legs = {}
+    for leg_side in ("L", "R"):
+        slot = index.primary("leg", leg_side)
+        legs[leg_side] = None if slot is None else body.vertex_groups[slot]
+
+    leg_share = SKIRT_LEG_BLEND * t if any(legs.values()) else np.zeros_like(t)
+    targets = [(hip_group, 1.0 - leg_share)]
+    targets.append((legs["L"], leg_share * side))
+    targets.append((legs["R"], leg_share * (1.0 - side)))
+
+    # 左右の脚が同じグループに解決された場合は合算してから、グループ×値ごとに一括で書き込む
+    blended: Dict[str, np.ndarray] = {}
+    for source, weights in targets:
+        if source is not None:
+            blended[source.name] = blended.get(source.name, 0.0) + weights
+    steps = np.floor(
+        np.stack(list(blended.values()), axis=1) * core_utils.WEIGHT_STEPS + 0.5
+    ).astype(np.int64)
+    core_utils.write_vertex_weights(skirt_obj, list(blended), steps)
+
+
+@core_tracing.traced("skirt.build", "skirt")
+def build_skirt(
+    props, body: bpy.types.Object, hip_groups: list, leg_groups: list
+) -> bpy.types.Object:
+    """ウエスト断面から裾までロフトしたプリーツスカートを作成（コストはスカートの解像度に比例）"""
+    rings = max(props.skirt_rings, 2)
+    segments = skirt_segments(props.skirt_segments, props.pleat_count)
+
+    measure = measure_body(body, hip_groups, leg_groups, segments)
+    hem_z = hem_height(measure, props.skirt_length)
+    radii = loft_skirt_radii(measure, hem_z, rings, segments, props.thickness)
+
+    t = np.repeat(np.linspace(0.0, 1.0, rings), segments)
+    theta = np.tile(np.arange(segments) * (2 * math.pi / segments), rings)
+    radius = radii.ravel() + pleat_offsets(
+        theta, t, props.pleat_count, props.pleat_depth
+    )
+    positions = np.column_stack(
+        [
+            measure["center"][0] + radius * np.cos(theta),
+            measure["center"][1] + radius * np.sin(theta),
+            measure["waist_z"] + (hem_z - measure["waist_z"]) * t,
+        ]
+    )
+
+    name = f"{props.base_body.name}_Ultimate_Skirt"
+    skirt_obj = bpy.data.objects.new(
+        name, build_ring_mesh(name, positions, rings, segments)
+    )
+    skirt_obj.matrix_world = body.matrix_world.copy()
+    bpy.context.collection.objects.link(skirt_obj)
+
+    # Blenderの人型リグは +X が左半身
+    side = np.clip(0.5 + 0.5 * np.cos(theta), 0.0, 1.0)
+    assign_skirt_weights(skirt_obj, body, hip_groups[0], t, side)
+
+    core_tracing.annotate(rings=rings, segments=segments, vertices=len(positions))
+    logger.info(
+        f"🔧 Lofted skirt: {rings}x{segments} vertices, waist_z={measure['waist_z']:.3f}, hem_z={hem_z:.3f}"
+    )
+    return skirt_obj
@@ -0,0 +1,411 @@
+import bpy
+import bmesh
+import itertools
+import math
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+from . import core_tracing
+
+logger = logging.getLogger(__name__)
+
+# 最大成分に対してこの比率以上の大きさの島は残す（左右の手・足など）
+ISLAND_KEEP_RATIO = 0.1
+# 強いウェイトの頂点が半数以上を占める島は小さくても残す
+ISLAND_SEED_WEIGHT = 0.5
+ISLAND_SEED_RATIO = 0.5
+ISLAND_MIN_SEED_VERTICES = 8
+# 選択頂点数に対してこの比率以下の未選択領域は穴として埋める
+HOLE_FILL_RATIO = 0.02
+# 最長の境界ループに対してこの比率未満の周長のループは開口部ではなく穴
+HOLE_PERIMETER_RATIO = 0.2
+# 法線のZ成分がこれ以上なら水平な開口（ウエスト・裾・袖口）、未満なら袖
+HORIZONTAL_LOOP_NORMAL_Z = 0.7
+# 下側の開口のうち最大半径に対してこの比率以上のものが1つだけなら裾
+HEM_RADIUS_RATIO = 0.6
+# 隣接面の法線がこの角度以上開いているエッジをシャープにする（エッジスムージングと同じ45度）
+SHARP_EDGE_ANGLE = math.radians(45)
+SHARP_EDGE_ATTRIBUTE = "sharp_edge"
+# 裾の半径を周方向にこの数だけ等間隔サンプリングしてFFTにかける（最大プリーツ数の2倍より十分大きく）
+PLEAT_SPECTRUM_SAMPLES = 256
+# 近接ペア探索で調べる自分と周囲のセル（3x3x3）
+NEIGHBOR_CELLS = np.array(list(itertools.product((-1, 0, 1), repeat=3)), dtype=np.int64)
+
+
+def label_components(count: int, pair_a: np.ndarray, pair_b: np.ndarray) -> np.ndarray:
+    """頂点ペアから連結成分ラベルを計算（ベクトル化Union-Find）。ラベルは成分内の最小頂点番号"""
+    parent = np.arange(count)
+    while pair_a.size:
+        root_a = parent[pair_a]
+        root_b = parent[pair_b]
+        pending = root_a != root_b
+        if not np.any(pending):
+            break
+
+        # 接続済みのペアは以降の反復から外す
+        pair_a = pair_a[pending]
+        pair_b = pair_b[pending]
+        root_a = root_a[pending]
+        root_b = root_b[pending]
+
+        # 大きい方の根を小さい方の根へ接続し、ポインタジャンプで経路を圧縮する。
+        # 同じ根への書き込みが重なってもどれか1つの小さい根が入るので正しさは保たれる
+        parent[np.maximum(root_a, root_b)] = np.minimum(root_a, root_b)
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+    return parent
+
+
+def close_pairs(coords: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+    """距離 radius 以内の頂点ペア (i < j) を格子ハッシュで一括列挙する。
+    セル幅を radius にすると相手は必ず隣接27セルのどれかに入る"""
+    count = len(coords)
+    if count < 2 or radius <= 0.0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    # 1セル分の余白をとり、隣のセル番号が別の行へ回り込まないようにする
+    cells = np.floor(coords / radius).astype(np.int64)
+    cells -= cells.min(axis=0) - 1
+    shape = cells.max(axis=0) + 2
+    strides = np.array([shape[1] * shape[2], shape[2], 1], dtype=np.int64)
+    keys = cells @ strides
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    # 各頂点×隣接セルについて、そのセルに入っている頂点をすべて候補にする
+    neighbors = (keys[:, None] + NEIGHBOR_CELLS @ strides).ravel()
+    start = np.searchsorted(sorted_keys, neighbors, side="left")
+    counts = np.searchsorted(sorted_keys, neighbors, side="right") - start
+    pair_a = np.repeat(np.arange(count).repeat(len(NEIGHBOR_CELLS)), counts)
+    within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    pair_b = order[np.repeat(start, counts) + within]
+
+    keep = pair_b > pair_a
+    pair_a, pair_b = pair_a[keep], pair_b[keep]
+    keep = np.linalg.norm(coords[pair_a] - coords[pair_b], axis=1) <= radius
+    return pair_a[keep], pair_b[keep]
+
+
+def mesh_edge_array(mesh: bpy.types.Mesh) -> np.ndarray:
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int64)
+    mesh.edges.foreach_get("vertices", edges)
+    return edges.reshape(-1, 2)
+
+
+def bmesh_edge_array(bm: bmesh.types.BMesh) -> np.ndarray:
+    bm.verts.index_update()
+    return np.array(
+        [(edge.verts[0].index, edge.verts[1].index) for edge in bm.edges],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+
+
+@core_tracing.traced("clean_selection", "selection")
+def clean_selection_mask(
+    edges: np.ndarray,
+    mask: np.ndarray,
+    seeds: Optional[np.ndarray] = None,
+    keep_ratio: float = ISLAND_KEEP_RATIO,
+    hole_ratio: float = HOLE_FILL_RATIO,
+) -> Tuple[np.ndarray, Dict[str, int]]:
+    """選択マスクから小さな島を除き、選択領域に囲まれた小さな穴を埋める"""
+    count = len(mask)
+    stats = {"islands_removed": 0, "holes_filled": 0, "vertices_changed": 0}
+    if count == 0 or not np.any(mask) or len(edges) == 0:
+        return mask.copy(), stats
+
+    # 選択状態が同じ頂点同士の辺だけで連結成分を取ると、選択側と未選択側を1回で分けられる
+    same = mask[edges[:, 0]] == mask[edges[:, 1]]
+    labels = label_components(count, edges[same, 0], edges[same, 1])
+    sizes = np.bincount(labels, minlength=count)
+    roots = np.flatnonzero(sizes)
+    selected_roots = roots[mask[roots]]
+
+    keep = np.zeros(count, dtype=bool)
+    keep[selected_roots] = (
+        sizes[selected_roots] >= keep_ratio * sizes[selected_roots].max()
+    )
+    if seeds is not None:
+        seed_counts = np.bincount(labels[seeds], minlength=count)
+        keep[selected_roots] |= (
+            seed_counts[selected_roots] >= ISLAND_SEED_RATIO * sizes[selected_roots]
+        ) & (sizes[selected_roots] >= ISLAND_MIN_SEED_VERTICES)
+    result = keep[labels] & mask
+    stats["islands_removed"] = int(len(selected_roots) - np.count_nonzero(keep))
+
+    # 穴: 残した選択領域にだけ接する小さな未選択成分（独立した部品は接していないので対象外）
+    crossing = edges[~same]
+    outer = np.where(mask[crossing[:, 0]], crossing[:, 1], crossing[:, 0])
+    inner = np.where(mask[crossing[:, 0]], crossing[:, 0], crossing[:, 1])
+    touches_kept = np.bincount(labels[outer], weights=result[inner], minlength=count)
+    touches_removed = np.bincount(
+        labels[outer], weights=(mask & ~result)[inner], minlength=count
+    )
+    unselected_roots = roots[~mask[roots]]
+    holes = unselected_roots[
+        (sizes[unselected_roots] <= hole_ratio * np.count_nonzero(result))
+        & (touches_kept[unselected_roots] > 0)
+        & (touches_removed[unselected_roots] == 0)
+    ]
+    is_hole = np.zeros(count, dtype=bool)
+    is_hole[holes] = True
+    result |= is_hole[labels]
+    stats["holes_filled"] = int(len(holes))
+    stats["vertices_changed"] = int(np.count_nonzero(result != mask))
+
+    core_tracing.annotate(vertices=count, **stats)
+    return result, stats
+
+
+def clean_weight_selection(
+    edges: np.ndarray, max_weights: np.ndarray, threshold: float
+) -> np.ndarray:
+    """ウェイト閾値による選択を連結成分で整理したマスクを返す"""
+    mask, stats = clean_selection_mask(
+        edges, max_weights > threshold, seeds=max_weights >= ISLAND_SEED_WEIGHT
+    )
+    if stats["vertices_changed"]:
+        logger.debug(
+            f"選択マスクを整理: 島 {stats['islands_removed']} 個除去, 穴 {stats['holes_filled']} 個補填"
+        )
+    return mask
+
+
+def boundary_loops(mesh: bpy.types.Mesh) -> List[np.ndarray]:
+    """境界エッジ（面が片側にしかないエッジ）をたどって、順序付きの頂点番号配列のリストを返す"""
+    if not mesh.polygons:
+        return []
+
+    loop_count = len(mesh.loops)
+    loop_vertices = np.empty(loop_count, dtype=np.int64)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    loop_edges = np.empty(loop_count, dtype=np.int64)
+    mesh.loops.foreach_get("edge_index", loop_edges)
+    loop_starts = np.empty(len(mesh.polygons), dtype=np.int64)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int64)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+
+    # 面の巡回順の次のループ。境界の半辺は面の向きに沿って一方向にそろう
+    next_loop = np.arange(1, loop_count + 1)
+    next_loop[loop_starts + loop_totals - 1] = loop_starts
+    boundary = np.bincount(loop_edges, minlength=len(mesh.edges))[loop_edges] == 1
+    starts = loop_vertices[boundary]
+    ends = loop_vertices[next_loop[boundary]]
+    if len(starts) == 0:
+        return []
+
+    successor = dict(zip(starts.tolist(), ends.tolist()))
+    remaining = set(successor)
+    loops: List[np.ndarray] = []
+    for start in starts.tolist():
+        if start not in remaining:
+            continue
+        ordered = []
+        vertex = start
+        while vertex in remaining:
+            remaining.discard(vertex)
+            ordered.append(vertex)
+            vertex = successor[vertex]
+        loops.append(np.array(ordered, dtype=np.int64))
+    return loops
+
+
+def classify_boundary_loops(
+    mesh: bpy.types.Mesh, loops: Optional[List[np.ndarray]] = None
+) -> List[Dict[str, Any]]:
+    """境界ループを高さ・大きさ・向きから waist / hem / cuff / neck / sleeve / hole に分類"""
+    if loops is None:
+        loops = boundary_loops(mesh)
+    if not loops:
+        return []
+
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", coords)
+    coords = coords.reshape(-1, 3)
+    z_min = coords[:, 2].min()
+    height = max(coords[:, 2].max() - z_min, 1e-6)
+
+    infos = []
+    for indices in loops:
+        points = coords[indices]
+        centroid = points.mean(axis=0)
+        perimeter = float(
+            np.linalg.norm(points - np.roll(points, -1, axis=0), axis=1).sum()
+        )
+        normal = np.array([0.0, 0.0, 1.0])
+        if len(points) >= 3:
+            normal = np.linalg.svd(points - centroid, full_matrices=False)[2][-1]
+        infos.append(
+            {
+                "type": "hole",
+                "vertices": indices,
+                "centroid": tuple(centroid),
+                "radius": float(np.linalg.norm(points - centroid, axis=1).mean()),
+                "perimeter": perimeter,
+                "normal": tuple(normal),
+                "relative_height": float((centroid[2] - z_min) / height),
+            }
+        )
+
+    longest = max(info["perimeter"] for info in infos)
+    openings = [
+        info for info in infos if info["perimeter"] >= HOLE_PERIMETER_RATIO * longest
+    ]
+    for info in openings:
+        if abs(info["normal"][2]) < HORIZONTAL_LOOP_NORMAL_Z:
+            info["type"] = "sleeve"
+
+    rings = [info for info in openings if info["type"] == "hole"]
+    largest = max((info["radius"] for info in rings), default=0.0)
+    top = [info for info in rings if info["relative_height"] >= 0.5]
+    bottom = [info for info in rings if info["relative_height"] < 0.5]
+    has_sleeves = len(rings) < len(openings)
+
+    if len(openings) == 1:
+        # 靴下・手袋のように開口が1つだけなら口ゴム
+        openings[0]["type"] = "cuff"
+    else:
+        for info in top:
+            info["type"] = "neck" if has_sleeves else "waist"
+        wide = [info for info in bottom if info["radius"] >= HEM_RADIUS_RATIO * largest]
+        for info in bottom:
+            info["type"] = "hem" if len(wide) == 1 and info is wide[0] else "cuff"
+
+    return infos
+
+
+def edge_dihedral_angles(mesh: bpy.types.Mesh) -> np.ndarray:
+    """各エッジの両側の面法線のなす角（ラジアン）。面が2枚でないエッジは0"""
+    angles = np.zeros(len(mesh.edges))
+    if not mesh.polygons:
+        return angles
+
+    face_count = len(mesh.polygons)
+    normals = np.empty(face_count * 3, dtype=np.float64)
+    mesh.polygons.foreach_get("normal", normals)
+    normals = normals.reshape(-1, 3)
+    loop_totals = np.empty(face_count, dtype=np.int64)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    loop_edges = np.empty(len(mesh.loops), dtype=np.int64)
+    mesh.loops.foreach_get("edge_index", loop_edges)
+    loop_faces = np.repeat(np.arange(face_count), loop_totals)
+
+    # エッジ番号順に並べると、各エッジを使う面が連続して並ぶ
+    order = np.argsort(loop_edges, kind="stable")
+    counts = np.bincount(loop_edges, minlength=len(mesh.edges))
+    firsts = np.cumsum(counts) - counts
+    manifold = np.flatnonzero(counts == 2)
+    face_a = loop_faces[order[firsts[manifold]]]
+    face_b = loop_faces[order[firsts[manifold] + 1]]
+    cosines = np.einsum("ij,ij->i", normals[face_a], normals[face_b])
+    angles[manifold] = np.arccos(np.clip(cosines, -1.0, 1.0))
+    return angles
+
+
+def sharp_edge_mask(mesh: bpy.types.Mesh) -> np.ndarray:
+    attribute = mesh.attributes.get(SHARP_EDGE_ATTRIBUTE)
+    mask = np.zeros(len(mesh.edges), dtype=bool)
+    if attribute is not None and attribute.domain == "EDGE":
+        attribute.data.foreach_get("value", mask)
+    return mask
+
+
+@core_tracing.traced("mark_sharp_edges", "generation")
+def mark_sharp_edges(mesh: bpy.types.Mesh, angle: float = SHARP_EDGE_ANGLE) -> int:
+    """二面角が閾値を超えるエッジを sharp_edge 属性へ一括で書き込み、その数を返す"""
+    mask = edge_dihedral_angles(mesh) > angle
+    attribute = mesh.attributes.get(SHARP_EDGE_ATTRIBUTE)
+    if attribute is None:
+        attribute = mesh.attributes.new(SHARP_EDGE_ATTRIBUTE, "BOOLEAN", "EDGE")
+    attribute.data.foreach_set("value", mask)
+    mesh.update()
+
+    count = int(np.count_nonzero(mask))
+    core_tracing.annotate(edges=len(mask), sharp_edges=count)
+    return count
+
+
+def count_edge_chains(edges: np.ndarray, mask: np.ndarray) -> int:
+    """マスクされたエッジがつながってできる線（折り目）の本数"""
+    chain_edges = edges[mask]
+    if len(chain_edges) == 0:
+        return 0
+    labels = label_components(
+        int(edges.max()) + 1, chain_edges[:, 0], chain_edges[:, 1]
+    )
+    return len(np.unique(labels[chain_edges[:, 0]]))
+
+
+def estimate_pleat_count(mesh: bpy.types.Mesh) -> Tuple[int, int]:
+    """シャープな折り目の本数からプリーツ数を推定（山と谷で1プリーツ）。(推定数, シャープエッジ数)"""
+    mask = sharp_edge_mask(mesh)
+    sharp_count = int(np.count_nonzero(mask))
+    if sharp_count == 0:
+        return 0, 0
+    folds = count_edge_chains(mesh_edge_array(mesh), mask)
+    return max(1, round(folds / 2)), sharp_count
+
+
+def hem_loop(mesh: bpy.types.Mesh) -> Optional[Dict[str, Any]]:
+    hems = [info for info in classify_boundary_loops(mesh) if info["type"] == "hem"]
+    return min(hems, key=lambda info: info["relative_height"]) if hems else None
+
+
+@core_tracing.traced("analyze_hem_pleats", "validation")
+def analyze_hem_pleats(
+    mesh: bpy.types.Mesh, samples: int = PLEAT_SPECTRUM_SAMPLES
+) -> Optional[Dict[str, float]]:
+    """裾ループの半径方向の変位をFFTにかけ、プリーツ数・規則性・深さ・位相を求める"""
+    hem = hem_loop(mesh)
+    if hem is None or len(hem["vertices"]) < 4:
+        return None
+
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", coords)
+    offsets = coords.reshape(-1, 3)[hem["vertices"], :2] - np.array(hem["centroid"][:2])
+    angles = np.arctan2(offsets[:, 1], offsets[:, 0]) % (2 * math.pi)
+    radii = np.hypot(offsets[:, 0], offsets[:, 1])
+
+    # 頂点の並びや密度によらず、一定の角度分解能で周期的に補間する
+    grid = np.arange(samples) * (2 * math.pi / samples)
+    profile = np.interp(grid, angles, radii, period=2 * math.pi)
+    displacement = profile - profile.mean()
+
+    spectrum = np.fft.rfft(displacement)
+    power = np.abs(spectrum) ** 2
+    power[0] = 0.0
+    total = power.sum()
+    if total <= 1e-18:
+        return {
+            "pleat_count": 0,
+            "regularity": 0.0,
+            "depth": 0.0,
+            "depth_variance": 0.0,
+            "phase": 0.0,
+        }
+
+    # 折り目の三角波は基本周波数の奇数倍にも成分を持つので、倍音も規則的な成分に数える
+    count = int(np.argmax(power[1:])) + 1
+    regularity = float(power[count::count].sum() / total)
+
+    # 1周期ごとの山と谷の差（各周期に山と谷が1つずつ入る）
+    periods = (grid * count / (2 * math.pi)).astype(np.int64)
+    peaks = np.full(count, -np.inf)
+    valleys = np.full(count, np.inf)
+    np.maximum.at(peaks, periods, displacement)
+    np.minimum.at(valleys, periods, displacement)
+    depths = (peaks - valleys) / 2.0
+
+    core_tracing.annotate(hem_vertices=len(radii), pleat_count=count)
+    return {
+        "pleat_count": count,
+        "regularity": regularity,
+        "depth": float(depths.mean()),
+        "depth_variance": float(depths.var()),
+        "phase": float(np.angle(spectrum[count])),
+    }
@@ -0,0 +1,193 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+_active_tracers: List["Tracer"] = []
+
+
+class Tracer:
+    """ネスト可能なスパンを記録し、Chrome trace形式で書き出す"""
+
+    def __init__(self, name: str = "AdaptiveWear"):
+        self.name = name
+        self.spans: List[Dict[str, Any]] = []
+        self._stack: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._tid = threading.get_ident()
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1_000_000
+
+    def begin(
+        self, name: str, category: str = "generation", **attributes
+    ) -> Dict[str, Any]:
+        """スパンを開始（with文を使えない段階処理用）"""
+        record = {
+            "name": name,
+            "cat": category,
+            "start": self._now_us(),
+            "end": None,
+            "depth": len(self._stack),
+            "args": dict(attributes),
+        }
+        self.spans.append(record)
+        self._stack.append(record)
+        return record
+
+    def end(self, record: Optional[Dict[str, Any]] = None, **attributes) -> None:
+        """スパンを終了。閉じ忘れた子スパンも同時に閉じる"""
+        if not self._stack:
+            return
+        if record is None:
+            record = self._stack[-1]
+        if record not in self._stack:
+            return
+
+        now = self._now_us()
+        while self._stack:
+            current = self._stack.pop()
+            current["end"] = now
+            if current is record:
+                break
+        record["args"].update(attributes)
+
+    @contextmanager
+    def span(
+        self, name: str, category: str = "generation", **attributes
+    ) -> Iterator[Dict[str, Any]]:
+        """スパン区間。yieldした辞書に件数などの属性を追記できる"""
+        record = self.begin(name, category, **attributes)
+        try:
+            yield record["args"]
+        except Exception as e:
+            record["args"]["error"] = str(e)
+            raise
+        finally:
+            self.end(record)
+
+    def duration_ms(self, record: Dict[str, Any]) -> float:
+        end = record["end"] if record["end"] is not None else self._now_us()
+        return (end - record["start"]) / 1000.0
+
+    def self_times_ms(self) -> Dict[str, float]:
+        """子スパンを除いた自己時間をスパン名ごとに集計"""
+        totals: Dict[str, float] = {}
+        for index, record in enumerate(self.spans):
+            child_time = 0.0
+            for child in self.spans[index + 1 :]:
+                if child["depth"] <= record["depth"]:
+                    break
+                if child["depth"] == record["depth"] + 1:
+                    child_time += self.duration_ms(child)
+            own = self.duration_ms(record) - child_time
+            totals[record["name"]] = totals.get(record["name"], 0.0) + own
+        return totals
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """about:tracing / Perfetto で読めるJSONオブジェクト"""
+        events = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": self._pid,
+                "tid": self._tid,
+                "args": {"name": self.name},
+            }
+        ]
+        for record in self.spans:
+            end = record["end"] if record["end"] is not None else self._now_us()
+            events.append(
+                {
+                    "name": record["name"],
+                    "cat": record["cat"],
+                    "ph": "X",
+                    "ts": record["start"],
+                    "dur": end - record["start"],
+                    "pid": self._pid,
+                    "tid": self._tid,
+                    "args": _json_safe(record["args"]),
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, filepath: str) -> bool:
+        try:
+            directory = os.path.dirname(filepath)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(filepath, "w", encoding="utf-8") as f:
+                json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+            logger.info(f"トレース出力: {filepath} ({len(self.spans)} spans)")
+            return True
+        except OSError as e:
+            logger.error(f"トレース出力エラー: {e}")
+            return False
+
+
+def _json_safe(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    safe = {}
+    for key, value in attributes.items():
+        if isinstance(value, (str, int, float, bool)) or value is None:
+            safe[key] = value
+        else:
+            safe[key] = str(value)
+    return safe
+
+
+def active_tracer() -> Optional[Tracer]:
+    return _active_tracers[-1] if _active_tracers else None
+
+
+@contextmanager
+def activate(tracer: Optional[Tracer]) -> Iterator[Optional[Tracer]]:
+    """モジュール関数 span() の記録先を一時的に設定"""
+    if tracer is None:
+        yield None
+        return
+    _active_tracers.append(tracer)
+    try:
+        yield tracer
+    finally:
+        _active_tracers.remove(tracer)
+
+
+@contextmanager
+def span(
+    name: str, category: str = "generation", **attributes
+) -> Iterator[Dict[str, Any]]:
+    """有効なトレーサーがあればスパンを記録し、なければ何もしない"""
+    tracer = active_tracer()
+    if tracer is None:
+        yield {}
+        return
+    with tracer.span(name, category, **attributes) as args:
+        yield args
+
+
+def annotate(**attributes) -> None:
+    """現在開いている最も内側のスパンに属性を追加"""
+    tracer = active_tracer()
+    if tracer is not None and tracer._stack:
+        tracer._stack[-1]["args"].update(attributes)
+
+
+def traced(name: str, category: str = "generation") -> Callable:
+    """関数全体をスパンで囲むデコレータ"""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,23 +1,266 @@
 import bpy
 import bmesh
 import mathutils
+import numpy as np
+import re
 import time
 from mathutils import Vector
-from typing import Optional, Dict, Any, Tuple, List
+from typing import Optional, Dict, Any, Set, Tuple, List
 import logging
+from . import core_binding, core_datablocks, core_presets, core_tracing, core_topology
 
 logger = logging.getLogger(__name__)
 
 
+# Mixamo / VRM / Rigify などのボーン名プレフィックス
+_GROUP_NAME_PREFIXES = ("mixamorig:", "mixamorig_", "j_bip_", "def-", "org-")
+_SIDE_SUFFIX = re.compile(r"[._\-\s](l|r|left|right)$")
+_SIDE_PREFIX = re.compile(r"^(l|r|c|left|right)[._\-\s]|^(left|right)")
+_SEPARATORS = re.compile(r"[._\-\s:]")
+# 単語の切れ目: 小文字→大文字（LeftUpperLeg）と数字の前後（Index1, 人指１）
+_WORD_BOUNDARY = re.compile(r"(?<=[a-z])(?=[A-Z])|(?<=\D)(?=\d)|(?<=\d)(?=\D)")
+# 左右・中央を表す単語（J_Bip_C_Hips の C など）
+_SIDE_TOKENS = {"l", "r", "c", "left", "right"}
+
+# (プリセットの版, 正規化済みの別名表)
+_group_synonyms: Tuple[int, Dict[str, Tuple[str, ...]]] = (-1, {})
+# (プリセットの版, 正規化済みの別名 → (ヒューマノイドスロット, 左右があるか), スロット名の並び)
+_humanoid_aliases: Tuple[int, Dict[str, Tuple[str, bool]], Tuple[str, ...]] = (
+    -1,
+    {},
+    (),
+)
+_HUMANOID_SIDES = {"L": "Left", "R": "Right"}
+_vertex_group_indices: Dict[str, "VertexGroupIndex"] = {}
+# 素体名 → (シグネチャ, 頂点数×頂点グループ数のウェイト行列)
+_weight_matrices: Dict[str, Tuple[Tuple[Any, ...], np.ndarray]] = {}
+
+
+def load_group_synonyms() -> Dict[str, Tuple[str, ...]]:
+    """部位名 → 別名（英語・日本語・各リグ規格）の対応表をプリセットから読み込む"""
+    global _group_synonyms
+    version = core_presets.version("vertex_groups")
+    if _group_synonyms[0] != version:
+        _group_synonyms = (
+            version,
+            {
+                part: tuple(_SEPARATORS.sub("", alias.lower()) for alias in aliases)
+                for part, aliases in core_presets.group_synonyms().items()
+            },
+        )
+    return _group_synonyms[1]
+
+
+def normalize_group_name(name: str) -> Tuple[str, str]:
+    """頂点グループ名を (左右 "L"/"R"/"", 区切り文字を除いた小文字の部位名) に分解"""
+    text = name.strip().lower()
+    for prefix in _GROUP_NAME_PREFIXES:
+        if text.startswith(prefix):
+            text = text[len(prefix) :]
+            break
+
+    side = ""
+    if text[:1] in ("左", "右"):
+        side = "L" if text[0] == "左" else "R"
+        text = text[1:]
+    else:
+        match = _SIDE_SUFFIX.search(text) or _SIDE_PREFIX.match(text)
+        if match:
+            token = match.group(match.lastindex)
+            side = {"l": "L", "left": "L", "r": "R", "right": "R"}.get(token, "")
+            text = text[: match.start()] + text[match.end() :]
+
+    return side, _SEPARATORS.sub("", text)
+
+
+def group_name_tokens(name: str) -> Tuple[str, ...]:
+    """頂点グループ名を単語に分けた正規化済みトークン（プレフィックスと左右は除く）と、
+    区切りを除いた名前全体。別名は部分文字列ではなくこのいずれかと一致したときだけ当たる"""
+    text = name.strip()
+    for prefix in _GROUP_NAME_PREFIXES:
+        if text.lower().startswith(prefix):
+            text = text[len(prefix) :]
+            break
+    if text[:1] in ("左", "右"):
+        text = text[1:]
+    words = [
+        word
+        for word in _SEPARATORS.split(_WORD_BOUNDARY.sub(" ", text).lower())
+        if word and word not in _SIDE_TOKENS
+    ]
+    return (*words, "".join(words))
+
+
+def load_humanoid_aliases() -> Tuple[Dict[str, Tuple[str, bool]], Tuple[str, ...]]:
+    """Unity/VRM/Mixamo/MMD/Blender のボーン名の別名 → ヒューマノイドスロットの表と、全スロット名"""
+    global _humanoid_aliases
+    version = core_presets.version("humanoid_bones")
+    if _humanoid_aliases[0] != version:
+        aliases: Dict[str, Tuple[str, bool]] = {}
+        slots: List[str] = []
+        for kind, table in core_presets.humanoid_bones().items():
+            paired = kind == "paired"
+            for slot, names in table.items():
+                for alias in (slot, *names):
+                    aliases.setdefault(
+                        _SEPARATORS.sub("", alias.lower()), (slot, paired)
+                    )
+                if paired:
+                    slots.extend(
+                        f"{prefix}{slot}" for prefix in _HUMANOID_SIDES.values()
+                    )
+                else:
+                    slots.append(slot)
+        _humanoid_aliases = (version, aliases, tuple(slots))
+    return _humanoid_aliases[1], _humanoid_aliases[2]
+
+
+def humanoid_slot(name: str) -> Optional[str]:
+    """ボーン・頂点グループ名を Unity の HumanBodyBones 形式のスロット名にする（該当なしは None）"""
+    side, normalized = normalize_group_name(name)
+    entry = load_humanoid_aliases()[0].get(normalized)
+    if entry is None:
+        return None
+    slot, paired = entry
+    if not paired:
+        return slot
+    prefix = _HUMANOID_SIDES.get(side)
+    return f"{prefix}{slot}" if prefix else None
+
+
+def humanoid_mapping(
+    vertex_groups: List[str],
+    bones: List[str],
+    deform_bones: Optional[List[str]] = None,
+) -> Dict[str, Dict[str, Optional[str]]]:
+    """ヒューマノイドスロットごとのボーンと頂点グループの対応（名前の索引で線形時間）。
+    status は ok / name_mismatch（同じ部位だが名前が違い、アーマチュアで変形しない）/
+    missing_group / missing_bone / missing"""
+    group_names = set(vertex_groups)
+    deform_names = set(bones if deform_bones is None else deform_bones)
+    # Rigify の ORG-/DEF-/MCH- のように1スロットに複数のボーンが当たる場合は、
+    # 同名の頂点グループがあるボーン、次に変形ボーンを選ぶ
+    slot_bones: Dict[str, str] = {}
+    for bone in bones:
+        slot = humanoid_slot(bone)
+        if slot is None:
+            continue
+        current = slot_bones.get(slot)
+        if current is None or (bone in group_names, bone in deform_names) > (
+            current in group_names,
+            current in deform_names,
+        ):
+            slot_bones[slot] = bone
+    slot_groups: Dict[str, str] = {}
+    for group in vertex_groups:
+        slot = humanoid_slot(group)
+        if slot is not None:
+            slot_groups.setdefault(slot, group)
+
+    mapping = {}
+    for slot in load_humanoid_aliases()[1]:
+        bone = slot_bones.get(slot)
+        # 同名の頂点グループがあればそれを優先する
+        group = bone if bone in group_names else slot_groups.get(slot)
+        if bone and group:
+            status = "ok" if bone == group else "name_mismatch"
+        elif bone:
+            status = "missing_group"
+        elif group:
+            status = "missing_bone"
+        else:
+            status = "missing"
+        mapping[slot] = {"bone": bone, "group": group, "status": status}
+    return mapping
+
+
+class VertexGroupIndex:
+    """オブジェクトの頂点グループを部位・左右で引ける索引。
+    アンドゥやファイルの読み直しで無効になる VertexGroup は持たず、頂点グループ番号を返す"""
+
+    def __init__(self, obj: bpy.types.Object):
+        self.signature = _vertex_group_signature(obj)
+        self.sides: List[str] = []
+        self.names: List[str] = []
+        self.tokens: List[Set[str]] = []
+        for vg in obj.vertex_groups:
+            side, normalized = normalize_group_name(vg.name)
+            self.sides.append(side)
+            self.names.append(normalized)
+            self.tokens.append(set(group_name_tokens(vg.name)))
+
+        self._aliases: Dict[str, str] = {}
+        self._by_part: Dict[str, List[int]] = {}
+        for part, aliases in load_group_synonyms().items():
+            self._aliases[part] = part
+            for alias in aliases:
+                self._aliases.setdefault(alias, part)
+            self._by_part[part] = self._scan(aliases)
+
+    def _scan(self, terms) -> List[int]:
+        return [
+            slot
+            for slot, tokens in enumerate(self.tokens)
+            if not tokens.isdisjoint(terms)
+        ]
+
+    def slots(self, group_type: str) -> List[int]:
+        term = _SEPARATORS.sub("", group_type.lower())
+        part = self._aliases.get(term)
+        if part is None:
+            # 別名表にない検索語は初回だけ走査して索引に加える
+            part = term
+            self._aliases[term] = term
+            self._by_part[term] = self._scan((term,))
+        return self._by_part[part]
+
+    def find(self, group_type: str, side: str = "") -> List[int]:
+        return [
+            slot
+            for slot in self.slots(group_type)
+            if not side or self.sides[slot] == side
+        ]
+
+    def primary(self, group_type: str, side: str) -> Optional[int]:
+        """部位名そのものの頂点グループを優先し、なければ最初に見つかったもの"""
+        candidates = [
+            slot for slot in self.slots(group_type) if self.sides[slot] == side
+        ]
+        if not candidates:
+            return None
+        part = self._aliases[_SEPARATORS.sub("", group_type.lower())]
+        exact = set(load_group_synonyms().get(part, ())) | {part}
+        for slot in candidates:
+            if self.names[slot] in exact:
+                return slot
+        return candidates[0]
+
+
+def _vertex_group_signature(obj: bpy.types.Object) -> Tuple[Any, ...]:
+    return (
+        obj.as_pointer(),
+        tuple(vg.name for vg in obj.vertex_groups),
+        core_presets.version("vertex_groups"),
+    )
+
+
+def vertex_group_index(obj: bpy.types.Object) -> "VertexGroupIndex":
+    """キャッシュ済みの索引を返す（頂点グループが増減・改名されたら作り直す）"""
+    index = _vertex_group_indices.get(obj.name)
+    if index is None or index.signature != _vertex_group_signature(obj):
+        index = VertexGroupIndex(obj)
+        _vertex_group_indices[obj.name] = index
+    return index
+
+
 def find_vertex_groups_by_type(
     obj: bpy.types.Object, group_type: str
 ) -> List[bpy.types.VertexGroup]:
     found_groups: List[bpy.types.VertexGroup] = []
     if obj and obj.type == "MESH" and obj.vertex_groups:
-        search_term = group_type.lower()
-        for vg in obj.vertex_groups:
-            if search_term in vg.name.lower():
-                found_groups.append(vg)
+        found_groups = [
+            obj.vertex_groups[slot] for slot in vertex_group_index(obj).find(group_type)
+        ]
         logger.debug(
             f"オブジェクト '{obj.name}' からタイプ '{group_type}' に関連する頂点グループを {len(found_groups)} 個見つけました。"
         )
@@ -34,12 +277,11 @@ def find_hand_vertex_groups(
     left_hand_vg = None
     right_hand_vg = None
     if obj and obj.type == "MESH" and obj.vertex_groups:
-        for vg in obj.vertex_groups:
-            name_lower = vg.name.lower()
-            if "hand.l" in name_lower or "hand_l" in name_lower:
-                left_hand_vg = vg
-            elif "hand.r" in name_lower or "hand_r" in name_lower:
-                right_hand_vg = vg
+        index = vertex_group_index(obj)
+        left_slot = index.primary("hand", "L")
+        right_slot = index.primary("hand", "R")
+        left_hand_vg = None if left_slot is None else obj.vertex_groups[left_slot]
+        right_hand_vg = None if right_slot is None else obj.vertex_groups[right_slot]
         logger.debug(
             f"オブジェクト '{obj.name}' から手の頂点グループを検索しました: 左={left_hand_vg.name if left_hand_vg else 'None'}, 右={right_hand_vg.name if right_hand_vg else 'None'}"
         )
@@ -50,6 +292,88 @@ def find_hand_vertex_groups(
     return left_hand_vg, right_hand_vg
 
 
+def read_vertex_weights(obj: bpy.types.Object) -> Tuple[np.ndarray, np.ndarray]:
+    """全頂点のウェイトを (頂点番号, グループ番号) の組と値の平坦な配列として毎回読み直す"""
+    entries = np.array(
+        [
+            (vert.index, g.group, g.weight)
+            for vert in obj.data.vertices
+            for g in vert.groups
+        ],
+        dtype=np.float64,
+    ).reshape(-1, 3)
+    return entries[:, :2].astype(np.int64), entries[:, 2].astype(np.float32)
+
+
+def vertex_weight_matrix(obj: bpy.types.Object) -> np.ndarray:
+    """頂点数×頂点グループ数のウェイト行列。ウェイトは毎回1回の走査で平坦に読み、
+    形状・グループ・ウェイト値のチェックサムが同じなら以前の行列をそのまま返す"""
+    slots, values = read_vertex_weights(obj)
+    signature = (
+        obj.data.as_pointer(),
+        len(obj.data.vertices),
+        tuple(vg.name for vg in obj.vertex_groups),
+        hash(slots.tobytes() + values.tobytes()),
+    )
+    cached = _weight_matrices.get(obj.name)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    weights = np.zeros(
+        (len(obj.data.vertices), len(obj.vertex_groups)), dtype=np.float32
+    )
+    known = slots[:, 1] < weights.shape[1]
+    weights[slots[known, 0], slots[known, 1]] = values[known]
+
+    _weight_matrices[obj.name] = (signature, weights)
+    logger.debug(f"ウェイト行列をキャッシュ: {obj.name} {weights.shape}")
+    return weights
+
+
+def invalidate_vertex_weights(obj_name: Optional[str] = None) -> bool:
+    if obj_name is None:
+        _weight_matrices.clear()
+        return True
+    return _weight_matrices.pop(obj_name, None) is not None
+
+
+# 衣装タイプごとの選択モードと対象頂点グループのキーワード（生成とライブプレビューで共有）
+SELECTION_RULES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "PANTS": ("pants", ("hip", "leg")),
+    "T_SHIRT": ("tshirt", ("chest", "arm", "torso")),
+    "BRA": ("bra", ("chest", "breast")),
+    "SOCKS": ("socks", ("foot", "leg")),
+    "GLOVES": ("gloves", ("hand",)),
+    "SKIRT": ("skirt", ("hip", "leg")),
+}
+SELECTION_HEATMAP_ATTRIBUTE = "AWGP_Selection"
+
+
+def selection_threshold(
+    props, ai_settings: Dict[str, Any], selection_type: str
+) -> float:
+    """頂点選択で使う最大ウェイトの閾値（AI設定が無い項目は presets/wear_types.json の値）"""
+    base = core_presets.selection_threshold(props.wear_type, 0.2)
+    threshold_map = {
+        "pants": ai_settings.get("threshold", base),
+        "tshirt": ai_settings.get("tshirt_threshold", base),
+        "bra": ai_settings.get("bra_threshold", base),
+        "gloves": ai_settings.get("hand_threshold", base),
+        "socks": base * props.sock_length * ai_settings.get("sock_multiplier", 1.0),
+        "skirt": base * props.skirt_length,
+    }
+    return threshold_map.get(selection_type, base)
+
+
+def remove_color_attribute(mesh: bpy.types.Mesh, name: str) -> bool:
+    attribute = mesh.color_attributes.get(name)
+    if attribute is None:
+        return False
+    mesh.color_attributes.remove(attribute)
+    return True
+
+
+@core_tracing.traced("evaluate_pleats", "validation")
 def evaluate_pleats_geometry(
     skirt_obj: bpy.types.Object, expected_pleat_count: int
 ) -> Dict[str, Any]:
@@ -61,6 +385,10 @@ def evaluate_pleats_geometry(
         "face_count": 0,
         "manifold_check": False,
         "sharp_edge_count": 0,
+        "pleat_regularity": 0.0,
+        "pleat_depth": 0.0,
+        "pleat_depth_variance": 0.0,
+        "pleat_phase": 0.0,
         "total_score": 0,
         "messages": [],
     }
@@ -103,18 +431,29 @@ def evaluate_pleats_geometry(
         report["manifold_check"] = False
 
     try:
-        sharp_edges = [e for e in mesh.edges if e.use_edge_sharp]
-        report["sharp_edge_count"] = len(sharp_edges)
+        estimate, sharp_count = core_topology.estimate_pleat_count(mesh)
+        report["sharp_edge_count"] = sharp_count
+        report["actual_pleat_count_estimate"] = estimate
     except Exception as e:
         report["messages"].append(
             f"シャープエッジのカウント中にエラーが発生しました: {e}"
         )
         report["sharp_edge_count"] = 0
 
+    # 裾の断面が取れる場合は、分割数に左右されない周波数解析の推定を優先する
+    spectrum = core_topology.analyze_hem_pleats(mesh)
+    if spectrum is not None:
+        report["actual_pleat_count_estimate"] = spectrum["pleat_count"]
+        report["pleat_regularity"] = spectrum["regularity"]
+        report["pleat_depth"] = spectrum["depth"]
+        report["pleat_depth_variance"] = spectrum["depth_variance"]
+        report["pleat_phase"] = spectrum["phase"]
+        if spectrum["regularity"] < 0.6:
+            report["messages"].append(
+                f"プリーツの間隔が不規則です (規則性 {spectrum['regularity']:.2f})。"
+            )
+
     if report["sharp_edge_count"] > 0:
-        report["actual_pleat_count_estimate"] = max(
-            1, round(report["sharp_edge_count"] / 2)
-        )
         if abs(report["actual_pleat_count_estimate"] - expected_pleat_count) > 2:
             report["messages"].append(
                 f"推定プリーツ数 ({report['actual_pleat_count_estimate']}) が期待値 ({expected_pleat_count}) と大きく異なります。"
@@ -129,6 +468,7 @@ def evaluate_pleats_geometry(
         score += 30
     if abs(report["actual_pleat_count_estimate"] - expected_pleat_count) <= 2:
         score += 40
+    score += round(30 * report["pleat_regularity"])
 
     report["total_score"] = score
     return report
@@ -158,32 +498,291 @@ def find_armature(obj: bpy.types.Object) -> Optional[bpy.types.Object]:
     return None
 
 
+# 1頂点あたりの影響ボーン数の上限（Unityのスキンウェイト既定値）
+MAX_BONE_INFLUENCES = 4
+# 衣装のエッジ隣接で平均する回数と混合率（三角形境界のウェイトの段差をならす）
+WEIGHT_SMOOTH_ITERATIONS = 2
+WEIGHT_SMOOTH_FACTOR = 0.5
+# 書き込むウェイトの刻み。同じ値の頂点をまとめて1回の add で書き込む
+WEIGHT_STEPS = 1000
+
+
+def smooth_vertex_weights(
+    weights: np.ndarray,
+    edges: np.ndarray,
+    iterations: int = WEIGHT_SMOOTH_ITERATIONS,
+    factor: float = WEIGHT_SMOOTH_FACTOR,
+) -> np.ndarray:
+    """隣接頂点のウェイト平均へ factor だけ寄せる（頂点数×グループ数を一括）"""
+    if not len(edges):
+        return weights
+    pair_a = np.concatenate([edges[:, 0], edges[:, 1]])
+    pair_b = np.concatenate([edges[:, 1], edges[:, 0]])
+    degree = np.bincount(pair_a, minlength=len(weights))[:, None]
+    connected = degree[:, 0] > 0
+    for _ in range(iterations):
+        neighbor_sum = np.zeros_like(weights)
+        np.add.at(neighbor_sum, pair_a, weights[pair_b])
+        mean = neighbor_sum[connected] / degree[connected]
+        weights = weights.copy()
+        weights[connected] += factor * (mean - weights[connected])
+    return weights
+
+
+def limit_influences(
+    weights: np.ndarray, max_influences: int = MAX_BONE_INFLUENCES
+) -> np.ndarray:
+    """上位 max_influences 個だけ残して正規化し、合計が WEIGHT_STEPS の整数ウェイトで返す。
+    同値は頂点グループ順で決まるので、同じ入力からは常に同じ結果になる"""
+    order = np.argsort(-weights, axis=1, kind="stable")
+    kept = np.zeros_like(weights)
+    rows = np.arange(len(weights))[:, None]
+    top = order[:, :max_influences]
+    kept[rows, top] = np.maximum(weights[rows, top], 0.0)
+
+    totals = kept.sum(axis=1, keepdims=True)
+    weighted = totals[:, 0] > 0.0
+    kept[weighted] /= totals[weighted]
+    steps = np.floor(kept * WEIGHT_STEPS + 0.5).astype(np.int64)
+    # 丸め誤差は最大の影響に寄せて合計を正確に保つ
+    residual = WEIGHT_STEPS - steps.sum(axis=1)
+    steps[rows[weighted, 0], order[weighted, 0]] += residual[weighted]
+    return steps
+
+
+def write_vertex_weights(
+    obj: bpy.types.Object, names: List[str], steps: np.ndarray
+) -> None:
+    """整数ウェイト行列を頂点グループへ書き込む（グループ×ウェイト値ごとに1回の add）"""
+    all_vertices = list(range(len(obj.data.vertices)))
+    for column, name in enumerate(names):
+        group = obj.vertex_groups.get(name) or obj.vertex_groups.new(name=name)
+        group.remove(all_vertices)
+        values = steps[:, column]
+        members = np.flatnonzero(values)
+        for value in np.unique(values[members]):
+            indices = members[values[members] == value]
+            group.add(indices.tolist(), float(value) / WEIGHT_STEPS, "REPLACE")
+
+
+@core_tracing.traced("weight_transfer", "post")
+def transfer_weights(
+    base_body: bpy.types.Object,
+    garment: bpy.types.Object,
+    armature: Optional[bpy.types.Object] = None,
+) -> Dict[str, Any]:
+    """素体の変形ウェイトを表面結合の重心座標で補間し、平滑化・影響数制限をして衣装に書き込む"""
+    deform_bones = (
+        {bone.name for bone in armature.data.bones if bone.use_deform}
+        if armature is not None
+        else None
+    )
+    body_weights = vertex_weight_matrix(base_body)
+    columns = [
+        vg.index
+        for vg in base_body.vertex_groups
+        if (deform_bones is None or vg.name in deform_bones)
+        and body_weights[:, vg.index].any()
+    ]
+    names = [base_body.vertex_groups[i].name for i in columns]
+
+    binding = core_binding.surface_binding(base_body, garment)
+    corner_weights = body_weights[:, columns][binding.triangles]
+    weights = np.einsum("nj,njg->ng", binding.weights, corner_weights)
+    weights = smooth_vertex_weights(
+        weights, core_topology.mesh_edge_array(garment.data)
+    )
+    steps = limit_influences(weights)
+    write_vertex_weights(garment, names, steps)
+
+    stats = {
+        "groups": len(names),
+        "vertices": len(steps),
+        "unweighted": int(np.count_nonzero(steps.sum(axis=1) == 0)),
+        "max_influences": int((steps > 0).sum(axis=1).max(initial=0)),
+    }
+    core_tracing.annotate(**stats)
+    logger.info(
+        f"ウェイト転送完了: {garment.name} ({stats['groups']}グループ, 最大影響数 {stats['max_influences']}, ウェイトなし {stats['unweighted']}頂点)"
+    )
+    return stats
+
+
+@core_tracing.traced("rigging", "post")
 def apply_rigging(
     garment: bpy.types.Object, base_body: bpy.types.Object, armature: bpy.types.Object
-) -> None:
+) -> Optional[bool]:
     if not (garment and base_body and armature):
-        return
+        return None
     try:
-        garment.modifiers.new(name="Armature", type="ARMATURE")
-        garment.modifiers["Armature"].object = armature
+        modifier = next(
+            (mod for mod in garment.modifiers if mod.type == "ARMATURE"), None
+        ) or garment.modifiers.new(name="Armature", type="ARMATURE")
+        modifier.object = armature
+        # クロスの固定頂点がボーンに追従するよう、アーマチュアはスタックの先頭で評価する
+        garment.modifiers.move(list(garment.modifiers).index(modifier), 0)
+        transfer_weights(base_body, garment, armature)
         logger.info(f"リギング適用完了: {garment.name}")
+        return True
     except Exception as e:
         logger.error(f"リギング適用エラー: {e}")
+        return False
+
 
+# クロス用の衝突プロキシ: 間引き後の三角形数と、衣装が食い込まないよう法線方向へ膨らませる量
+COLLISION_PROXY_TRIANGLES = 3000
+COLLISION_PROXY_INFLATE = 0.004
+COLLISION_PROXY_SUFFIX = "_AWGP_Collision"
+CLOTH_PIN_GROUP = "AWGP_Cloth_Pin"
+# 固定する開口と、開口から離れるほど固定を弱める距離（襟ぐりからは肩まで）
+CLOTH_PIN_FALLOFF = {"waist": 0.04, "neck": 0.12}
+# ディスクキャッシュに書き出す最大フレーム数（シーン開始から）
+CLOTH_CACHE_FRAMES = 120
 
+# 素体名 → (形状キー, 衝突プロキシ名)
+_collision_proxies: Dict[str, Tuple[Tuple[Any, ...], str]] = {}
+
+
+def _collision_proxy_key(body: bpy.types.Object) -> Tuple[Any, ...]:
+    coords = np.empty(len(body.data.vertices) * 3, dtype=np.float32)
+    body.data.vertices.foreach_get("co", coords)
+    return (
+        body.data.as_pointer(),
+        len(body.data.polygons),
+        hash(coords.tobytes()),
+        COLLISION_PROXY_TRIANGLES,
+        COLLISION_PROXY_INFLATE,
+    )
+
+
+@core_tracing.traced("collision_proxy", "post")
+def get_collision_proxy(body: bpy.types.Object) -> bpy.types.Object:
+    """間引いて少し膨らませた衝突用の素体を返す（素体の形状が変わらない限り再利用）"""
+    key = _collision_proxy_key(body)
+    cached_key, proxy_name = _collision_proxies.get(body.name, ((), ""))
+    proxy = bpy.data.objects.get(proxy_name)
+    if proxy is not None and cached_key == key:
+        core_tracing.annotate(cached=True)
+        return proxy
+
+    if proxy is not None:
+        bpy.data.objects.remove(proxy, do_unlink=True)
+    proxy = build_collision_proxy(body)
+    _collision_proxies[body.name] = (key, proxy.name)
+    core_tracing.annotate(cached=False, vertices=len(proxy.data.vertices))
+    return proxy
+
+
+def build_collision_proxy(body: bpy.types.Object) -> bpy.types.Object:
+    # 三角形数が予算以下でも評価済みメッシュとして複製し、シェイプキーを持ち込まない
+    mesh = decimate_mesh_data(body, COLLISION_PROXY_TRIANGLES)
+    if mesh is None:
+        mesh = body.data.copy()
+    mesh.name = f"{body.data.name}{COLLISION_PROXY_SUFFIX}"
+
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    normals = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertex_normals.foreach_get("vector", normals)
+    mesh.vertices.foreach_set("co", coords + normals * COLLISION_PROXY_INFLATE)
+    mesh.update()
+
+    proxy = bpy.data.objects.new(f"{body.name}{COLLISION_PROXY_SUFFIX}", mesh)
+    # 生成トランザクション中に作られても衣装として確定・置き換えされないようにする
+    proxy[core_datablocks.HELPER_TAG] = True
+    proxy.matrix_world = body.matrix_world.copy()
+    for collection in body.users_collection or [bpy.context.collection]:
+        collection.objects.link(proxy)
+    proxy.display_type = "WIRE"
+    proxy.hide_render = True
+
+    # 素体がリギング済みならプロキシも同じボーンで変形させる
+    armature = find_armature(body)
+    if armature is not None:
+        proxy.modifiers.new(name="Armature", type="ARMATURE").object = armature
+        transfer_weights(body, proxy, armature)
+    proxy.modifiers.new(name="Collision", type="COLLISION")
+
+    logger.info(
+        f"衝突プロキシを作成: {proxy.name} ({count_triangles(mesh)} 三角形, 膨張 {COLLISION_PROXY_INFLATE}m)"
+    )
+    return proxy
+
+
+def cloth_pin_weights(mesh: bpy.types.Mesh) -> np.ndarray:
+    """ウエスト・襟ぐりの開口を1、そこから離れるほど0に近づく固定ウェイト"""
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", coords)
+    coords = coords.reshape(-1, 3)
+
+    weights = np.zeros(len(coords))
+    for info in core_topology.classify_boundary_loops(mesh):
+        falloff = CLOTH_PIN_FALLOFF.get(info["type"])
+        if falloff is None:
+            continue
+        # ループ頂点の KD ツリーで各頂点の最近接距離を求める（頂点×ループの距離行列は作らない）
+        kd = mathutils.kdtree.KDTree(len(info["vertices"]))
+        for index in info["vertices"]:
+            kd.insert(coords[index], index)
+        kd.balance()
+        distance = np.array([kd.find(co)[2] for co in coords], dtype=np.float64)
+        weights = np.maximum(weights, np.clip(1.0 - distance / falloff, 0.0, 1.0))
+    return weights
+
+
+def assign_cloth_pins(garment: bpy.types.Object) -> int:
+    """固定ウェイトを頂点グループに書き込み、固定される頂点数を返す"""
+    weights = cloth_pin_weights(garment.data)
+    steps = np.floor(weights * WEIGHT_STEPS + 0.5).astype(np.int64)
+    write_vertex_weights(garment, [CLOTH_PIN_GROUP], steps[:, None])
+    return int(np.count_nonzero(steps))
+
+
+def configure_point_cache(
+    point_cache: bpy.types.PointCache, scene: bpy.types.Scene, name: str
+) -> None:
+    """シーン先頭から CLOTH_CACHE_FRAMES 分だけキャッシュする（保存済みの .blend ならディスクへ）"""
+    point_cache.name = name
+    point_cache.frame_start = scene.frame_start
+    point_cache.frame_end = min(
+        scene.frame_end, scene.frame_start + CLOTH_CACHE_FRAMES - 1
+    )
+    point_cache.use_disk_cache = bool(bpy.data.filepath)
+    if not point_cache.use_disk_cache:
+        logger.warning(
+            ".blend が未保存のためクロスキャッシュはメモリに保持されます（保存後に再設定するとディスクに書き出します）"
+        )
+
+
+@core_tracing.traced("cloth_setup", "post")
 def setup_cloth_simulation(
     garment: bpy.types.Object, base_body: bpy.types.Object
-) -> None:
+) -> Optional[bool]:
     if not (garment and base_body):
-        return
+        return None
     try:
+        collision = get_collision_proxy(base_body)
+        pinned = assign_cloth_pins(garment)
+
         cloth_mod = garment.modifiers.new(name="Cloth", type="CLOTH")
         cloth_mod.settings.quality = 5
-        logger.info(f"クロスシミュレーション設定完了: {garment.name}")
+        if pinned:
+            cloth_mod.settings.vertex_group_mass = CLOTH_PIN_GROUP
+        cloth_mod.collision_settings.use_collision = True
+        configure_point_cache(
+            cloth_mod.point_cache, bpy.context.scene, f"{garment.name}_Cloth"
+        )
+        core_tracing.annotate(pinned=pinned)
+        logger.info(
+            f"クロスシミュレーション設定完了: {garment.name} (固定 {pinned} 頂点, 衝突 {collision.name}, {cloth_mod.point_cache.frame_start}-{cloth_mod.point_cache.frame_end}フレーム)"
+        )
+        return True
     except Exception as e:
         logger.error(f"クロスシミュレーション設定エラー: {e}")
+        return False
 
 
+@core_tracing.traced("fitting", "generation")
 def apply_fitting(
     garment: bpy.types.Object, base_body: bpy.types.Object, props
 ) -> None:
@@ -212,6 +811,7 @@ def apply_fitting(
             pass
 
 
+@core_tracing.traced("fix_duplicates", "bmesh")
 def fix_duplicate_vertices(obj: bpy.types.Object) -> None:
     if obj and obj.type == "MESH":
         cleanup_mesh(obj)
@@ -247,6 +847,7 @@ def cleanup_mesh(obj: bpy.types.Object, merge_distance: float = 0.0001) -> None:
         )
 
 
+@core_tracing.traced("edge_smoothing", "generation")
 def apply_edge_smoothing(obj: bpy.types.Object, angle: float = 0.785398) -> None:
     if obj and obj.type == "MESH":
         try:
@@ -276,6 +877,7 @@ def apply_edge_smoothing(obj: bpy.types.Object, angle: float = 0.785398) -> None
             logger.error(f"{obj.name} のエッジスムージング適用に失敗: {e}")
 
 
+@core_tracing.traced("subdivision", "generation")
 def apply_subdivision_surface(
     obj: bpy.types.Object, levels: int, render_levels: Optional[int] = None
 ) -> None:
@@ -298,3 +900,190 @@ def apply_subdivision_surface(
     logger.debug(
         f"'{obj.name}' に Subdivision モディファイアを追加 (ビューポート: {mod.levels}, レンダリング: {mod.render_levels})"
     )
+
+
+LOD_PROTECT_GROUP = "AWGP_LOD_Protect"
+LOD_PROTECT_FACTOR = 1000.0
+LOD_MIN_TRIANGLES = 64
+LOD_BUDGET_ATTEMPTS = 3
+
+
+def count_triangles(mesh: bpy.types.Mesh) -> int:
+    if not mesh.polygons:
+        return 0
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    return int((loop_totals - 2).sum())
+
+
+def find_seam_and_boundary_vertices(mesh: bpy.types.Mesh) -> np.ndarray:
+    protected = np.zeros(len(mesh.vertices), dtype=bool)
+    if not mesh.edges or not mesh.loops:
+        return protected
+
+    edge_vertices = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_vertices)
+    edge_vertices = edge_vertices.reshape(-1, 2)
+
+    loop_edges = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("edge_index", loop_edges)
+    edge_face_counts = np.bincount(loop_edges, minlength=len(mesh.edges))
+
+    # 境界ループ（片側にしか面がないエッジ）とマークされたUVシーム
+    seams = np.zeros(len(mesh.edges), dtype=bool)
+    mesh.edges.foreach_get("use_seam", seams)
+    protected[edge_vertices[(edge_face_counts == 1) | seams].ravel()] = True
+
+    # UVアイランドの境界（同じ頂点がループごとに異なるUVを持つ）
+    uv_layer = mesh.uv_layers.active
+    if uv_layer is not None:
+        loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", loop_vertices)
+        uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        uv_layer.data.foreach_get("uv", uvs)
+        uvs = uvs.reshape(-1, 2)
+
+        order = np.lexsort((uvs[:, 1], uvs[:, 0], loop_vertices))
+        sorted_vertices = loop_vertices[order]
+        sorted_uvs = uvs[order]
+        same_vertex = sorted_vertices[1:] == sorted_vertices[:-1]
+        uv_split = np.any(np.abs(sorted_uvs[1:] - sorted_uvs[:-1]) > 1e-5, axis=1)
+        protected[sorted_vertices[1:][same_vertex & uv_split]] = True
+
+    return protected
+
+
+def ensure_lod_protect_group(
+    obj: bpy.types.Object,
+) -> Optional[bpy.types.VertexGroup]:
+    if not (obj and obj.type == "MESH"):
+        return None
+
+    group = obj.vertex_groups.get(LOD_PROTECT_GROUP)
+    if group is not None:
+        obj.vertex_groups.remove(group)
+    group = obj.vertex_groups.new(name=LOD_PROTECT_GROUP)
+
+    protected = np.flatnonzero(find_seam_and_boundary_vertices(obj.data))
+    if len(protected):
+        group.add(protected.tolist(), 1.0, "REPLACE")
+    logger.debug(
+        f"'{obj.name}' の境界ループ・UVシーム頂点 {len(protected)} 個をLOD保護グループに登録しました。"
+    )
+    return group
+
+
+def remove_lod_protect_group(obj: Optional[bpy.types.Object]) -> None:
+    """デシメーション用の保護グループを外す（書き出したメッシュに残さない）"""
+    if obj is None or obj.type != "MESH":
+        return
+    group = obj.vertex_groups.get(LOD_PROTECT_GROUP)
+    if group is not None:
+        obj.vertex_groups.remove(group)
+
+
+@core_tracing.traced("decimate", "lod")
+def decimate_mesh_data(
+    obj: bpy.types.Object,
+    target_triangles: int,
+    protect_group: Optional[bpy.types.VertexGroup] = None,
+) -> Optional[bpy.types.Mesh]:
+    current = count_triangles(obj.data)
+    if current == 0:
+        return None
+
+    # 元オブジェクトのモディファイアスタックに触れないよう、同じメッシュを共有する一時オブジェクトで評価する
+    proxy = bpy.data.objects.new(f"{obj.name}_AWGP_Decimate", obj.data)
+    bpy.context.collection.objects.link(proxy)
+    try:
+        mod = proxy.modifiers.new(name="AWGP_Decimate", type="DECIMATE")
+        mod.decimate_type = "COLLAPSE"
+        mod.ratio = min(1.0, max(0.0, target_triangles / current))
+        mod.use_collapse_triangulate = True
+        if protect_group is not None:
+            mod.vertex_group = protect_group.name
+            mod.invert_vertex_group = True
+            mod.vertex_group_factor = LOD_PROTECT_FACTOR
+
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        evaluated = proxy.evaluated_get(depsgraph)
+        return bpy.data.meshes.new_from_object(
+            evaluated, preserve_all_data_layers=True, depsgraph=depsgraph
+        )
+    finally:
+        bpy.data.objects.remove(proxy, do_unlink=True)
+
+
+@core_tracing.traced("triangle_budget", "lod")
+def enforce_triangle_budget(
+    obj: bpy.types.Object,
+    target_triangles: int,
+    protect_group: Optional[bpy.types.VertexGroup] = None,
+) -> int:
+    triangles = count_triangles(obj.data)
+    if target_triangles <= 0 or triangles <= target_triangles:
+        return triangles
+
+    if obj.data.shape_keys:
+        logger.warning(
+            f"'{obj.name}' のシェイプキーはデシメーションで失われます（シェイプキー保持が有効なら予算適用後に素体から再転送します）。"
+        )
+
+    # Collapseの結果は比率の近似なので、予算を超えた分だけ比率を絞って再試行する
+    request = target_triangles
+    for _ in range(LOD_BUDGET_ATTEMPTS):
+        mesh = decimate_mesh_data(obj, request, protect_group)
+        if mesh is None:
+            break
+        old_mesh = obj.data
+        mesh.name = old_mesh.name
+        obj.data = mesh
+        if old_mesh.users == 0:
+            bpy.data.meshes.remove(old_mesh)
+
+        triangles = count_triangles(obj.data)
+        if triangles <= target_triangles:
+            break
+        request = max(1, int(request * target_triangles / triangles))
+
+    logger.info(
+        f"'{obj.name}' を三角形予算 {target_triangles} に削減しました: {triangles} 三角形"
+    )
+    return triangles
+
+
+@core_tracing.traced("lod_chain", "lod")
+def build_lod_chain(
+    obj: bpy.types.Object,
+    levels: int,
+    ratio: float,
+    protect_group: Optional[bpy.types.VertexGroup] = None,
+) -> List[bpy.types.Object]:
+    lod_objects: List[bpy.types.Object] = []
+    target = count_triangles(obj.data)
+
+    for level in range(1, levels + 1):
+        target = int(target * ratio)
+        if target < LOD_MIN_TRIANGLES:
+            logger.debug(
+                f"'{obj.name}' のLOD{level} は最小三角形数 {LOD_MIN_TRIANGLES} を下回るため生成を打ち切ります。"
+            )
+            break
+
+        mesh = decimate_mesh_data(obj, target, protect_group)
+        if mesh is None:
+            break
+        mesh.name = f"{obj.data.name}_LOD{level}"
+
+        lod_obj = bpy.data.objects.new(f"{obj.name}_LOD{level}", mesh)
+        for collection in obj.users_collection:
+            collection.objects.link(lod_obj)
+        lod_obj.matrix_world = obj.matrix_world.copy()
+        lod_obj.parent = obj.parent
+        lod_objects.append(lod_obj)
+
+        logger.info(
+            f"LOD{level} を生成しました: {lod_obj.name} ({count_triangles(mesh)} 三角形)"
+        )
+
+    return lod_objects
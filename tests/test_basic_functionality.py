@@ -52,6 +52,26 @@ class TestAdaptiveWearGeneratorPro(unittest.TestCase):
         is_valid, errors = self.props.validate_settings()
         self.assertFalse(is_valid)
 
+    def test_modal_generation_without_window(self):
+        from adaptive_wear_generator_pro import core_generators
+
+        # バックグラウンドではタイマーを使わずに同じステージを最後まで実行する
+        self.props.wear_type = "T_SHIRT"
+        self.assertEqual(bpy.ops.awgp.generate_wear_modal('INVOKE_DEFAULT'), {'FINISHED'})
+        self.assertTrue(bpy.context.active_object.get("awgp_garment"))
+
+        self.props.wear_type = "SKIRT"
+        self.props.pleat_count = 12
+        self.assertEqual(bpy.ops.awgp.generate_wear_modal(), {'FINISHED'})
+        self.assertIn("skirt", bpy.context.active_object.name.lower())
+
+        # スカートも1ステージずつ制御を返す
+        generator = core_generators.PleatedSkirtGenerator(self.props)
+        stages = [stage["id"] for stage in generator.iter_stages()]
+        self.assertEqual(len(stages), generator.stage_count)
+        self.assertGreater(len(stages), 1)
+        self.assertTrue(generator.completed)
+
     def test_tshirt_generation(self):
         self.props.wear_type = "T_SHIRT"
         self.props.quality_level = "MEDIUM"
@@ -87,6 +107,92 @@ class TestAdaptiveWearGeneratorPro(unittest.TestCase):
         generated_objects = [obj for obj in bpy.context.scene.objects if "skirt" in obj.name.lower()]
         self.assertGreater(len(generated_objects), 0)
 
+    def test_lofted_skirt_resolution(self):
+        self.props.wear_type = "SKIRT"
+        self.props.pleat_count = 12
+        self.props.skirt_segments = 40
+        self.props.skirt_rings = 8
+
+        self.assertEqual(bpy.ops.awgp.generate_wear(), {'FINISHED'})
+        skirt = bpy.context.active_object
+        # 周方向はプリーツ数×2の倍数に切り上げ
+        self.assertEqual(len(skirt.data.vertices), 8 * 48)
+        self.assertIn("UVMap", skirt.data.uv_layers)
+
+    def test_boundary_loop_classification(self):
+        from adaptive_wear_generator_pro import core_topology
+
+        bpy.ops.mesh.primitive_cylinder_add(vertices=24, end_fill_type='NOTHING')
+        tube = bpy.context.active_object
+
+        loops = core_topology.boundary_loops(tube.data)
+        self.assertEqual(sorted(len(loop) for loop in loops), [24, 24])
+        types = sorted(info["type"] for info in core_topology.classify_boundary_loops(tube.data))
+        self.assertEqual(types, ["hem", "waist"])
+
+    def test_polygon_budget_and_lod_chain(self):
+        from adaptive_wear_generator_pro import core_generators, core_topology, core_utils
+
+        # 32x8分割の筒: 4096 三角形、上下の開口はそれぞれ 256 頂点
+        bpy.ops.mesh.primitive_cylinder_add(vertices=32, end_fill_type='NOTHING')
+        garment = bpy.context.active_object
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.subdivide(number_cuts=7)
+        bpy.ops.object.mode_set(mode='OBJECT')
+        openings = sorted(len(loop) for loop in core_topology.boundary_loops(garment.data))
+
+        self.props.target_triangles = 1500
+        self.props.generate_lods = True
+        self.props.lod_levels = 2
+        self.props.lod_ratio = 0.5
+        result = core_generators.apply_polygon_budget(garment, self.props)
+
+        self.assertTrue(result["within_budget"])
+        self.assertLessEqual(core_utils.count_triangles(garment.data), 1500)
+        self.assertEqual(sorted(len(loop) for loop in core_topology.boundary_loops(garment.data)), openings)
+        self.assertEqual(len(result["lod_objects"]), 2)
+        for obj in [garment, *result["lod_objects"]]:
+            self.assertNotIn(core_utils.LOD_PROTECT_GROUP, obj.vertex_groups)
+        self.props.generate_lods = False
+        self.props.target_triangles = 0
+
+    def test_pleat_sharp_edges(self):
+        from adaptive_wear_generator_pro import core_topology, core_utils
+
+        # 6列×3段のジグザグ帯: 内側の4列が90度の折り目
+        verts = [(x, x % 2, z) for z in range(3) for x in range(6)]
+        faces = [(z * 6 + x, z * 6 + x + 1, (z + 1) * 6 + x + 1, (z + 1) * 6 + x) for z in range(2) for x in range(5)]
+        mesh = bpy.data.meshes.new("pleat_strip")
+        mesh.from_pydata(verts, [], faces)
+        strip = bpy.data.objects.new("pleat_strip", mesh)
+        bpy.context.collection.objects.link(strip)
+
+        self.assertEqual(core_topology.mark_sharp_edges(mesh), 8)
+        self.assertEqual(int(core_topology.sharp_edge_mask(mesh).sum()), 8)
+        report = core_utils.evaluate_pleats_geometry(strip, 2)
+        self.assertEqual(report["sharp_edge_count"], 8)
+        self.assertEqual(report["actual_pleat_count_estimate"], 2)
+
+    def test_hem_pleat_spectrum(self):
+        import math
+        import numpy as np
+        from adaptive_wear_generator_pro import core_skirt, core_topology
+
+        bpy.ops.mesh.primitive_cylinder_add(vertices=96, end_fill_type='NOTHING')
+        tube = bpy.context.active_object
+        coords = np.array([v.co for v in tube.data.vertices])
+        theta = np.arctan2(coords[:, 1], coords[:, 0]) % (2 * math.pi)
+        radius = 1.0 + core_skirt.pleat_offsets(theta, np.ones(len(theta)), 12, 0.1)
+        coords[:, 0] = radius * np.cos(theta)
+        coords[:, 1] = radius * np.sin(theta)
+        tube.data.vertices.foreach_set("co", coords.ravel())
+        tube.data.update()
+
+        spectrum = core_topology.analyze_hem_pleats(tube.data)
+        self.assertEqual(spectrum["pleat_count"], 12)
+        self.assertGreater(spectrum["regularity"], 0.95)
+        self.assertAlmostEqual(spectrum["depth"], 0.1, delta=0.01)
+
     def test_bra_generation(self):
         self.props.wear_type = "BRA"
         self.props.quality_level = "HIGH"
@@ -108,6 +214,48 @@ class TestAdaptiveWearGeneratorPro(unittest.TestCase):
         result = bpy.ops.awgp.generate_wear()
         self.assertEqual(result, {'FINISHED'})
 
+    def test_mitten_generation(self):
+        import numpy as np
+        from mathutils.bvhtree import BVHTree
+        from adaptive_wear_generator_pro import core_generators
+
+        # 手のひらと、0.1 の隙間を空けて並んだ3本の指（どれも厚さ0.2の箱）
+        def box(x0, x1, y0, y1):
+            return [(x, y, z) for x in (x0, x1) for y in (y0, y1) for z in (0.0, 0.2)]
+
+        box_faces = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+        parts = [box(0.0, 1.0, 0.0, 0.8), box(1.05, 2.0, 0.0, 0.2), box(1.05, 2.0, 0.3, 0.5), box(1.05, 2.0, 0.6, 0.8)]
+        verts = [co for part in parts for co in part]
+        faces = [tuple(8 * i + v for v in face) for i in range(len(parts)) for face in box_faces]
+        mesh = bpy.data.meshes.new("hand")
+        mesh.from_pydata(verts, [], faces)
+        hand = bpy.data.objects.new("Hand", mesh)
+        bpy.context.collection.objects.link(hand)
+        hand.vertex_groups.new(name="hand.L").add(list(range(len(verts))), 1.0, "REPLACE")
+        for i, name in enumerate(["index.L", "middle.L", "ring.L"], start=1):
+            hand.vertex_groups.new(name=name).add(list(range(8 * i, 8 * i + 8)), 1.0, "REPLACE")
+
+        self.props.base_body = hand
+        self.props.wear_type = "GLOVES"
+        self.props.glove_fingers = False
+        result = bpy.ops.awgp.generate_wear()
+        self.assertEqual(result, {'FINISHED'})
+
+        gloves = bpy.context.active_object
+        self.assertIn("gloves", gloves.name.lower())
+        self.assertNotIn(core_generators.SOURCE_INDEX_ATTRIBUTE, gloves.data.attributes)
+        # 凸包が指の面に重ならない: どの辺にも面が1〜2枚だけ付く
+        edge_faces = np.bincount([loop.edge_index for loop in gloves.data.loops], minlength=len(gloves.data.edges))
+        self.assertGreater(len(edge_faces), 0)
+        self.assertLessEqual(int(edge_faces.max()), 2)
+        self.assertGreaterEqual(int(edge_faces.min()), 1)
+
+        # 指同士が1つにまとまり、指の間の隙間も覆われる
+        tree = BVHTree.FromPolygons([v.co for v in gloves.data.vertices], [p.vertices for p in gloves.data.polygons])
+        for gap_y in (0.25, 0.55):
+            location, _, _, _ = tree.ray_cast((1.5, gap_y, 5.0), (0.0, 0.0, -1.0))
+            self.assertIsNotNone(location)
+
     def test_material_application(self):
         self.props.wear_type = "T_SHIRT"
         self.props.use_text_material = True
@@ -121,6 +269,527 @@ class TestAdaptiveWearGeneratorPro(unittest.TestCase):
             obj = generated_objects[0]
             self.assertGreater(len(obj.data.materials), 0)
 
+    def test_outfit_atlas_bake(self):
+        from adaptive_wear_generator_pro import core_bake, core_materials
+
+        self.assertEqual(core_bake.atlas_layout(3, 1024), [(0, 0, 512), (512, 0, 512), (0, 512, 512)])
+
+        bpy.ops.mesh.primitive_cube_add()
+        garment = bpy.context.active_object
+        core_materials.apply_text_material(garment, "T_SHIRT", "red cotton")
+        self.assertEqual(core_bake.procedural_inputs(garment.data.materials[0]), ["Roughness"])
+
+        # workers=1 はこのBlender内で焼き、レンダー設定は元に戻る
+        bpy.context.scene.render.engine = "BLENDER_WORKBENCH"
+        result = core_bake.bake_outfit([garment], "test", size=64, workers=1)
+        self.assertEqual(result["baked"], 1)
+        self.assertEqual(bpy.context.scene.render.engine, "BLENDER_WORKBENCH")
+        self.assertIn(core_bake.ATLAS_UV_LAYER, garment.data.uv_layers)
+        node_types = {node.type for node in garment.data.materials[0].node_tree.nodes}
+        self.assertIn("TEX_IMAGE", node_types)
+        self.assertNotIn("GROUP", node_types)
+
+    def test_shared_texture_node_groups(self):
+        from adaptive_wear_generator_pro import core_materials
+
+        bpy.ops.mesh.primitive_cube_add()
+        first = bpy.context.active_object
+        bpy.ops.mesh.primitive_cube_add()
+        second = bpy.context.active_object
+        core_materials.apply_text_material(first, "T_SHIRT", "red")
+        core_materials.apply_text_material(second, "PANTS", "blue matte")
+
+        materials = [first.data.materials[0], second.data.materials[0]]
+        self.assertIsNot(materials[0], materials[1])
+        groups = [node.node_tree for mat in materials for node in mat.node_tree.nodes if node.type == "GROUP"]
+        self.assertEqual(len(groups), 2)
+        self.assertIs(groups[0], groups[1])
+        self.assertEqual(len(materials[0].node_tree.nodes), 3)
+
+        # 版が古いグループは同じデータブロックのまま作り直される
+        group = groups[0]
+        group[core_materials.NODE_GROUP_VERSION_TAG] = 0
+        self.assertIs(core_materials.texture_node_group("fabric"), group)
+        self.assertEqual(group[core_materials.NODE_GROUP_VERSION_TAG], core_materials.NODE_GROUP_VERSION)
+
+    def test_viewport_shader_lod(self):
+        from adaptive_wear_generator_pro import core_materials
+
+        bpy.ops.mesh.primitive_cube_add()
+        obj = bpy.context.active_object
+        core_materials.apply_text_material(obj, "BRA", "black lace")
+        mat = obj.data.materials[0]
+        principled = next(node for node in mat.node_tree.nodes if node.type == "BSDF_PRINCIPLED")
+        full_links = len(mat.node_tree.links)
+        full_blend = mat.blend_method
+
+        self.props.shader_lod = "VIEWPORT"
+        self.assertEqual(mat[core_materials.SHADER_LOD_TAG], "VIEWPORT")
+        self.assertEqual(mat.blend_method, "OPAQUE")
+        self.assertFalse(principled.inputs["Alpha"].is_linked)
+
+        # 保存・レンダリング中だけ完全なシェーダーに戻る
+        core_materials._restore_full_shaders(bpy.context.scene)
+        self.assertEqual(len(mat.node_tree.links), full_links)
+        core_materials._resume_viewport_shaders(bpy.context.scene)
+        self.assertEqual(mat.blend_method, "OPAQUE")
+
+        self.props.shader_lod = "FULL"
+        self.assertEqual(len(mat.node_tree.links), full_links)
+        self.assertEqual(mat.blend_method, full_blend)
+
+    def test_surface_bound_shape_keys(self):
+        import numpy as np
+        from adaptive_wear_generator_pro import core_binding
+
+        bpy.ops.mesh.primitive_grid_add(x_subdivisions=8, y_subdivisions=8, size=2.0)
+        body = bpy.context.active_object
+        body.shape_key_add(name="Basis", from_mix=False)
+        lift = body.shape_key_add(name="Lift", from_mix=False)
+        for point in lift.data:
+            point.co.z += 0.5
+        bpy.ops.mesh.primitive_plane_add(size=0.5, location=(0.1, 0.2, 0.05))
+        garment = bpy.context.active_object
+
+        errors = core_binding.transfer_shape_keys(body, garment)
+        self.assertEqual(list(errors), ["Lift"])
+        self.assertLess(errors["Lift"], 1e-5)
+        keys = garment.data.shape_keys.key_blocks
+        self.assertEqual(keys["Lift"].relative_key.name, "Basis")
+        basis = np.array([point.co for point in keys["Basis"].data])
+        lifted = np.array([point.co for point in keys["Lift"].data])
+        np.testing.assert_allclose(lifted - basis, [[0.0, 0.0, 0.5]] * len(basis), atol=1e-5)
+
+        # 形状が変わらなければ結合は再利用される
+        self.assertIs(core_binding.surface_binding(body, garment), core_binding.surface_binding(body, garment))
+
+    def test_chained_relative_shape_keys(self):
+        import numpy as np
+        from adaptive_wear_generator_pro import core_binding
+
+        bpy.ops.mesh.primitive_grid_add(x_subdivisions=8, y_subdivisions=8, size=2.0)
+        body = bpy.context.active_object
+        body.shape_key_add(name="Basis", from_mix=False)
+        lift = body.shape_key_add(name="Lift", from_mix=False)
+        higher = body.shape_key_add(name="Higher", from_mix=False)
+        for point in lift.data:
+            point.co.z += 0.5
+        for point in higher.data:
+            point.co.z += 0.8
+        # Higher は Lift に対する差分（Blender上の効果は +0.3）
+        higher.relative_key = lift
+        bpy.ops.mesh.primitive_plane_add(size=0.5, location=(0.1, 0.2, 0.05))
+        garment = bpy.context.active_object
+
+        core_binding.transfer_shape_keys(body, garment)
+        keys = garment.data.shape_keys.key_blocks
+        self.assertEqual(keys["Higher"].relative_key.name, "Lift")
+        lifted = np.array([point.co for point in keys["Lift"].data])
+        higher_co = np.array([point.co for point in keys["Higher"].data])
+        np.testing.assert_allclose(higher_co - lifted, [[0.0, 0.0, 0.3]] * len(lifted), atol=1e-5)
+
+    def test_weight_transfer_limits_influences(self):
+        from adaptive_wear_generator_pro import core_utils
+
+        bpy.ops.mesh.primitive_grid_add(x_subdivisions=10, y_subdivisions=10, size=2.0)
+        body = bpy.context.active_object
+        groups = [body.vertex_groups.new(name=f"Bone{i}") for i in range(6)]
+        for vert in body.data.vertices:
+            for i, group in enumerate(groups):
+                group.add([vert.index], max(0.0, 1.0 - abs(vert.co.x * 3.0 - i + 2.5) / 3.0), "REPLACE")
+        bpy.ops.mesh.primitive_plane_add(size=1.0, location=(0.0, 0.0, 0.05))
+        garment = bpy.context.active_object
+        bpy.ops.object.mode_set(mode="EDIT")
+        bpy.ops.mesh.subdivide(number_cuts=4)
+        bpy.ops.object.mode_set(mode="OBJECT")
+
+        stats = core_utils.transfer_weights(body, garment)
+        self.assertEqual(stats["unweighted"], 0)
+        self.assertLessEqual(stats["max_influences"], core_utils.MAX_BONE_INFLUENCES)
+        for vert in garment.data.vertices:
+            self.assertLessEqual(len(vert.groups), core_utils.MAX_BONE_INFLUENCES)
+            self.assertAlmostEqual(sum(g.weight for g in vert.groups), 1.0, places=5)
+
+        # 同じ入力からは同じウェイト
+        first = [[(g.group, g.weight) for g in vert.groups] for vert in garment.data.vertices]
+        core_utils.transfer_weights(body, garment)
+        second = [[(g.group, g.weight) for g in vert.groups] for vert in garment.data.vertices]
+        self.assertEqual(first, second)
+
+    def test_cloth_collision_proxy_and_pins(self):
+        from adaptive_wear_generator_pro import core_utils
+
+        bpy.ops.mesh.primitive_uv_sphere_add(segments=64, ring_count=32, radius=0.5)
+        body = bpy.context.active_object
+        bpy.ops.mesh.primitive_cylinder_add(vertices=32, radius=0.55, depth=0.6, end_fill_type="NOTHING")
+        garment = bpy.context.active_object
+
+        self.assertTrue(core_utils.setup_cloth_simulation(garment, body))
+        proxy = core_utils.get_collision_proxy(body)
+        self.assertIs(core_utils.get_collision_proxy(body), proxy)
+        self.assertLessEqual(core_utils.count_triangles(proxy.data), core_utils.COLLISION_PROXY_TRIANGLES)
+        self.assertIn("COLLISION", [mod.type for mod in proxy.modifiers])
+
+        cloth = garment.modifiers["Cloth"]
+        self.assertEqual(cloth.settings.vertex_group_mass, core_utils.CLOTH_PIN_GROUP)
+        cache = cloth.point_cache
+        self.assertLessEqual(cache.frame_end - cache.frame_start + 1, core_utils.CLOTH_CACHE_FRAMES)
+
+        # 上端のループ（ウエスト）は固定、下端の裾は自由
+        group = garment.vertex_groups[core_utils.CLOTH_PIN_GROUP]
+        pinned = {vert.index for vert in garment.data.vertices if vert.co.z > 0.29 and any(g.group == group.index and g.weight == 1.0 for g in vert.groups)}
+        hem = [vert for vert in garment.data.vertices if vert.co.z < -0.29]
+        self.assertEqual(len(pinned), 32)
+        self.assertFalse(any(g.group == group.index for vert in hem for g in vert.groups))
+
+    def test_cloth_proxy_survives_regeneration(self):
+        from adaptive_wear_generator_pro import core_utils
+
+        self.props.wear_type = "T_SHIRT"
+        self.props.enable_cloth_sim = True
+        self.props.replace_previous_garment = True
+
+        self.assertEqual(bpy.ops.awgp.generate_wear(), {'FINISHED'})
+        proxy = core_utils.get_collision_proxy(self.test_obj)
+        proxy_name = proxy.name
+        self.assertIsNone(proxy.get("awgp_garment"))
+
+        # 2回目は同じプロキシを再利用し、置き換えで消されない
+        self.assertEqual(bpy.ops.awgp.generate_wear(), {'FINISHED'})
+        self.assertIn(proxy_name, bpy.data.objects)
+        self.assertIs(core_utils.get_collision_proxy(self.test_obj), bpy.data.objects[proxy_name])
+        garments = [obj for obj in bpy.data.objects if obj.get("awgp_wear_type") == "T_SHIRT"]
+        self.assertEqual(len(garments), 1)
+        self.assertIn("Cloth", garments[0].modifiers)
+        self.props.enable_cloth_sim = False
+
+    def test_pose_sweep_penetration(self):
+        from adaptive_wear_generator_pro import core_pose
+
+        bpy.ops.object.armature_add()
+        armature = bpy.context.active_object
+        bpy.ops.object.mode_set(mode="EDIT")
+        spine = armature.data.edit_bones[0]
+        spine.name = "Spine"
+        arm = armature.data.edit_bones.new("UpperArm.L")
+        arm.head, arm.tail, arm.parent = (0.2, 0.0, 1.0), (0.6, 0.0, 1.0), spine
+        bpy.ops.object.mode_set(mode="OBJECT")
+        self.assertEqual(core_pose.pose_bones(armature)[("upper_arm", "L")], "UpperArm.L")
+
+        def weighted_cube(size):
+            bpy.ops.mesh.primitive_cube_add(size=size, location=(0.0, 0.0, 0.5))
+            obj = bpy.context.active_object
+            obj.vertex_groups.new(name="Spine").add(list(range(len(obj.data.vertices))), 1.0, "REPLACE")
+            return obj
+
+        body = weighted_cube(0.5)
+        outer = weighted_cube(0.6)
+        inner = weighted_cube(0.4)
+
+        results = core_pose.sweep_poses(body, [outer, inner], armature)
+        self.assertEqual(set(results[outer.name]), set(core_pose.POSE_LIBRARY))
+        for pose in core_pose.POSE_LIBRARY:
+            self.assertEqual(results[outer.name][pose]["penetrating"], 0)
+            self.assertEqual(results[inner.name][pose]["penetrating"], 8)
+        self.assertIn(f"{core_pose.PENETRATION_ATTRIBUTE_PREFIX}sit", inner.data.attributes)
+
+
+    def test_penetration_sign_at_saddle_vertex(self):
+        import numpy as np
+        from mathutils.bvhtree import BVHTree
+        from adaptive_wear_generator_pro import core_pose
+
+        # 凹凸が混じった頂点(2)のまわりの面。点は頂点の外側にあるが、面0・面4の法線では内側と判定される
+        coords = np.array([
+            (-0.382, 0.0, 0.264), (-0.598, -0.312, 0.153), (0.0, 0.0, 0.0), (-0.438, 0.378, -0.118),
+            (-0.429, -0.381, -0.115), (-0.039, 0.0, -0.439), (-0.162, 0.492, -0.439),
+        ])
+        triangles = np.array([(0, 2, 3), (1, 4, 2), (1, 2, 0), (2, 5, 6), (2, 6, 3), (4, 5, 2)])
+        point = np.array([(0.124, -0.116, 0.021)])
+        face_normals = core_pose.pseudo_normals(coords, triangles)[0]
+        self.assertLess(float(point[0] @ face_normals[0]), 0.0)
+
+        tree = BVHTree.FromPolygons(coords.tolist(), triangles.tolist())
+        self.assertEqual(core_pose.penetration_depths(tree, point, coords, triangles)[0], 0.0)
+        # 擬似法線の反対側へ押し込めば内側（深さは最も近い面までの距離）
+        normal = core_pose.pseudo_normals(coords, triangles)[1][2]
+        inside = -0.05 * normal[None] / np.linalg.norm(normal)
+        self.assertGreater(core_pose.penetration_depths(tree, inside, coords, triangles)[0], 0.02)
+    def test_humanoid_bone_mapping(self):
+        from adaptive_wear_generator_pro import core_utils
+
+        self.assertEqual(core_utils.humanoid_slot("J_Bip_L_UpperArm"), "LeftUpperArm")
+        self.assertEqual(core_utils.humanoid_slot("mixamorig:RightForeArm"), "RightLowerArm")
+        self.assertEqual(core_utils.humanoid_slot("thigh.L"), "LeftUpperLeg")
+        self.assertEqual(core_utils.humanoid_slot("左ひざ"), "LeftLowerLeg")
+        self.assertIsNone(core_utils.humanoid_slot("HeadTop_End"))
+
+        mapping = core_utils.humanoid_mapping(
+            ["Hips", "LeftUpperArm", "J_Bip_L_Hand"], ["Hips", "J_Bip_L_UpperArm", "RightFoot"]
+        )
+        self.assertEqual(mapping["Hips"]["status"], "ok")
+        self.assertEqual(mapping["LeftUpperArm"]["status"], "name_mismatch")
+        self.assertEqual(mapping["LeftHand"]["status"], "missing_bone")
+        self.assertEqual(mapping["RightFoot"]["status"], "missing_group")
+        self.assertEqual(mapping["Head"]["status"], "missing")
+
+        # Rigify: ORG- より頂点グループと同名の DEF- ボーンを選ぶ
+        rigify = ["ORG-upper_arm.L", "DEF-upper_arm.L"]
+        mapping = core_utils.humanoid_mapping(["DEF-upper_arm.L"], rigify)
+        self.assertEqual(mapping["LeftUpperArm"]["bone"], "DEF-upper_arm.L")
+        self.assertEqual(mapping["LeftUpperArm"]["status"], "ok")
+        mapping = core_utils.humanoid_mapping([], rigify, ["DEF-upper_arm.L"])
+        self.assertEqual(mapping["LeftUpperArm"]["bone"], "DEF-upper_arm.L")
+
+    def test_preset_registry(self):
+        import json
+        import os
+        import tempfile
+        from adaptive_wear_generator_pro import core_presets
+
+        self.assertEqual(core_presets.material_preset("t_shirt")["name"], "Cotton_TShirt")
+        self.assertEqual(core_presets.selection_threshold("SOCKS", 0.5), 0.1)
+        self.assertIn("hip", core_presets.group_synonyms())
+
+        # 更新時刻が変わったときだけ読み直す
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "custom.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"value": 1}, f)
+            os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+            preset = core_presets.PresetFile(path, dict)
+            self.assertEqual(preset.get(), {"value": 1})
+
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"value": 2}, f)
+            os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+            preset.checked = 0.0
+            self.assertEqual(preset.get(), {"value": 1})
+
+            os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+            preset.checked = 0.0
+            self.assertEqual(preset.get(), {"value": 2})
+            self.assertEqual(preset.version, 2)
+
+    def test_shared_material_library(self):
+        from adaptive_wear_generator_pro import core_materials
+
+        bpy.ops.mesh.primitive_cube_add()
+        first = bpy.context.active_object
+        bpy.ops.mesh.primitive_cube_add()
+        second = bpy.context.active_object
+
+        # 同じ布地テクスチャ・同じプロンプトなら衣装タイプが違っても1つのマテリアルを共有
+        core_materials.apply_text_material(first, "T_SHIRT", "red silk")
+        core_materials.apply_text_material(second, "PANTS", "red silk")
+        self.assertIs(first.data.materials[0], second.data.materials[0])
+
+        shared_name = first.data.materials[0].name
+        core_materials.apply_text_material(first, "T_SHIRT", "blue leather")
+        core_materials.apply_text_material(second, "T_SHIRT", "blue leather")
+        self.assertNotIn(shared_name, bpy.data.materials)
+
+    def test_trace_export(self):
+        import json
+        import tempfile
+
+        trace_path = os.path.join(tempfile.mkdtemp(), "awgp_trace.json")
+        self.props.wear_type = "T_SHIRT"
+        self.props.trace_export_path = trace_path
+
+        result = bpy.ops.awgp.generate_wear()
+        self.assertEqual(result, {'FINISHED'})
+
+        with open(trace_path, encoding="utf-8") as f:
+            events = json.load(f)["traceEvents"]
+        names = {event["name"] for event in events}
+        self.assertIn("base_mesh", names)
+        self.assertIn("validate_mesh", names)
+        self.assertIn("post_processing", names)
+
+    def test_regeneration_replaces_previous(self):
+        self.props.wear_type = "T_SHIRT"
+        self.props.replace_previous_garment = True
+
+        self.assertEqual(bpy.ops.awgp.generate_wear(), {'FINISHED'})
+        meshes_after_first = len(bpy.data.meshes)
+        materials_after_first = len(bpy.data.materials)
+
+        self.assertEqual(bpy.ops.awgp.generate_wear(), {'FINISHED'})
+        garments = [obj for obj in bpy.data.objects if obj.get("awgp_wear_type") == "T_SHIRT"]
+        self.assertEqual(len(garments), 1)
+        self.assertEqual(len(bpy.data.meshes), meshes_after_first)
+        self.assertEqual(len(bpy.data.materials), materials_after_first)
+
+    def test_regeneration_keeps_previous_by_default(self):
+        self.props.property_unset("replace_previous_garment")
+        self.assertFalse(self.props.replace_previous_garment)
+        self.props.wear_type = "PANTS"
+
+        self.assertEqual(bpy.ops.awgp.generate_wear(), {'FINISHED'})
+        self.assertEqual(bpy.ops.awgp.generate_wear(), {'FINISHED'})
+        garments = [obj for obj in bpy.data.objects if obj.get("awgp_wear_type") == "PANTS"]
+        self.assertEqual(len(garments), 2)
+
+    def test_failed_generation_leaves_no_orphans(self):
+        self.props.wear_type = "PANTS"
+        for vg in list(self.test_obj.vertex_groups):
+            self.test_obj.vertex_groups.remove(vg)
+        meshes_before = len(bpy.data.meshes)
+
+        self.assertEqual(bpy.ops.awgp.generate_wear(), {'CANCELLED'})
+        self.assertEqual(len(bpy.data.meshes), meshes_before)
+
+    def test_cached_regeneration(self):
+        from adaptive_wear_generator_pro import core_cache
+
+        core_cache.clear_cache()
+        self.props.wear_type = "T_SHIRT"
+        self.props.cache_memory_mb = 64
+
+        self.assertEqual(bpy.ops.awgp.generate_wear(), {'FINISHED'})
+        first = bpy.context.active_object
+        first_counts = (len(first.data.vertices), len(first.data.polygons))
+        first_groups = sorted(vg.name for vg in first.vertex_groups)
+        hits_before = core_cache.cache_stats()["hits"]
+
+        self.assertEqual(bpy.ops.awgp.generate_wear(), {'FINISHED'})
+        second = bpy.context.active_object
+        self.assertEqual(core_cache.cache_stats()["hits"], hits_before + 1)
+        self.assertEqual((len(second.data.vertices), len(second.data.polygons)), first_counts)
+        self.assertEqual(sorted(vg.name for vg in second.vertex_groups), first_groups)
+
+        # オブジェクトモードでウェイトだけ変えたらキャッシュを使わない
+        self.test_obj.vertex_groups["chest"].add([0], 0.25, "REPLACE")
+        misses_before = core_cache.cache_stats()["misses"]
+        self.assertEqual(bpy.ops.awgp.generate_wear(), {'FINISHED'})
+        self.assertEqual(core_cache.cache_stats()["hits"], hits_before + 1)
+        self.assertEqual(core_cache.cache_stats()["misses"], misses_before + 1)
+
+    def test_cached_skirt_keeps_transform_and_attributes(self):
+        from adaptive_wear_generator_pro import core_cache
+
+        core_cache.clear_cache()
+        self.test_obj.location = (1.0, 2.0, 0.5)
+        bpy.context.view_layer.update()
+        self.props.wear_type = "SKIRT"
+        self.props.cache_memory_mb = 64
+
+        self.assertEqual(bpy.ops.awgp.generate_wear(), {'FINISHED'})
+        first = bpy.context.active_object
+        first_matrix = [list(row) for row in first.matrix_world]
+        first_sharp = "sharp_edge" in first.data.attributes
+        hits_before = core_cache.cache_stats()["hits"]
+
+        self.assertEqual(bpy.ops.awgp.generate_wear(), {'FINISHED'})
+        second = bpy.context.active_object
+        self.assertEqual(core_cache.cache_stats()["hits"], hits_before + 1)
+        self.assertEqual([list(row) for row in second.matrix_world], first_matrix)
+        self.assertEqual("sharp_edge" in second.data.attributes, first_sharp)
+
+    def test_preview_and_promote(self):
+        self.props.wear_type = "T_SHIRT"
+        self.props.preview_mode = True
+
+        self.assertEqual(bpy.ops.awgp.generate_wear(), {'FINISHED'})
+        preview = bpy.context.active_object
+        self.assertTrue(preview.get("awgp_preview"))
+        preview_name = preview.name
+
+        self.assertEqual(bpy.ops.awgp.promote_preview(), {'FINISHED'})
+        self.assertNotIn(preview_name, bpy.data.objects)
+        self.assertFalse(bpy.context.active_object.get("awgp_preview"))
+        self.assertTrue(self.props.preview_mode)
+
+        # プレビューを切った後の確定では、ユーザーの設定を書き換えない
+        self.props.preview_mode = False
+        self.assertEqual(bpy.ops.awgp.promote_preview(), {'FINISHED'})
+        self.assertFalse(self.props.preview_mode)
+
+    def test_live_selection_heatmap(self):
+        from adaptive_wear_generator_pro import core_live, core_topology
+
+        self.props.wear_type = "PANTS"
+        self.props.live_mode = True
+        stats = core_live.update_selection_heatmap(self.props)
+        mesh = self.test_obj.data
+        self.assertIn("AWGP_Selection", mesh.color_attributes)
+        self.assertEqual(stats["vertices"], len(mesh.vertices))
+        self.assertGreater(stats["selected"], 0)
+        # 生成と同じ整理後のマスクを表示する
+        max_weights, threshold = core_live.selection_weights(self.props)
+        cleaned = core_topology.clean_weight_selection(core_topology.mesh_edge_array(mesh), max_weights, threshold)
+        self.assertEqual(stats["selected"], int(cleaned.sum()))
+        self.assertEqual(len(bpy.data.objects), 1)
+
+        self.props.live_mode = False
+        self.assertNotIn("AWGP_Selection", mesh.color_attributes)
+
+    def test_proxy_body_weights(self):
+        import numpy as np
+        from adaptive_wear_generator_pro import core_proxy, core_utils
+
+        proxy = core_proxy.build_proxy_body(self.test_obj, 1000)
+        self.assertEqual([vg.name for vg in proxy.vertex_groups], [vg.name for vg in self.test_obj.vertex_groups])
+        # 間引かないプロキシは素体と同じウェイトになる
+        self.assertTrue(np.allclose(core_utils.vertex_weight_matrix(proxy), core_utils.vertex_weight_matrix(self.test_obj)))
+
+    def test_weight_matrix_follows_weight_edits(self):
+        from adaptive_wear_generator_pro import core_live, core_utils
+
+        chest = self.test_obj.vertex_groups["chest"]
+        self.assertEqual(core_utils.vertex_weight_matrix(self.test_obj)[0, chest.index], 1.0)
+
+        # ウェイトペイント以外（スクリプト）で値だけ変えても読み直す
+        chest.add([0], 0.25, "REPLACE")
+        self.assertAlmostEqual(float(core_utils.vertex_weight_matrix(self.test_obj)[0, chest.index]), 0.25)
+
+        core_live._on_load_post(None)
+        self.assertFalse(core_utils.invalidate_vertex_weights(self.test_obj.name))
+
+    def test_vertex_group_synonyms(self):
+        from adaptive_wear_generator_pro import core_utils
+
+        for name in ["mixamorig:LeftHand", "J_Bip_R_Hand", "左足", "DEF-thigh.R", "左足首", "Earring", "LeftHandIndex1"]:
+            self.test_obj.vertex_groups.new(name=name)
+
+        left, right = core_utils.find_hand_vertex_groups(self.test_obj)
+        self.assertEqual(left.name, "hand.L")
+        self.assertEqual(right.name, "hand.R")
+
+        leg_names = {vg.name for vg in core_utils.find_vertex_groups_by_type(self.test_obj, "leg")}
+        self.assertTrue({"leg.L", "leg.R", "左足", "DEF-thigh.R"} <= leg_names)
+        # 別名は単語単位で一致させる（足 は 足首 に、ring は Earring に当たらない）
+        self.assertNotIn("左足首", leg_names)
+        foot_names = {vg.name for vg in core_utils.find_vertex_groups_by_type(self.test_obj, "foot")}
+        self.assertIn("左足首", foot_names)
+        finger_names = {vg.name for vg in core_utils.find_vertex_groups_by_type(self.test_obj, "finger")}
+        self.assertEqual(finger_names, {"LeftHandIndex1"})
+
+        index = core_utils.vertex_group_index(self.test_obj)
+        self.assertIs(core_utils.vertex_group_index(self.test_obj), index)
+        self.test_obj.vertex_groups.new(name="Spine")
+        self.assertIsNot(core_utils.vertex_group_index(self.test_obj), index)
+
+    def test_selection_island_cleanup(self):
+        import numpy as np
+        from adaptive_wear_generator_pro import core_topology
+
+        grid = np.arange(400).reshape(20, 20)
+        edges = np.concatenate([
+            np.stack([grid[:, :-1].ravel(), grid[:, 1:].ravel()], axis=1),
+            np.stack([grid[:-1, :].ravel(), grid[1:, :].ravel()], axis=1),
+        ])
+        weights = np.zeros((20, 20), dtype=np.float32)
+        weights[2:15, 2:15] = 0.9
+        weights[8, 8] = 0.0
+        weights[18, 18] = 0.4
+
+        mask = core_topology.clean_weight_selection(edges, weights.ravel(), 0.3).reshape(20, 20)
+        self.assertTrue(mask[8, 8])
+        self.assertFalse(mask[18, 18])
+        self.assertEqual(int(mask.sum()), 13 * 13)
+
     def test_diagnosis_operation(self):
         result = bpy.ops.awgp.diagnose_bones()
         self.assertEqual(result, {'FINISHED'})
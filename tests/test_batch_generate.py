@@ -0,0 +1,118 @@
+from pathlib import Path
+import io
+import json
+import queue
+import sys
+import tempfile
+import types
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import batch_generate
+
+
+class ManifestTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, manifest):
+        path = self.root / "manifest.json"
+        path.write_text(json.dumps(manifest), encoding="utf-8")
+        return path
+
+    def test_jobs_expand_per_wear_type_with_merged_settings(self):
+        path = self._write(
+            {
+                "defaults": {"quality_level": "STABLE", "thickness": 0.01},
+                "jobs": [
+                    {
+                        "body": "avatars/a.blend",
+                        "object": "Body",
+                        "wear_types": ["T_SHIRT", "PANTS"],
+                        "settings": {"thickness": 0.02},
+                    },
+                    {"body": "b.blend"},
+                ],
+            }
+        )
+        jobs = batch_generate.load_manifest(path)
+
+        self.assertEqual(
+            [job["id"] for job in jobs],
+            ["0000_a_T_SHIRT", "0001_a_PANTS", "0002_b_T_SHIRT"],
+        )
+        self.assertEqual(
+            jobs[0]["body_file"], str((self.root / "avatars/a.blend").resolve())
+        )
+        self.assertEqual(jobs[0]["body_object"], "Body")
+        self.assertEqual(
+            jobs[1]["settings"], {"quality_level": "STABLE", "thickness": 0.02}
+        )
+        self.assertIsNone(jobs[2]["body_object"])
+        self.assertEqual(jobs[2]["settings"]["thickness"], 0.01)
+
+    def test_job_without_body_is_rejected(self):
+        path = self._write({"jobs": [{"wear_types": ["PANTS"]}]})
+        with self.assertRaises(ValueError):
+            batch_generate.load_manifest(path)
+
+
+class SummaryTests(unittest.TestCase):
+    def test_summary_counts_and_timings(self):
+        pool = [types.SimpleNamespace(restarts=1), types.SimpleNamespace(restarts=0)]
+        results = [
+            {"id": "0001", "status": "FINISHED", "generation_seconds": 2.0},
+            {"id": "0000", "status": "FINISHED", "generation_seconds": 4.0},
+            {"id": "0002", "status": "FAILED"},
+        ]
+        summary = batch_generate.summarize_results(results, 30.0, pool)
+
+        self.assertEqual(summary["total_jobs"], 3)
+        self.assertEqual(summary["succeeded"], 2)
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(summary["workers"], 2)
+        self.assertEqual(summary["worker_restarts"], 1)
+        self.assertAlmostEqual(summary["throughput_jobs_per_minute"], 6.0)
+        self.assertAlmostEqual(summary["mean_generation_seconds"], 3.0)
+        self.assertAlmostEqual(summary["max_generation_seconds"], 4.0)
+        self.assertEqual([job["id"] for job in summary["jobs"]], ["0000", "0001", "0002"])
+
+    def test_empty_batch(self):
+        summary = batch_generate.summarize_results([], 0.0, [])
+        self.assertEqual(summary["throughput_jobs_per_minute"], 0.0)
+        self.assertEqual(summary["mean_generation_seconds"], 0.0)
+
+
+class WorkerOutputTests(unittest.TestCase):
+    def test_reader_writes_only_to_its_own_queue(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            worker = batch_generate.BlenderWorker(0, "blender", Path(tmp))
+            stale = queue.Queue()
+            process = types.SimpleNamespace(
+                stdout=io.StringIO(
+                    batch_generate.READY_MARKER
+                    + "\n"
+                    + "log line\n"
+                    + batch_generate.RESULT_MARKER
+                    + json.dumps({"id": "0000", "status": "FINISHED"})
+                    + "\n"
+                )
+            )
+            # 再起動後のキューに置き換わっていても、古い読み取りは古いキューにだけ書く
+            worker.results = queue.Queue()
+            worker._read_output(process, stale)
+
+            self.assertTrue(worker.results.empty())
+            self.assertEqual(stale.get_nowait(), {"ready": True})
+            self.assertEqual(stale.get_nowait()["status"], "FINISHED")
+            self.assertIsNone(stale.get_nowait())
+            self.assertIn("log line", worker.log_path.read_text(encoding="utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -102,6 +102,7 @@ class PerformanceProfiler:
         gc.collect()
 
         before_generation = process.memory_info().rss / 1024 / 1024
+        before_blocks = self._count_datablocks()
 
         try:
             bpy.ops.awgp.generate_wear()
@@ -113,6 +114,7 @@ class PerformanceProfiler:
         gc.collect()
 
         final_memory = process.memory_info().rss / 1024 / 1024
+        after_blocks = self._count_datablocks()
 
         return {
             "initial_memory_mb": initial_memory,
@@ -121,6 +123,16 @@ class PerformanceProfiler:
             "final_memory_mb": final_memory,
             "memory_increase_mb": after_generation - before_generation,
             "memory_recovered_mb": after_generation - final_memory,
+            "datablocks_leaked": {
+                name: after_blocks[name] - before_blocks[name] for name in before_blocks
+            },
+        }
+
+    def _count_datablocks(self) -> Dict[str, int]:
+        return {
+            "meshes": len(bpy.data.meshes),
+            "materials": len(bpy.data.materials),
+            "objects": len(bpy.data.objects),
         }
 
     def profile_quality_vs_speed(self) -> Dict[str, Dict[str, float]]:
@@ -177,7 +189,13 @@ class PerformanceProfiler:
         ]
 
         for obj in generated_objects:
+            mesh = obj.data if obj.type == "MESH" else None
             bpy.data.objects.remove(obj, do_unlink=True)
+            if mesh is not None and mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+
+        for mat in [m for m in bpy.data.materials if m.users == 0]:
+            bpy.data.materials.remove(mat)
 
     def generate_performance_report(self) -> str:
         logger.info("=== Performance Profiling Started ===")
@@ -213,6 +231,13 @@ class PerformanceProfiler:
             f"  Memory Recovered: {memory_results['memory_recovered_mb']:.1f} MB"
         )
 
+        leaked = {
+            name: count
+            for name, count in memory_results["datablocks_leaked"].items()
+            if count > 0
+        }
+        report.append(f"  Leaked Datablocks: {leaked if leaked else 'none'}")
+
         memory_status = (
             "GOOD"
             if memory_results["memory_increase_mb"] < 100
@@ -2,6 +2,7 @@ import bpy
 import logging
 from . import core_properties
 from . import core_operators
+from . import core_live
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +24,16 @@ class AWG_PT_MainPanel(bpy.types.Panel):
         box.prop(awg_props, "base_body")
         box.prop(awg_props, "wear_type")
         box.prop(awg_props, "quality_level")
+        box.prop(awg_props, "preview_mode")
+        if awg_props.preview_mode:
+            box.prop(awg_props, "preview_triangles")
+        box.prop(awg_props, "live_mode")
+        if awg_props.live_mode and core_live.last_update:
+            stats = core_live.last_update
+            box.label(
+                text=f"選択: {stats['selected']}/{stats['vertices']} 頂点 ({stats['elapsed_ms']:.1f}ms)",
+                icon="GROUP_VERTEX",
+            )
 
         layout.separator()
 
@@ -30,6 +41,15 @@ class AWG_PT_MainPanel(bpy.types.Panel):
             core_operators.AWGP_OT_GenerateWear.bl_idname,
             icon="OUTLINER_OB_GROUP_INSTANCE",
         )
+        layout.operator(
+            core_operators.AWGP_OT_GenerateWearModal.bl_idname,
+            icon="TIME",
+        )
+        if awg_props.preview_mode:
+            layout.operator(
+                core_operators.AWGP_OT_PromotePreview.bl_idname,
+                icon="CHECKMARK",
+            )
 
         if not (awg_props.base_body is not None and awg_props.wear_type != "NONE"):
             generate_op = layout.operator(
@@ -64,8 +84,14 @@ class AWG_PT_AdvancedPanel(bpy.types.Panel):
         box = layout.box()
         box.label(text="品質設定", icon="OUTLINER_OB_LIGHT")
         box.prop(awg_props, "enable_cloth_sim")
+        if awg_props.enable_cloth_sim:
+            box.operator(
+                core_operators.AWGP_OT_BakeClothCache.bl_idname, icon="PHYSICS"
+            )
         box.prop(awg_props, "enable_edge_smoothing")
         box.prop(awg_props, "preserve_shapekeys")
+        box.prop(awg_props, "replace_previous_garment")
+        box.prop(awg_props, "cache_memory_mb")
         box.prop(awg_props, "use_vertex_groups")
         if awg_props.use_vertex_groups:
             box.prop(awg_props, "min_weight")
@@ -85,6 +111,18 @@ class AWG_PT_AdvancedPanel(bpy.types.Panel):
             box.prop(awg_props, "skirt_length")
             box.prop(awg_props, "pleat_count")
             box.prop(awg_props, "pleat_depth")
+            box.prop(awg_props, "skirt_segments")
+            box.prop(awg_props, "skirt_rings")
+
+        layout.separator()
+
+        box = layout.box()
+        box.label(text="ポリゴン予算・LOD", icon="MOD_DECIM")
+        box.prop(awg_props, "target_triangles")
+        box.prop(awg_props, "generate_lods")
+        if awg_props.generate_lods:
+            box.prop(awg_props, "lod_levels")
+            box.prop(awg_props, "lod_ratio")
 
         layout.separator()
 
@@ -93,6 +131,12 @@ class AWG_PT_AdvancedPanel(bpy.types.Panel):
         box.prop(awg_props, "use_text_material")
         if awg_props.use_text_material:
             box.prop(awg_props, "material_prompt")
+        box.row().prop(awg_props, "shader_lod", expand=True)
+        box.prop(awg_props, "bake_atlas_size")
+        box.prop(awg_props, "bake_workers")
+        box.operator(
+            core_operators.AWGP_OT_BakeOutfitAtlas.bl_idname, icon="RENDER_STILL"
+        )
 
         layout.separator()
 
@@ -139,6 +183,10 @@ class AWG_PT_HelpPanel(bpy.types.Panel):
         layout.operator(
             core_operators.AWGP_OT_DiagnoseBones.bl_idname, icon="VIEW_PERSPECTIVE"
         )
+        layout.operator(
+            core_operators.AWGP_OT_PoseSweep.bl_idname, icon="ARMATURE_DATA"
+        )
+        layout.prop(context.scene.adaptive_wear_generator_pro, "trace_export_path")
 
 
 registration_classes = [